@@ -19,22 +19,34 @@ its Index.
 also upload new baskets to the pantry using Index.upload_basket().
 """
 
+from .artifact_cache import ArtifactCache
+from .async_pantry import AsyncBasket, AsyncPantry
 from .basket import Basket
+from .hash_cache import HashCache
 from .index.index_pandas import IndexPandas
 from .index.index_sqlite import IndexSQLite
 from .index.index_sql import IndexSQL
 from .pantry import Pantry
 from .pantry_factory import create_pantry
+from .validation_report import ValidationRecord, ValidationReport
+from .validation_state import ValidationState
 from .mongo_loader import MongoLoader
 
-__version__ = "1.15.5"
+__version__ = "1.16.0"
 
 __all__ = [
+    "ArtifactCache",
+    "AsyncBasket",
+    "AsyncPantry",
     "Basket",
+    "HashCache",
     "IndexPandas",
     "IndexSQLite",
     "IndexSQL",
     "Pantry",
     "MongoLoader",
+    "ValidationRecord",
+    "ValidationReport",
+    "ValidationState",
     "create_pantry",
 ]
@@ -0,0 +1,135 @@
+"""Wherein is contained the ArtifactCache class, a pantry scoped cache of
+parsed basket artifacts (manifest, supplement and metadata)."""
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from fsspec import AbstractFileSystem
+
+from .hash_cache import get_file_identity
+
+
+class ArtifactCache():
+    """A size bounded, least recently used cache of parsed basket artifacts.
+
+    Artifacts are keyed by their basket's address and file name. Copies of the
+    cached artifacts are returned, so callers may freely modify them.
+    """
+
+    def __init__(self, max_entries: int = 1024, **kwargs):
+        """Initializes the ArtifactCache.
+
+        Parameters
+        ----------
+        max_entries: int (default=1024)
+            Maximum number of artifacts kept in the cache. When exceeded, the
+            least recently used artifacts are evicted.
+        **validate: bool (default=False)
+            If True, the version (ETag or modification time) of an artifact
+            is checked against the cached version before each cache hit. This
+            costs a metadata request per access, but detects artifacts
+            modified outside of this pantry.
+        """
+        if not isinstance(max_entries, int):
+            raise TypeError(f"'max_entries' must be an int: '{max_entries}'")
+        if max_entries <= 0:
+            raise ValueError(
+                f"'max_entries' must be greater than zero: '{max_entries}'"
+            )
+        self.max_entries = max_entries
+        self.validate = kwargs.get("validate", False)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of artifacts in the cache."""
+        return len(self._entries)
+
+    @staticmethod
+    def _get_key(artifact_path: str) -> tuple[str, str]:
+        """Return the cache key (basket address, file name) of an artifact."""
+        artifact_path = os.path.normpath(artifact_path)
+        return os.path.dirname(artifact_path), os.path.basename(artifact_path)
+
+    def load(
+        self, file_system: AbstractFileSystem, artifact_path: str
+    ) -> dict:
+        """Return a parsed JSON artifact, reading it only on a cache miss.
+
+        Parameters
+        ----------
+        file_system: fsspec object
+            The file system hosting the artifact.
+        artifact_path: str
+            Path to the artifact, ie '{basket_address}/basket_metadata.json'.
+
+        Returns
+        ----------
+        The parsed artifact (dict).
+        """
+        key = self._get_key(artifact_path)
+        version = None
+        if self.validate:
+            version = get_file_identity(file_system, artifact_path)[1]
+
+        # Artifacts without a version cannot be validated, so they are read
+        # again.
+        with self._lock:
+            if key in self._entries and not (
+                self.validate and version is None
+            ):
+                cached_version, artifact = self._entries[key]
+                if cached_version == version:
+                    self._entries.move_to_end(key)
+                    return copy.deepcopy(artifact)
+
+        with file_system.open(artifact_path, "rb") as file:
+            artifact = json.load(file)
+        self.put(artifact_path, artifact, version=version)
+        return copy.deepcopy(artifact)
+
+    def put(self, artifact_path: str, artifact: dict, **kwargs):
+        """Add a parsed artifact to the cache.
+
+        Parameters
+        ----------
+        artifact_path: str
+            Path to the artifact.
+        artifact: dict
+            The parsed artifact.
+        **version: str (optional)
+            The version (see hash_cache.get_file_identity) of the artifact.
+            Required for cache hits when the cache validates versions.
+        """
+        key = self._get_key(artifact_path)
+        with self._lock:
+            self._entries[key] = (
+                kwargs.get("version", None), copy.deepcopy(artifact)
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, basket_address: str, file_name: str = None):
+        """Remove the cached artifacts of a basket.
+
+        Parameters
+        ----------
+        basket_address: str
+            The address (path) of the basket.
+        file_name: str (optional)
+            The file name of a single artifact to remove, ie
+            'basket_metadata.json'. Defaults to every artifact of the basket.
+        """
+        basket_address = os.path.normpath(basket_address)
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == basket_address and file_name in (None, key[1]):
+                    del self._entries[key]
+
+    def clear(self):
+        """Remove every artifact from the cache."""
+        with self._lock:
+            self._entries.clear()
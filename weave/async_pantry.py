@@ -0,0 +1,441 @@
+"""Wherein is contained the asynchronous (asyncio) facade of the Pantry and
+Basket classes."""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+from fsspec import AbstractFileSystem
+
+from .basket import Basket, get_basket_member_path
+from .config import prohibited_filenames
+from .index.index_sqlite import IndexSQLite
+from .mongo_loader import MongoLoader
+from .pantry import Pantry
+
+
+async def call_file_system(
+    file_system: AbstractFileSystem, method: str, *args, **kwargs
+):
+    """Await a file system method without blocking the event loop.
+
+    Natively async file systems (such as s3fs) have their coroutine method
+    (ie, _cat_file for cat_file) awaited directly when the file system was
+    created on the running loop, or scheduled on the file system's own loop
+    otherwise. Blocking file systems are called in a worker thread.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system to call.
+    method: str
+        Name of the (blocking) fsspec method, ie 'cat_file'.
+    *args, **kwargs:
+        Arguments passed to the method.
+
+    Returns
+    ----------
+    The result of the method.
+    """
+    if getattr(file_system, "async_impl", False):
+        coroutine = getattr(file_system, f"_{method}")(*args, **kwargs)
+        if file_system.asynchronous:
+            return await coroutine
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coroutine, file_system.loop)
+        )
+    return await asyncio.to_thread(
+        getattr(file_system, method), *args, **kwargs
+    )
+
+
+class AsyncPantry():
+    """An asyncio facade of a Pantry.
+
+    File system access is awaited through fsspec's async methods where the
+    file system supports them. Index (and mongo) operations are blocking in
+    every backend, so they are run on a single dedicated worker thread, which
+    also serializes them.
+    """
+
+    def __init__(self, pantry: Pantry):
+        """Initialize the AsyncPantry object.
+
+        Parameters
+        ----------
+        pantry: weave.Pantry
+            The pantry to provide asynchronous access to.
+        """
+        if not isinstance(pantry, Pantry):
+            raise TypeError(f"'pantry' must be a weave.Pantry: '{pantry}'")
+        self.pantry = pantry
+        self.file_system = pantry.file_system
+        self._index_executor = ThreadPoolExecutor(max_workers=1)
+        self._index = pantry.index
+        if isinstance(pantry.index, IndexSQLite):
+            # SQLite connections can only be used by the thread that opened
+            # them, so the worker thread opens its own connection to the db.
+            self._index = self._index_executor.submit(
+                IndexSQLite,
+                pantry.index.file_system,
+                pantry.index.pantry_path,
+                db_path=pantry.index.db_path,
+                track_metadata=pantry.index.track_metadata,
+            ).result()
+
+    async def __aenter__(self):
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(self, *args):
+        """Exit the async context manager, shutting down the worker."""
+        self.close()
+
+    def close(self):
+        """Shut down the worker thread used for index operations."""
+        if self._index is not self.pantry.index:
+            # Close the worker thread's connection in the thread it was
+            # opened in.
+            self._index_executor.submit(self._index.con.close).result()
+            self._index = self.pantry.index
+        self._index_executor.shutdown(wait=True)
+
+    async def _run_in_index_thread(self, function, *args, **kwargs):
+        """Run a blocking function on the index worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._index_executor, lambda: function(*args, **kwargs)
+        )
+
+    async def upload_basket(
+        self, upload_items: list[dict], basket_type: str, **kwargs
+    ) -> pd.DataFrame:
+        """Upload a basket to the pantry. See Pantry.upload_basket.
+
+        The files are uploaded in a worker thread, then the basket is tracked
+        on the index worker thread.
+
+        Returns
+        ----------
+        A single row pd.DataFrame containing the new basket's index row.
+        """
+        if self.pantry.is_read_only:
+            raise ValueError(
+                "Unable to upload a basket to a read-only file system."
+            )
+        metadata = kwargs.get("metadata", {})
+        # pylint: disable-next=protected-access
+        upload = await asyncio.to_thread(
+            self.pantry._upload_basket_to_fs,
+            upload_items,
+            basket_type,
+            **kwargs,
+        )
+        index_row = upload.get_index_row()
+
+        def track_basket():
+            self._index.track_basket(
+                index_row.copy(),
+                basket_metadata={index_row.iloc[0].uuid: metadata},
+            )
+            if self.pantry.mongo_client is not None:
+                MongoLoader(self.pantry).load_mongo(
+                    index_row.iloc[0].uuid, metadata_dict=metadata
+                )
+
+        await self._run_in_index_thread(track_basket)
+        return index_row
+
+    async def get_basket(self, basket_address: str) -> "AsyncBasket":
+        """Retrieves a basket of given UUID or path.
+
+        Parameters
+        ----------
+        basket_address: str
+            Argument can take one of two forms: either a path to the Basket
+            directory, or the UUID of the basket.
+
+        Returns
+        ----------
+        The AsyncBasket associated with the given UUID or path.
+        """
+        row = await self.get_rows(basket_address)
+        if len(row) == 0:
+            raise ValueError(f"Basket does not exist: {basket_address}")
+        self.pantry.validate_path_in_pantry(row.iloc[0].address)
+        return await AsyncBasket.from_path(row.iloc[0].address, self)
+
+    async def get_rows(self, basket_address: str, **kwargs) -> pd.DataFrame:
+        """See IndexABC.get_rows."""
+        return await self._run_in_index_thread(
+            self._index.get_rows, basket_address, **kwargs
+        )
+
+    async def get_parents(
+        self, basket_address: str, **kwargs
+    ) -> pd.DataFrame:
+        """See IndexABC.get_parents."""
+        return await self._run_in_index_thread(
+            self._index.get_parents, basket_address, **kwargs
+        )
+
+    async def get_children(
+        self, basket_address: str, **kwargs
+    ) -> pd.DataFrame:
+        """See IndexABC.get_children."""
+        return await self._run_in_index_thread(
+            self._index.get_children, basket_address, **kwargs
+        )
+
+    async def get_baskets_of_type(
+        self, basket_type: str, **kwargs
+    ) -> pd.DataFrame:
+        """See IndexABC.get_baskets_of_type."""
+        return await self._run_in_index_thread(
+            self._index.get_baskets_of_type, basket_type, **kwargs
+        )
+
+    async def get_baskets_of_label(
+        self, basket_label: str, **kwargs
+    ) -> pd.DataFrame:
+        """See IndexABC.get_baskets_of_label."""
+        return await self._run_in_index_thread(
+            self._index.get_baskets_of_label, basket_label, **kwargs
+        )
+
+    async def get_baskets_by_upload_time(self, **kwargs) -> pd.DataFrame:
+        """See IndexABC.get_baskets_by_upload_time."""
+        return await self._run_in_index_thread(
+            self._index.get_baskets_by_upload_time, **kwargs
+        )
+
+    async def query(self, expr, **kwargs) -> pd.DataFrame:
+        """See IndexABC.query."""
+        return await self._run_in_index_thread(
+            self._index.query, expr, **kwargs
+        )
+
+    async def to_pandas_df(self, **kwargs) -> pd.DataFrame:
+        """See IndexABC.to_pandas_df."""
+        return await self._run_in_index_thread(
+            self._index.to_pandas_df, **kwargs
+        )
+
+
+class AsyncBasket():
+    """An asyncio facade of a Basket.
+
+    Use AsyncPantry.get_basket or AsyncBasket.from_path to create one, as
+    loading a basket requires awaiting the file system.
+    """
+
+    def __init__(
+        self, basket_path: str, pantry: AsyncPantry, manifest: dict
+    ):
+        """Initializes the AsyncBasket from an already loaded manifest.
+
+        Parameters
+        ----------
+        basket_path: str
+            Path to the basket directory.
+        pantry: weave.AsyncPantry
+            The pantry the basket belongs to.
+        manifest: dict
+            The basket's manifest.
+        """
+        self.basket_path = os.fspath(basket_path)
+        self.pantry = pantry
+        self.file_system = pantry.file_system
+        self.manifest_path = os.path.join(
+            self.basket_path, "basket_manifest.json"
+        )
+        self.supplement_path = os.path.join(
+            self.basket_path, "basket_supplement.json"
+        )
+        self.metadata_path = os.path.join(
+            self.basket_path, "basket_metadata.json"
+        )
+
+        self.manifest = manifest
+        self.supplement = None
+        self.metadata = None
+        self.uuid = self.manifest["uuid"]
+        self.upload_time = self.manifest["upload_time"]
+        self.parent_uuids = self.manifest["parent_uuids"]
+        self.basket_type = self.manifest["basket_type"]
+        self.label = self.manifest["label"]
+        self.weave_version = self.manifest.get("weave_version", "<0.13.0")
+        self.address = self.basket_path
+        self.storage_type = self.file_system.__class__.__name__
+
+    @classmethod
+    async def from_path(
+        cls, basket_path: str, pantry: AsyncPantry
+    ) -> "AsyncBasket":
+        """Load and validate the basket at the given path.
+
+        Parameters
+        ----------
+        basket_path: str
+            Path to the basket directory.
+        pantry: weave.AsyncPantry
+            The pantry the basket belongs to.
+
+        Returns
+        ----------
+        The loaded AsyncBasket.
+        """
+        basket_path = os.fspath(basket_path)
+        file_system = pantry.file_system
+        manifest_path = os.path.join(basket_path, "basket_manifest.json")
+        supplement_path = os.path.join(basket_path, "basket_supplement.json")
+
+        basket_exists, supplement_exists = await asyncio.gather(
+            call_file_system(file_system, "exists", basket_path),
+            call_file_system(file_system, "exists", supplement_path),
+        )
+        if not basket_exists:
+            raise ValueError(f"Basket does not exist: {basket_path}")
+        if not supplement_exists:
+            raise FileNotFoundError(
+                f"Invalid Basket, basket_supplement.json "
+                f"does not exist: {supplement_path}"
+            )
+        try:
+            manifest = json.loads(await call_file_system(
+                file_system, "cat_file", manifest_path
+            ))
+        except FileNotFoundError as error:
+            raise FileNotFoundError(
+                f"Invalid Basket, basket_manifest.json "
+                f"does not exist: {manifest_path}"
+            ) from error
+        return cls(basket_path, pantry, manifest)
+
+    async def get_manifest(self) -> dict:
+        """Return basket_manifest.json as a python dictionary."""
+        return self.manifest
+
+    async def get_supplement(self) -> dict:
+        """Return basket_supplement.json as a python dictionary."""
+        if self.supplement is None:
+            supplement = json.loads(await call_file_system(
+                self.file_system, "cat_file", self.supplement_path
+            ))
+            # Load the entries of the integrity data sidecar, if any.
+            if "integrity_data_file" in supplement:
+                sidecar = await call_file_system(
+                    self.file_system,
+                    "cat_file",
+                    os.path.join(
+                        self.basket_path, supplement["integrity_data_file"]
+                    ),
+                )
+                supplement["integrity_data"] = supplement[
+                    "integrity_data"
+                ] + [
+                    json.loads(line)
+                    for line in sidecar.decode("utf-8").splitlines()
+                    if line.strip()
+                ]
+            self.supplement = supplement
+        return self.supplement
+
+    async def get_metadata(self) -> dict:
+        """Return basket_metadata.json as a python dictionary.
+
+        Return None if metadata doesn't exist.
+        """
+        if self.metadata is None:
+            try:
+                self.metadata = json.loads(await call_file_system(
+                    self.file_system, "cat_file", self.metadata_path
+                ))
+            except FileNotFoundError:
+                return None
+        return self.metadata
+
+    async def read_range(
+        self,
+        relative_path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> bytes:
+        """Read a range of bytes of a file in the basket. See
+        Basket.read_range.
+        """
+        return await call_file_system(
+            self.file_system, "cat_file",
+            get_basket_member_path(self.basket_path, relative_path),
+            start=start, end=end,
+        )
+
+    # Disabling pylint name warning for ls, as it is the standard name
+    # for functions of it's type in the computing world.
+    # pylint: disable-next=invalid-name
+    async def ls(self, relative_path: Optional[str] = None) -> list:
+        """List directories and files in the basket. See Basket.ls."""
+        ls_path = self.basket_path
+        if relative_path is not None:
+            ls_path = os.path.join(self.basket_path, os.fspath(relative_path))
+
+        ls_kwargs = {"detail": False}
+        if self.file_system.__class__.__name__ == "S3FileSystem":
+            # S3FileSystem.ls can have unpredictable behavior if not passing
+            # refresh=True
+            ls_kwargs["refresh"] = True
+        ls_results = await call_file_system(
+            self.file_system, "ls", ls_path, **ls_kwargs
+        )
+
+        if relative_path is None:
+            # Remove any prohibited files from the list if they exist in the
+            # root directory.
+            return [
+                x
+                for x in ls_results
+                if os.path.basename(Path(x)) not in prohibited_filenames
+            ]
+        return ls_results
+
+    async def download(
+        self,
+        destination_path: Optional[str] = None,
+        include_artifacts: bool = False,
+        **kwargs,
+    ):
+        """Download the basket's contents to a local directory.
+
+        The download is delegated to Basket.download in a worker thread, so
+        it supports the same resuming, verification and retries.
+
+        Parameters
+        ----------
+        destination_path: str (default=os.getcwd())
+            The directory where the basket will be downloaded.
+        include_artifacts: bool (default=False)
+            If True, the basket's artifacts (manifest, supplement, metadata)
+            will be downloaded to the destination path.
+        **max_workers: int (optional)
+            Maximum number of files downloaded concurrently.
+        **resume: bool (default=False)
+            If True, files which were already downloaded are skipped. See
+            Basket.download.
+        **verify: bool (default=False)
+            If True, each file is checked against the basket's integrity
+            data while it is downloaded. See Basket.download.
+        **retries: int (default=2)
+            Number of times a file which fails verification is downloaded
+            again.
+        """
+        if destination_path is None:
+            destination_path = os.getcwd()
+
+        def download():
+            basket = Basket(self.basket_path, pantry=self.pantry.pantry)
+            basket.download(destination_path, include_artifacts, **kwargs)
+
+        await asyncio.to_thread(download)
@@ -0,0 +1,340 @@
+"""Wherein is contained functionality concerning auditing the integrity of the
+files stored in a pantry, by hashing them again."""
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .hashing import get_hash_kwargs, hash_file
+from .supplement import iter_integrity_data
+from .validation_report import ValidationRecord, ValidationReport
+
+# Number of baskets read from the index at a time.
+_AUDIT_BATCH_SIZE = 1000
+# Maximum number of files submitted to the workers, whose result has not been
+# collected, at a time.
+_AUDIT_MAX_PENDING_FILES = 1000
+
+
+class RateLimiter():
+    """Limit the rate of an operation shared by several threads.
+
+    Each call to acquire reserves the next free time slot for its amount, and
+    sleeps until the slot begins, so the average rate never exceeds the
+    limit.
+    """
+
+    def __init__(self, rate: float = None):
+        """Initializes the RateLimiter.
+
+        Parameters
+        ----------
+        rate: float (optional)
+            Maximum amount per second. Defaults to no limit.
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError(f"'rate' must be greater than zero: '{rate}'")
+        self.rate = rate
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1):
+        """Wait until the amount can be used without exceeding the rate."""
+        if self.rate is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + amount / self.rate
+        time.sleep(start - now)
+
+
+def audit_pantry(pantry, **kwargs) -> ValidationReport:
+    """Hash the stored files of the pantry's baskets again, and compare them
+    with the hashes recorded in the baskets' integrity data.
+
+    Each file is hashed the way it was at upload (hash_mode, byte_count,
+    chunk_size and hash_algorithm of its integrity data), so sampled files
+    only have their sampled bytes read. Files are audited concurrently,
+    across baskets and within them.
+
+    Parameters
+    ----------
+    pantry: weave.Pantry
+        Pantry to be audited.
+    **basket_uuids: [str] (optional)
+        UUIDs of the baskets to audit. Defaults to every basket in the index.
+    **max_workers: int (optional)
+        Maximum number of files audited concurrently. Defaults to the
+        ThreadPoolExecutor default.
+    **max_bytes_per_second: float (optional)
+        Maximum number of bytes read per second, across every worker.
+    **max_files_per_second: float (optional)
+        Maximum number of files hashed per second, across every worker.
+    **checkpoint_path: str (optional)
+        Path of a local JSON Lines file the result of each audited basket is
+        appended to. If the file exists, the baskets in it are not audited
+        again, and their results are added to the report, so an interrupted
+        audit can be resumed.
+
+    Returns
+    ----------
+    A ValidationReport with a record of every problem found. The corrupted
+    baskets are listed in its invalid_baskets.
+    """
+    limiters = (
+        RateLimiter(kwargs.get("max_bytes_per_second", None)),
+        RateLimiter(kwargs.get("max_files_per_second", None)),
+    )
+    checkpoint_path = kwargs.get("checkpoint_path", None)
+
+    report = ValidationReport()
+    audited = set()
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        audited = _load_checkpoint(checkpoint_path, report)
+
+    checkpoint = None
+    if checkpoint_path is not None:
+        # pylint: disable-next=consider-using-with
+        checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+    # Baskets whose files are being audited, and their pending files, in the
+    # order they were submitted.
+    baskets = deque()
+    files = deque()
+
+    def collect_file():
+        """Add the result of the oldest pending file to its basket."""
+        basket, upload_path, future = files.popleft()
+        basket.pending_files -= 1
+        try:
+            problem = future.result()
+        except KeyError:
+            basket.add_unreadable_supplement()
+            return
+        if problem is not None:
+            basket.records.append(ValidationRecord(
+                *problem, upload_path, basket=basket.address
+            ))
+
+    def finish_baskets():
+        """Report the baskets whose files have all been audited, in order."""
+        while (
+            baskets and baskets[0].listed and baskets[0].pending_files == 0
+        ):
+            basket = baskets.popleft()
+            duration = time.perf_counter() - basket.start
+            report.add_basket(basket.address, basket.records, duration)
+            audited.add(basket.uuid)
+            if checkpoint is not None:
+                checkpoint.write(json.dumps({
+                    "uuid": basket.uuid,
+                    "address": basket.address,
+                    "duration": duration,
+                    "records": [x.to_dict() for x in basket.records],
+                }) + "\n")
+                checkpoint.flush()
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=kwargs.get("max_workers", None)
+        ) as executor:
+            for rows in _get_index_batches(
+                pantry, kwargs.get("basket_uuids", None)
+            ):
+                rows = rows[~rows["uuid"].isin(audited)]
+                for basket_uuid, address in zip(
+                    rows["uuid"], rows["address"]
+                ):
+                    basket = _BasketAudit(basket_uuid, address)
+                    baskets.append(basket)
+                    for upload_path, file_data in basket.iter_files(
+                        pantry.file_system
+                    ):
+                        files.append((
+                            basket,
+                            upload_path,
+                            executor.submit(
+                                _audit_file,
+                                file_data,
+                                pantry.file_system,
+                                limiters,
+                            ),
+                        ))
+                        basket.pending_files += 1
+                        # Bound the number of pending files, so the integrity
+                        # data of large baskets is not all held in memory.
+                        if len(files) > _AUDIT_MAX_PENDING_FILES:
+                            collect_file()
+                            finish_baskets()
+                    finish_baskets()
+            while files:
+                collect_file()
+                finish_baskets()
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    return report
+
+
+class _BasketAudit():
+    """The audit of a basket, whose files are audited concurrently."""
+
+    def __init__(self, basket_uuid: str, address: str):
+        """Initializes the _BasketAudit.
+
+        Parameters
+        ----------
+        basket_uuid: str
+            UUID of the basket.
+        address: str
+            Address of the basket in the pantry.
+        """
+        self.uuid = basket_uuid
+        self.address = address
+        self.records = []
+        self.start = time.perf_counter()
+        # Number of files submitted whose result has not been collected.
+        self.pending_files = 0
+        # Whether every file of the basket has been submitted.
+        self.listed = False
+
+    def iter_files(self, file_system):
+        """Yield the upload path and integrity data of the basket's stored
+        files.
+
+        The integrity data is read one entry at a time, if it is stored in
+        a sidecar. If the supplement cannot be read, it is recorded, and no
+        more files are yielded.
+        """
+        supplement_path = os.path.join(
+            self.address, "basket_supplement.json"
+        )
+        try:
+            for file_data in iter_integrity_data(
+                file_system, supplement_path
+            ):
+                # Stubs are not uploaded, so there is nothing to hash.
+                if not file_data["stub"]:
+                    yield file_data["upload_path"], file_data
+        except (OSError, KeyError, json.decoder.JSONDecodeError):
+            self.add_unreadable_supplement()
+        self.listed = True
+
+    def add_unreadable_supplement(self):
+        """Record that the basket's supplement could not be read."""
+        supplement_path = os.path.join(
+            self.address, "basket_supplement.json"
+        )
+        if any(x.path == supplement_path for x in self.records):
+            return
+        self.records.append(ValidationRecord(
+            "unreadable_supplement",
+            "Basket supplement could not be read at: ",
+            supplement_path,
+            basket=self.address,
+        ))
+
+
+def _load_checkpoint(checkpoint_path: str, report: ValidationReport) -> set:
+    """Add the results of a checkpoint to the report.
+
+    Returns
+    ----------
+    The set of uuids of the baskets in the checkpoint.
+    """
+    audited = set()
+    line = ""
+    with open(checkpoint_path, "r", encoding="utf-8") as checkpoint:
+        for line in checkpoint:
+            try:
+                result = json.loads(line)
+            except json.decoder.JSONDecodeError:
+                # The last line may be incomplete if the audit was killed.
+                continue
+            report.add_basket(
+                result["address"],
+                [ValidationRecord.from_dict(x) for x in result["records"]],
+                result["duration"],
+            )
+            audited.add(result["uuid"])
+
+    # Start the results of this audit on a new line, after any incomplete
+    # line.
+    if line and not line.endswith("\n"):
+        with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            checkpoint.write("\n")
+    return audited
+
+
+def _get_index_batches(pantry, basket_uuids: list = None):
+    """Yield the index rows of the baskets to audit, in batches."""
+    if basket_uuids is not None:
+        for i in range(0, len(basket_uuids), _AUDIT_BATCH_SIZE):
+            rows = pantry.index.get_rows(
+                list(basket_uuids[i:i + _AUDIT_BATCH_SIZE])
+            )
+            yield rows[rows["uuid"].isin(basket_uuids)]
+        return
+
+    offset = 0
+    while True:
+        rows = pantry.index.to_pandas_df(
+            max_rows=_AUDIT_BATCH_SIZE, offset=offset
+        )
+        if len(rows) == 0:
+            return
+        yield pd.DataFrame(rows)
+        offset += len(rows)
+
+
+def _audit_file(
+    file_data: dict, file_system, limiters: tuple
+) -> tuple[str, str] | None:
+    """Hash a stored file, and compare it with its integrity data.
+
+    Returns
+    ----------
+    None if the file matches its integrity data, otherwise a tuple of the
+    code and message of the problem.
+    """
+    file_size = file_data["file_size"]
+    byte_limiter, file_limiter = limiters
+    file_limiter.acquire()
+
+    try:
+        if file_system.size(file_data["upload_path"]) != file_size:
+            return (
+                "file_size_mismatch",
+                "File size in the file system does not match "
+                "the basket_supplement.json: ",
+            )
+        file_hash = hash_file(
+            file_system,
+            file_data["upload_path"],
+            file_size,
+            file_data["byte_count"],
+            # The bytes are throttled as they are read.
+            on_read=byte_limiter.acquire,
+            **get_hash_kwargs(file_data),
+        )
+    except FileNotFoundError:
+        return (
+            "file_not_in_file_system",
+            "File listed in the basket_supplement.json does not "
+            "exist in the file system: ",
+        )
+    except OSError:
+        return ("unreadable_file", "Stored file could not be read: ")
+
+    if file_hash != file_data["hash"]:
+        return (
+            "hash_mismatch",
+            "Stored file does not match its hash in "
+            "the basket_supplement.json: ",
+        )
+    return None
@@ -4,20 +4,66 @@ import json
 import os
 import uuid
 import importlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional
 
 import pandas as pd
 import s3fs
+from fsspec.implementations.local import LocalFileSystem
 
 from .mongo_loader import MongoLoader
 from .config import get_file_system, prohibited_filenames
 from .validate import validate_basket_in_place_directory
 from .validate import validate_basket_in_place_directory_backward
+from .hashing import (DEFAULT_BUFFER_SIZE, StreamHasher, get_hash_kwargs,
+                      hash_file)
+from .supplement import iter_integrity_data, load_supplement
 from .upload import derive_integrity_data
 
 
+def _is_downloaded(
+    local_path: str, file_size: Optional[int], integrity_data: dict = None
+) -> bool:
+    """Return True if a downloaded file has the expected size and, if
+    integrity data is given, the expected hash.
+    """
+    if not os.path.isfile(local_path):
+        return False
+    if file_size is not None and os.path.getsize(local_path) != file_size:
+        return False
+    if integrity_data is None:
+        return True
+    return integrity_data["hash"] == hash_file(
+        LocalFileSystem(),
+        local_path,
+        integrity_data["file_size"],
+        integrity_data["byte_count"],
+        **get_hash_kwargs(integrity_data),
+    )
+
+
+def get_basket_member_path(basket_path: str, relative_path: str) -> str:
+    """Return the path of a file in a basket, given its path relative to the
+    basket directory.
+
+    Raises a ValueError if the path leads outside of the basket.
+    """
+    relative_path = os.path.normpath(os.fspath(relative_path))
+    if (
+        os.path.isabs(relative_path)
+        or relative_path == os.pardir
+        or relative_path.startswith(os.pardir + os.sep)
+    ):
+        raise ValueError(
+            "Attempting to access a file outside of the basket: "
+            f"{relative_path}"
+        )
+    return os.path.join(os.fspath(basket_path), relative_path)
+
+
 class BasketInitializer:
     """Initializes basket class. Validates input args."""
 
@@ -56,6 +102,11 @@ class BasketInitializer:
                     "is not in kwargs."
                 ) from error
             self.set_up_basket_from_uuid(basket_address, kwargs["pantry"])
+        self._set_artifact_paths()
+        self.validate()
+
+    def _set_artifact_paths(self):
+        """Set the paths of the basket's artifacts from the basket path."""
         if "zip" in str(type(self.file_system)) and os.name == "nt":
             self.manifest_path = "/".join(
                 [self.basket_path, "basket_manifest.json"]
@@ -76,7 +127,6 @@ class BasketInitializer:
             self.metadata_path = os.path.join(
                 self.basket_path, "basket_metadata.json"
             )
-        self.validate()
 
     def _set_up_basket_from_path(self, basket_address: str):
         """Attempts to set up a basket from a filepath.
@@ -178,9 +228,88 @@ class Basket(BasketInitializer):
         self.manifest = None
         self.supplement = None
         self.metadata = None
+        self._is_validated = True
         self.get_manifest()
         self.populate_members()
 
+    @classmethod
+    def from_index_row(cls, index_row, **kwargs) -> "Basket":
+        """Lazily construct a Basket from a row of the pantry's index.
+
+        No storage is accessed: the basket's members (uuid, basket_type,
+        label, etc) are populated from the index row, and the basket's
+        existence is only validated, and its artifacts only read, when they
+        are first needed (ie, by get_manifest, get_supplement, ls, download).
+
+        Note that upload_time is taken from the index, so its precision and
+        format depend on the index backend.
+
+        Parameters
+        ----------
+        index_row: pd.Series or single row pd.DataFrame
+            A row of the index, as returned by the index's get_rows,
+            to_pandas_df or query methods.
+        **pantry: weave.Pantry (optional)
+            The pantry the basket belongs to.
+        **file_system: fsspec object (optional)
+            The file system hosting the basket. Defaults to the pantry's
+            file system, or get_file_system() if no pantry is given.
+
+        Returns
+        ----------
+        The lazily loaded Basket.
+        """
+        if isinstance(index_row, pd.DataFrame):
+            if len(index_row) != 1:
+                raise ValueError(
+                    "'index_row' must contain exactly one row: "
+                    f"{len(index_row)} rows given"
+                )
+            index_row = index_row.iloc[0]
+
+        basket = cls.__new__(cls)
+        if "pantry" in kwargs:
+            basket.pantry = kwargs["pantry"]
+        basket.file_system = kwargs.get(
+            "file_system",
+            getattr(kwargs.get("pantry"), "file_system", None),
+        )
+        if basket.file_system is None:
+            basket.file_system = get_file_system()
+
+        basket.basket_path = os.fspath(index_row["address"])
+        if "zip" in str(type(basket.file_system)) and os.name == "nt":
+            basket.basket_path = Path(basket.basket_path).as_posix()
+        basket._set_artifact_paths()
+
+        basket.manifest = None
+        basket.supplement = None
+        basket.metadata = None
+        basket._is_validated = False
+
+        upload_time = index_row["upload_time"]
+        basket.uuid = index_row["uuid"]
+        basket.upload_time = (
+            upload_time.isoformat() if hasattr(upload_time, "isoformat")
+            else upload_time
+        )
+        basket.parent_uuids = list(index_row["parent_uuids"])
+        basket.basket_type = index_row["basket_type"]
+        basket.label = index_row["label"]
+        basket.weave_version = index_row.get("weave_version", "<0.13.0")
+        basket.address = basket.basket_path
+        basket.storage_type = index_row.get(
+            "storage_type", basket.file_system.__class__.__name__
+        )
+        return basket
+
+    def _validate_if_needed(self):
+        """Validate the basket on first access, if it was lazily loaded."""
+        if not self._is_validated:
+            self.validate_basket_path()
+            self.validate()
+            self._is_validated = True
+
     def populate_members(self):
         """Populate the Basket_Class member variables."""
         self.uuid = self.manifest["uuid"]
@@ -197,18 +326,44 @@ class Basket(BasketInitializer):
         if self.manifest is not None:
             return self.manifest
 
-        with self.file_system.open(self.manifest_path, "rb") as file:
-            self.manifest = json.load(file)
-            return self.manifest
+        self._validate_if_needed()
+        self.manifest = self._load_json_artifact(self.manifest_path)
+        return self.manifest
 
     def get_supplement(self) -> dict:
-        """Return basket_supplement.json as a python dictionary."""
+        """Return basket_supplement.json as a python dictionary.
+
+        If the integrity data is stored in a sidecar, its entries are loaded
+        into the integrity_data. Use iter_integrity_data to read them one at
+        a time instead.
+        """
         if self.supplement is not None:
             return self.supplement
 
-        with self.file_system.open(self.supplement_path, "rb") as file:
-            self.supplement = json.load(file)
-            return self.supplement
+        self._validate_if_needed()
+        self.supplement = load_supplement(
+            self.file_system,
+            self.supplement_path,
+            self._load_json_artifact(self.supplement_path),
+        )
+        return self.supplement
+
+    def iter_integrity_data(self):
+        """Yield the integrity data of each file in the basket.
+
+        If the integrity data is stored in a sidecar, it is read one entry at
+        a time, so it is never all held in memory.
+        """
+        if self.supplement is not None:
+            yield from self.supplement["integrity_data"]
+            return
+
+        self._validate_if_needed()
+        yield from iter_integrity_data(
+            self.file_system,
+            self.supplement_path,
+            self._load_json_artifact(self.supplement_path),
+        )
 
     def get_metadata(self) -> dict:
         """Return basket_metadata.json as a python dictionary.
@@ -218,6 +373,13 @@ class Basket(BasketInitializer):
         if self.metadata is not None:
             return self.metadata
 
+        self._validate_if_needed()
+        if self._get_artifact_cache() is not None:
+            try:
+                self.metadata = self._load_json_artifact(self.metadata_path)
+            except FileNotFoundError:
+                return None
+            return self.metadata
         if self.file_system.exists(self.metadata_path):
             with self.file_system.open(self.metadata_path, "rb") as file:
                 self.metadata = json.load(file)
@@ -225,6 +387,96 @@ class Basket(BasketInitializer):
         else:
             return None
 
+    def _get_artifact_cache(self):
+        """Return the pantry's ArtifactCache, or None if there isn't one."""
+        return getattr(getattr(self, "pantry", None), "artifact_cache", None)
+
+    def _load_json_artifact(self, artifact_path: str) -> dict:
+        """Load a JSON artifact, through the pantry's artifact cache if the
+        pantry has one."""
+        artifact_cache = self._get_artifact_cache()
+        if artifact_cache is not None:
+            return artifact_cache.load(self.file_system, artifact_path)
+        with self.file_system.open(artifact_path, "rb") as file:
+            return json.load(file)
+
+    def open(self, relative_path: str, mode: str = "rb", **kwargs):
+        """Open a file in the basket for reading, without downloading it.
+
+        The file is read from the file system on demand, so only the blocks
+        which are read (plus any read-ahead) are transferred.
+
+        Parameters
+        ----------
+        relative_path: str
+            Path of the file, relative to the basket directory.
+        mode: str (default="rb")
+            Either 'rb' or 'r' (text mode).
+        **block_size: int (optional)
+            Size in bytes of each read from the file system. Defaults to the
+            file system's default block size.
+        **cache_type: str (optional)
+            The fsspec caching strategy of the file, ie 'readahead' (good for
+            streaming), 'blockcache' or 'bytes' (good for random access), or
+            'none'. Defaults to the file system's default.
+        **cache_options: dict (optional)
+            Options of the cache, ie {"maxblocks": 32} for 'blockcache'.
+        **encoding: str (optional)
+            Encoding used in text mode.
+
+        Returns
+        ----------
+        A read-only file-like object.
+        """
+        if mode not in ("rb", "r"):
+            raise ValueError(f"'mode' must be 'rb' or 'r': '{mode}'")
+        self._validate_if_needed()
+        open_kwargs = {
+            key: kwargs[key]
+            for key in ("block_size", "cache_type", "cache_options",
+                        "encoding")
+            if key in kwargs
+        }
+        return self.file_system.open(
+            get_basket_member_path(self.basket_path, relative_path),
+            mode,
+            **open_kwargs,
+        )
+
+    def read_range(
+        self,
+        relative_path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> bytes:
+        """Read a range of bytes of a file in the basket.
+
+        Only the requested range is transferred (ie a single ranged request
+        on object stores).
+
+        Parameters
+        ----------
+        relative_path: str
+            Path of the file, relative to the basket directory.
+        start: int (optional)
+            Offset of the first byte to read. Negative values are relative to
+            the end of the file. Defaults to the beginning of the file.
+        end: int (optional)
+            Offset of the byte after the last byte to read. Negative values
+            are relative to the end of the file. Defaults to the end of the
+            file.
+
+        Returns
+        ----------
+        The bytes read (bytes).
+        """
+        self._validate_if_needed()
+        return self.file_system.cat_file(
+            get_basket_member_path(self.basket_path, relative_path),
+            start=start,
+            end=end,
+        )
+
     # Disabling pylint name warning for ls, as it is the standard name
     # for functions of it's type in the computing world. It makes
     # sense to continue to name this function ls.
@@ -252,6 +504,7 @@ class Basket(BasketInitializer):
         ---------
         filesystem.ls results of the basket.
         """
+        self._validate_if_needed()
 
         ls_path = os.fspath(Path(self.basket_path))
         # Most fsspec implementations default detail to False, but explicitly
@@ -309,9 +562,16 @@ class Basket(BasketInitializer):
         self,
         destination_path: str = os.getcwd(),
         include_artifacts: bool = False,
+        **kwargs,
     ):
         """Download the basket's contents to a local directory.
 
+        The basket is downloaded to '{destination_path}/{uuid}'. The files to
+        download are taken from the basket's supplement (falling back to
+        listing the basket if the supplement does not record them), and are
+        transferred concurrently. Each file is written to a temporary
+        '.part' file first, so interrupted downloads can be resumed.
+
         Parameters
         ----------
         destination_path: str (default=os.getcwd())
@@ -319,24 +579,156 @@ class Basket(BasketInitializer):
         include_artifacts: bool (default=False)
             If True, the basket's artifacts (manifest, supplement, metadata)
             will be downloaded to the destination path.
+        **max_workers: int (optional)
+            Maximum number of files downloaded concurrently.
+        **resume: bool (default=False)
+            If True, the basket may already be (partially) downloaded, and
+            files which already exist locally with the expected size (and
+            hash, if verifying) are not downloaded again.
+        **verify: bool (default=False)
+            If True, each file is hashed while it is downloaded (in a single
+            streaming pass, using the hash mode, byte_count and algorithm of
+            its integrity data) and checked against the basket's integrity
+            data. Files which still do not match after the retries are
+            removed, and a ValueError listing them is raised.
+        **retries: int (default=2)
+            Number of times a file which fails verification is downloaded
+            again.
         """
-        destination_path = os.fspath(destination_path)
-        if os.path.exists(os.path.join(destination_path, self.uuid)):
+        self._validate_if_needed()
+        resume = kwargs.get("resume", False)
+        verify = kwargs.get("verify", False)
+        retries = kwargs.get("retries", 2)
+        destination_path = os.path.join(
+            os.fspath(destination_path), self.uuid
+        )
+        if os.path.exists(destination_path) and not resume:
             raise FileExistsError(
-                f"Destination path {os.path.join(destination_path, self.uuid)}"
+                f"Destination path {destination_path}"
                 " already exists. Please choose a different destination path."
             )
+        os.makedirs(destination_path, exist_ok=True)
+
+        downloads = self._get_files_to_download(include_artifacts)
+
+        def download_file(download):
+            relative_path, remote_path, file_size, integrity_data = download
+            local_path = os.path.join(destination_path, relative_path)
+            if resume and _is_downloaded(
+                local_path, file_size, integrity_data if verify else None
+            ):
+                return None
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            # Download to a temporary file, so a partial file is never
+            # mistaken for a complete one when resuming.
+            part_path = f"{local_path}.part"
+            if not verify or integrity_data is None:
+                self.file_system.get_file(remote_path, part_path)
+                os.replace(part_path, local_path)
+                return None
+            for _ in range(retries + 1):
+                if self._download_and_hash(
+                    remote_path, part_path, integrity_data
+                ) == integrity_data["hash"]:
+                    os.replace(part_path, local_path)
+                    return None
+            os.remove(part_path)
+            return relative_path
+
+        with ThreadPoolExecutor(
+            max_workers=kwargs.get("max_workers", None)
+        ) as pool:
+            corrupted = [
+                path for path in pool.map(download_file, downloads)
+                if path is not None
+            ]
+        if corrupted:
+            raise ValueError(
+                "Downloaded files do not match the basket's integrity data: "
+                f"{corrupted}"
+            )
+
+    def _download_and_hash(
+        self, remote_path: str, local_path: str, integrity_data: dict
+    ) -> str:
+        """Download a file, hashing it as it is written.
+
+        Returns
+        ----------
+        The hash of the downloaded file, derived as in its integrity data.
+        """
+        hasher = StreamHasher(
+            integrity_data["file_size"],
+            integrity_data["byte_count"],
+            **get_hash_kwargs(integrity_data),
+        )
+        with self.file_system.open(remote_path, "rb") as source:
+            with open(local_path, "wb") as destination:
+                while True:
+                    data = source.read(DEFAULT_BUFFER_SIZE)
+                    if not data:
+                        break
+                    hasher.update(data)
+                    destination.write(data)
+        return hasher.hexdigest()
+
+    def _get_files_to_download(self, include_artifacts: bool) -> list[tuple]:
+        """Return the files of the basket to download.
+
+        Returns
+        ----------
+        A list of (relative path, remote path, file size, integrity data)
+        tuples. The integrity data is None for files not in the supplement.
+        """
+        # pylint: disable-next=protected-access
+        strip_protocol = self.file_system._strip_protocol
+        basket_path = strip_protocol(os.fspath(self.basket_path))
+
+        downloads = []
+        for integrity_data in self.iter_integrity_data():
+            if integrity_data.get("stub", False):
+                continue
+            upload_path = integrity_data.get("upload_path", None)
+            relative_path = None
+            if upload_path is not None:
+                relative_path = os.path.relpath(
+                    strip_protocol(upload_path), basket_path
+                )
+            if relative_path is None or relative_path.startswith(".."):
+                # The supplement doesn't record where the files are (ie
+                # baskets created in place), so list the basket instead.
+                downloads = [
+                    (os.path.relpath(path, basket_path), path,
+                     info["size"], None)
+                    for path, info in self.file_system.find(
+                        basket_path, detail=True
+                    ).items()
+                    if os.path.dirname(path) != basket_path
+                    or os.path.basename(path) not in prohibited_filenames
+                ]
+                break
+            downloads.append((
+                relative_path, upload_path,
+                integrity_data["file_size"], integrity_data,
+            ))
 
         if include_artifacts:
-            # If including artifacts, download the entire basket dir.
-            self.file_system.get(self.basket_path, destination_path,
-                                 recursive=True)
-        else:
-            # If excluding artifacts, loop through basket ls results.
-            destination_path = os.path.join(destination_path, self.uuid)
-            os.makedirs(destination_path)
-            for file in self.ls():
-                self.file_system.get(file, destination_path, recursive=True)
+            artifact_paths = [self.manifest_path, self.supplement_path]
+            if self.file_system.exists(self.metadata_path):
+                artifact_paths.append(self.metadata_path)
+            # The sidecar holding the integrity data, if any, is an artifact.
+            integrity_data_file = self._load_json_artifact(
+                self.supplement_path
+            ).get("integrity_data_file")
+            if integrity_data_file is not None:
+                artifact_paths.append(
+                    os.path.join(self.basket_path, integrity_data_file)
+                )
+            downloads.extend(
+                (os.path.basename(path), path, None, None)
+                for path in artifact_paths
+            )
+        return downloads
 
     def update_metadata(self, metadata_updates: dict, replace: bool = False):
         """Update the basket's metadata with new values.
@@ -353,6 +745,7 @@ class Basket(BasketInitializer):
         """
         if not isinstance(metadata_updates, dict):
             raise TypeError("metadata_updates must be a dictionary.")
+        self._validate_if_needed()
 
         # Load existing metadata and update or replace it based on the flag.
         if replace:
@@ -369,7 +762,17 @@ class Basket(BasketInitializer):
         # Update the metadata member variable.
         self.metadata = metadata
 
+        artifact_cache = self._get_artifact_cache()
+        if artifact_cache is not None:
+            artifact_cache.invalidate(
+                self.basket_path, "basket_metadata.json"
+            )
+
         if hasattr(self, "pantry"):
+            if getattr(self.pantry.index, "track_metadata", False):
+                self.pantry.index.set_basket_metadata(
+                    {self.uuid: self.metadata}
+                )
             if hasattr(self.pantry, "mongo_client"):
                 mongo_loader = MongoLoader(pantry=self.pantry)
                 mongo_loader.load_mongo_metadata(
@@ -391,6 +794,19 @@ class Basket(BasketInitializer):
         self.update_metadata(new_metadata, replace=True)
 
 
+def _map_bounded(executor, function, iterable, max_pending: int = 1000):
+    """Like executor.map, but with at most max_pending calls submitted and
+    not yet yielded at a time, so their results do not pile up in memory.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(function, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
 # Disabling pylint to keep basket in place to a single function for clarity.
 # pylint: disable-msg=too-many-locals
 def create_basket_in_place(directory_path: str, **kwargs) -> pd.DataFrame:
@@ -417,6 +833,21 @@ def create_basket_in_place(directory_path: str, **kwargs) -> pd.DataFrame:
         The label for the basket.
     **skip_validation: bool (optional)
         Force the create basket function to skip validation.
+    **hash_cache: weave.HashCache (optional)
+        A persistent cache of file hashes, consulted so files that have not
+        changed since they were last hashed are not read again. Defaults to
+        the hash_cache of the pantry, if one is given.
+    **hash_mode: str (default="sampled")
+        How file checksums are derived ('sampled', 'full' or 'chunked').
+        See derive_integrity_data for details.
+    **chunk_size: int (optional)
+        Chunk size in bytes used by the 'chunked' hash_mode.
+    **hash_algorithm: str (default="sha256")
+        Hash algorithm used to derive file checksums. Defaults to the
+        hash_algorithm of the pantry, if one is given.
+    **max_workers: int (optional)
+        Maximum number of files hashed concurrently. Defaults to the
+        ThreadPoolExecutor default.
 
     Returns:
     ----------
@@ -429,6 +860,16 @@ def create_basket_in_place(directory_path: str, **kwargs) -> pd.DataFrame:
     basket_type = kwargs.get("basket_type", "item")
     label = kwargs.get("label", "")
     skip_validation = kwargs.get("skip_validation", False)
+    hash_kwargs = {
+        key: kwargs[key]
+        for key in ("hash_mode", "chunk_size", "hash_algorithm")
+        if key in kwargs
+    }
+    if pantry is not None:
+        hash_kwargs.setdefault("hash_algorithm", pantry.hash_algorithm)
+    hash_kwargs["hash_cache"] = kwargs.get(
+        "hash_cache", getattr(pantry, "hash_cache", None)
+    )
 
     if file_system is None:
         file_system = s3fs.S3FileSystem(
@@ -441,8 +882,9 @@ def create_basket_in_place(directory_path: str, **kwargs) -> pd.DataFrame:
                 "Provided directory cannot be a valid basket "
                 "(e.g., no nested baskets allowed)"
             )
-        if not validate_basket_in_place_directory_backward(file_system,
-                                                           directory_path):
+        if not validate_basket_in_place_directory_backward(
+            file_system, directory_path, pantry=pantry
+        ):
             raise ValueError(
                 "Provided directory cannot be a valid basket "
                 "(e.g., no nested baskets allowed)"
@@ -457,33 +899,55 @@ def create_basket_in_place(directory_path: str, **kwargs) -> pd.DataFrame:
         "label": label,
     }
 
-    manifest_path = os.path.join(directory_path, "basket_manifest.json")
-    with file_system.open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=4)
-
     # Create supplement file
-    basket_supplement = {"upload_items": [], "integrity_data": []}
-
-    for root, _, files in file_system.walk(directory_path):
-        for file in files:
-            if file in ["basket_manifest.json",
-                        "basket_supplement.json",
-                        "basket_metadata.json"]:
-                continue
-
-            file_path = os.path.join(root, file)
-            integrity_data = derive_integrity_data(
-                file_path=file_path, source_file_system=file_system
-            )
-
-            basket_supplement["upload_items"].append(
-                {"path": file_path, "stub": False}
-            )
-            basket_supplement["integrity_data"].append(integrity_data)
-
+    file_paths = [
+        file_path for file_path in file_system.find(directory_path)
+        if os.path.basename(file_path) not in [
+            "basket_manifest.json",
+            "basket_supplement.json",
+            "basket_metadata.json",
+            # Left behind if a previous attempt was killed.
+            "basket_supplement.json.tmp",
+        ]
+    ]
+    upload_items = [
+        {"path": file_path, "stub": False} for file_path in file_paths
+    ]
+
+    def get_integrity_data(file_path: str) -> dict:
+        integrity_data = derive_integrity_data(
+            file_path=file_path,
+            source_file_system=file_system,
+            **hash_kwargs,
+        )
+        # The files are not moved, so they are stored at their own path.
+        integrity_data["stub"] = False
+        integrity_data["upload_path"] = file_path
+        return integrity_data
+
+    # Files are hashed concurrently, and the integrity data is streamed into
+    # the supplement as it completes, so it is never all held in memory. The
+    # supplement is written to a temporary path, and only moved into place
+    # once every file is hashed, so a failure leaves no truncated supplement.
     supplement_path = os.path.join(directory_path, "basket_supplement.json")
-    with file_system.open(supplement_path, "w", encoding="utf-8") as f:
-        json.dump(basket_supplement, f, indent=4)
+    temp_supplement_path = supplement_path + ".tmp"
+    try:
+        with file_system.open(
+            temp_supplement_path, "w", encoding="utf-8"
+        ) as f, ThreadPoolExecutor(
+            max_workers=kwargs.get("max_workers", None)
+        ) as executor:
+            f.write('{"upload_items": ' + json.dumps(upload_items))
+            f.write(', "integrity_data": [')
+            for i, integrity_data in enumerate(_map_bounded(
+                executor, get_integrity_data, file_paths
+            )):
+                f.write((", " if i else "") + json.dumps(integrity_data))
+            f.write("]}")
+        file_system.mv(temp_supplement_path, supplement_path)
+    finally:
+        if file_system.exists(temp_supplement_path):
+            file_system.rm(temp_supplement_path)
 
     # Create metadata file if provided
     if metadata:
@@ -491,6 +955,12 @@ def create_basket_in_place(directory_path: str, **kwargs) -> pd.DataFrame:
         with file_system.open(metadata_path, "w", encoding="utf-8") as f:
             json.dump(metadata, f, indent=4)
 
+    # The manifest is written last, so the directory is only a basket once
+    # its supplement is complete.
+    manifest_path = os.path.join(directory_path, "basket_manifest.json")
+    with file_system.open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
     # Create the index row as a DataFrame
     index_data = {
         "uuid": [manifest["uuid"]],
@@ -508,6 +978,9 @@ def create_basket_in_place(directory_path: str, **kwargs) -> pd.DataFrame:
     single_index_row = pd.DataFrame(index_data)
     # Add to pantry if provided
     if pantry:
-        pantry.index.track_basket(single_index_row)
+        pantry.index.track_basket(
+            single_index_row,
+            basket_metadata={manifest["uuid"]: metadata or {}},
+        )
 
     return single_index_row
@@ -5,6 +5,8 @@ import os
 from fsspec import AbstractFileSystem
 from fsspec.implementations.local import LocalFileSystem
 import s3fs
+
+from .hashing import hash_algorithms, hash_modes
 # Try-Except required to make pymongo an optional dependency.
 try:
     import pymongo
@@ -20,6 +22,7 @@ prohibited_filenames = [
     "basket_manifest.json",
     "basket_metadata.json",
     "basket_supplement.json",
+    "basket_integrity_data.jsonl",
 ]
 
 # basket_manifest must follow this schema
@@ -58,6 +61,7 @@ supplement_schema = {
                 "additionalProperties": False,
             },
         },
+        "integrity_data_file": {"type": "string"},
         "integrity_data": {
             "type": "array",
             "minItems": 0,
@@ -69,6 +73,12 @@ supplement_schema = {
                     "access_date": {"type": "string"},
                     "source_path": {"type": "string"},
                     "byte_count": {"type": "number"},
+                    "hash_mode": {"type": "string", "enum": hash_modes},
+                    "hash_algorithm": {
+                        "type": "string",
+                        "enum": hash_algorithms,
+                    },
+                    "chunk_size": {"type": "number"},
                     "stub": {"type": "boolean"},
                     "upload_path": {"type": "string"},
                 },
@@ -0,0 +1,277 @@
+"""Wherein is contained the HashCache class, a persistent cache of file
+hashes used to avoid re-hashing unchanged files."""
+import os
+import sqlite3
+import threading
+import time
+
+from fsspec import AbstractFileSystem
+from fsspec.implementations.local import LocalFileSystem
+
+# Number of cache hits whose last used time is kept in memory before it is
+# written to the db.
+_MAX_PENDING_TOUCHES = 1000
+
+
+def get_file_identity(
+    file_system: AbstractFileSystem, file_path: str
+) -> tuple[int, str | None]:
+    """Return the size and a version identifier of a file.
+
+    The version identifier changes whenever the file's contents change. For
+    local files it is the modification time in nanoseconds. For other file
+    systems the ETag is used when available, falling back to the modification
+    time reported by the file system.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system hosting the file.
+    file_path: str
+        Path to the file.
+
+    Returns
+    ----------
+    A tuple of (file size in bytes (int), version identifier (str)). The
+    version identifier is None if the file system reports no version.
+    """
+    if isinstance(file_system, LocalFileSystem):
+        stat = os.stat(file_path)
+        return stat.st_size, str(stat.st_mtime_ns)
+
+    info = file_system.info(file_path)
+    return info["size"], get_info_identity(info)
+
+
+def get_info_identity(info: dict) -> str | None:
+    """Return the version identifier of a file from its fsspec info.
+
+    The ETag is used when available, falling back to the modification time
+    reported by the file system.
+
+    Parameters
+    ----------
+    info: dict
+        The file's info, as returned by info, or by ls and find with
+        detail=True.
+
+    Returns
+    ----------
+    The version identifier (str), or None if the info has no ETag or
+    modification time (ie on in-memory file systems), in which case a file
+    rewritten with the same size cannot be told apart.
+    """
+    identity = (
+        info.get("ETag") or info.get("LastModified") or info.get("mtime")
+    )
+    if identity is None:
+        return None
+    return str(identity)
+
+
+class HashCache():
+    """A persistent, LRU bounded cache of file hashes backed by SQLite.
+
+    Hashes are keyed by the file path, size and version identifier (see
+    get_file_identity), along with the parameters used to derive the hash, so
+    a changed file or different hashing options never return a stale hash.
+    Files without a version identifier are never cached.
+
+    The number of hashes is counted once, when the cache is opened, and kept
+    in memory, so the count may drift if several processes share the db. The
+    last used time of cache hits is written to the db in batches, with the
+    next put, or when the cache is closed.
+    """
+
+    def __init__(self, db_path: str = "weave_hash_cache.db", **kwargs):
+        """Initializes the HashCache.
+
+        Parameters
+        ----------
+        db_path: str (default="weave_hash_cache.db")
+            Path to the sqlite db file used to persist the cache.
+        **max_entries: int (default=1_000_000)
+            Maximum number of hashes kept in the cache. When exceeded, the
+            least recently used hashes are evicted.
+        """
+        self.max_entries = kwargs.get("max_entries", 1_000_000)
+        if not isinstance(self.max_entries, int):
+            raise TypeError(
+                f"'max_entries' must be an int: '{self.max_entries}'"
+            )
+        if self.max_entries <= 0:
+            raise ValueError(
+                "'max_entries' must be greater than zero: "
+                f"'{self.max_entries}'"
+            )
+
+        self.db_path = db_path
+        # The connection is shared between threads (uploads hash files
+        # concurrently), so access is serialized with a lock.
+        self._lock = threading.Lock()
+        self.con = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.cur = self.con.cursor()
+        self._create_tables()
+        self._count = self.cur.execute(
+            "SELECT COUNT(*) FROM hash_cache"
+        ).fetchone()[0]
+        # Last used times of cache hits, not yet written to the db.
+        self._pending_touches = {}
+
+    def __del__(self):
+        """Close the database connection before closing."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of hashes in the cache."""
+        with self._lock:
+            return self.cur.execute(
+                "SELECT COUNT(*) FROM hash_cache"
+            ).fetchone()[0]
+
+    def _create_tables(self):
+        """Create the required DB tables if they do not already exist."""
+        self.cur.execute("""
+            CREATE TABLE IF NOT EXISTS hash_cache(
+                path TEXT, file_size INT, identity TEXT, parameters TEXT,
+                hash TEXT, last_used REAL,
+                PRIMARY KEY(path, file_size, identity, parameters));
+        """)
+        self.cur.execute("""
+            CREATE INDEX IF NOT EXISTS hash_cache_last_used
+            ON hash_cache(last_used);
+        """)
+        self.con.commit()
+
+    def get(
+        self, file_path: str, file_size: int, identity: str, parameters: str
+    ) -> str | None:
+        """Return the cached hash of a file, or None if it is not cached.
+
+        Parameters
+        ----------
+        file_path: str
+            Path to the file.
+        file_size: int
+            Size of the file in bytes.
+        identity: str
+            Version identifier of the file (see get_file_identity).
+        parameters: str
+            The hashing parameters used to derive the hash.
+
+        Returns
+        ----------
+        The cached hash (str), or None on a cache miss, or if the file has
+        no version identifier.
+        """
+        if identity is None:
+            return None
+        key = (file_path, file_size, identity, parameters)
+        with self._lock:
+            row = self.cur.execute(
+                "SELECT hash FROM hash_cache WHERE path = ? AND file_size = ? "
+                "AND identity = ? AND parameters = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            self._pending_touches[key] = time.time()
+            if len(self._pending_touches) >= _MAX_PENDING_TOUCHES:
+                self._write_touches()
+                self.con.commit()
+        return row[0]
+
+    def put(
+        self,
+        file_path: str,
+        file_size: int,
+        identity: str,
+        parameters: str,
+        file_hash: str,
+    ):
+        """Add the hash of a file to the cache.
+
+        Any previously cached hashes of the same path with a different size or
+        version identifier are discarded, as they can never be used again.
+        Nothing is cached if the file has no version identifier.
+
+        Parameters
+        ----------
+        file_path: str
+            Path to the file.
+        file_size: int
+            Size of the file in bytes.
+        identity: str
+            Version identifier of the file (see get_file_identity).
+        parameters: str
+            The hashing parameters used to derive the hash.
+        file_hash: str
+            The hash to cache.
+        """
+        if identity is None:
+            return
+        key = (file_path, file_size, identity, parameters)
+        with self._lock:
+            self._count -= self.cur.execute(
+                "DELETE FROM hash_cache WHERE path = ? "
+                "AND (file_size != ? OR identity != ?)",
+                (file_path, file_size, identity),
+            ).rowcount
+            self._pending_touches.pop(key, None)
+            last_used = time.time()
+            updated = self.cur.execute(
+                "UPDATE hash_cache SET hash = ?, last_used = ? WHERE path = ? "
+                "AND file_size = ? AND identity = ? AND parameters = ?",
+                (file_hash, last_used, *key),
+            ).rowcount
+            if not updated:
+                self.cur.execute(
+                    "INSERT INTO hash_cache VALUES(?, ?, ?, ?, ?, ?)",
+                    (*key, file_hash, last_used),
+                )
+                self._count += 1
+            # The last used times must be current before evicting.
+            self._write_touches()
+            self._evict()
+            self.con.commit()
+
+    def _write_touches(self):
+        """Write the last used times of the cache hits to the db."""
+        if not self._pending_touches:
+            return
+        self.cur.executemany(
+            "UPDATE hash_cache SET last_used = ? WHERE path = ? "
+            "AND file_size = ? AND identity = ? AND parameters = ?",
+            [
+                (last_used, *key)
+                for key, last_used in self._pending_touches.items()
+            ],
+        )
+        self._pending_touches.clear()
+
+    def _evict(self):
+        """Evict the least recently used hashes above max_entries."""
+        if self._count > self.max_entries:
+            self._count -= self.cur.execute(
+                "DELETE FROM hash_cache WHERE rowid IN ("
+                "SELECT rowid FROM hash_cache ORDER BY last_used LIMIT ?)",
+                (self._count - self.max_entries,),
+            ).rowcount
+
+    def clear(self):
+        """Remove every hash from the cache."""
+        with self._lock:
+            self.cur.execute("DELETE FROM hash_cache")
+            self.con.commit()
+            self._count = 0
+            self._pending_touches.clear()
+
+    def close(self):
+        """Write the pending last used times, and close the database
+        connection."""
+        if getattr(self, "con", None) is not None:
+            with self._lock:
+                self._write_touches()
+                self.con.commit()
+                self.con.close()
+                self.con = None
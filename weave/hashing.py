@@ -0,0 +1,517 @@
+"""Contains functions concerning the hashing of files for integrity data."""
+
+import hashlib
+import math
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+
+from fsspec import AbstractFileSystem
+from fsspec.implementations.local import LocalFileSystem
+# Try-Except required to make xxhash an optional dependency.
+try:
+    import xxhash
+except ImportError:
+    _HAS_XXHASH = False
+else:
+    _HAS_XXHASH = True
+
+
+# Supported methods of deriving a file's checksum.
+#   sampled: Hash the whole file, unless it is larger than 3 * byte_count, in
+#            which case only the beginning, middle, and end bytes are hashed.
+#   full:    Hash every byte of the file, streamed in fixed size buffers.
+#   chunked: Hash fixed size chunks of the file in parallel, then hash the
+#            concatenated chunk digests into a single root hash.
+hash_modes = ["sampled", "full", "chunked"]
+
+# Supported hash algorithms. sha256 is the default and is suitable for
+# auditing. blake2b is a faster cryptographic hash, and xxh3_128 is a much
+# faster non-cryptographic hash suitable for deduplication (requires the
+# optional xxhash package).
+hash_algorithms = ["sha256", "blake2b", "xxh3_128"]
+DEFAULT_HASH_ALGORITHM = "sha256"
+
+# Size of the buffer used when streaming file contents into a hasher.
+DEFAULT_BUFFER_SIZE = 2**20
+
+# Size of each independently hashed chunk when using the chunked hash mode.
+DEFAULT_CHUNK_SIZE = 64 * 2**20
+
+
+def get_hasher(hash_algorithm: str = DEFAULT_HASH_ALGORITHM):
+    """Return a new hasher object for the given hash algorithm.
+
+    Parameters
+    ----------
+    hash_algorithm: str (default=DEFAULT_HASH_ALGORITHM)
+        One of weave.hashing.hash_algorithms.
+
+    Returns
+    ----------
+    A hasher object exposing update(), digest() and hexdigest().
+    """
+    if hash_algorithm == "sha256":
+        return hashlib.sha256()
+    if hash_algorithm == "blake2b":
+        return hashlib.blake2b()
+    if hash_algorithm == "xxh3_128":
+        if not _HAS_XXHASH:
+            raise ImportError("Missing Dependency. The package 'xxhash' "
+                              "is required to use the 'xxh3_128' "
+                              "hash_algorithm.")
+        return xxhash.xxh3_128()
+    raise ValueError(
+        f"'hash_algorithm' must be one of {hash_algorithms}: "
+        f"'{hash_algorithm}'"
+    )
+
+
+def hash_file(
+    file_system: AbstractFileSystem,
+    file_path: str,
+    file_size: int,
+    byte_count: int,
+    **kwargs,
+) -> str:
+    """Return the hex digest of a file using the requested hash mode.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system hosting the file.
+    file_path: str
+        Path to the file to be hashed.
+    file_size: int
+        Size of the file in bytes.
+    byte_count: int
+        Number of bytes hashed from each window when using the sampled mode.
+    **hash_mode: str (default="sampled")
+        One of weave.hashing.hash_modes.
+    **chunk_size: int (default=DEFAULT_CHUNK_SIZE)
+        Size in bytes of each chunk when using the chunked mode.
+    **max_workers: int (optional)
+        Maximum number of threads used to hash chunks in the chunked mode.
+    **buffer_size: int (default=DEFAULT_BUFFER_SIZE)
+        Size in bytes of the buffer used to stream non-local files into the
+        hasher.
+    **hash_algorithm: str (default=DEFAULT_HASH_ALGORITHM)
+        One of weave.hashing.hash_algorithms.
+    **on_read: callable (optional)
+        Called with the size in bytes of each buffer read, ie to throttle the
+        reads.
+
+    Returns
+    ----------
+    The hex digest of the file (string).
+    """
+    hash_mode = kwargs.get("hash_mode", "sampled")
+    buffer_size = kwargs.get("buffer_size", DEFAULT_BUFFER_SIZE)
+    hash_algorithm = kwargs.get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+    on_read = kwargs.get("on_read", None)
+
+    if hash_mode == "sampled":
+        return hash_file_sampled(
+            file_system, file_path, file_size, byte_count,
+            buffer_size=buffer_size,
+            hash_algorithm=hash_algorithm,
+            on_read=on_read,
+        )
+    if hash_mode == "full":
+        return hash_file_full(
+            file_system, file_path,
+            buffer_size=buffer_size,
+            hash_algorithm=hash_algorithm,
+            on_read=on_read,
+        )
+    if hash_mode == "chunked":
+        return hash_file_chunked(
+            file_system,
+            file_path,
+            file_size,
+            chunk_size=kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE),
+            max_workers=kwargs.get("max_workers", None),
+            buffer_size=buffer_size,
+            hash_algorithm=hash_algorithm,
+            on_read=on_read,
+        )
+    raise ValueError(
+        f"'hash_mode' must be one of {hash_modes}: '{hash_mode}'"
+    )
+
+
+def get_hash_kwargs(integrity_data: dict) -> dict:
+    """Return the hashing kwargs (of hash_file and StreamHasher) recorded in
+    a file's integrity data.
+    """
+    hash_kwargs = {
+        "hash_mode": integrity_data.get("hash_mode", "sampled"),
+        "hash_algorithm": integrity_data.get(
+            "hash_algorithm", DEFAULT_HASH_ALGORITHM
+        ),
+    }
+    if "chunk_size" in integrity_data:
+        hash_kwargs["chunk_size"] = integrity_data["chunk_size"]
+    return hash_kwargs
+
+
+def _update_from_file(
+    hasher, file, length: int, buffer_size: int, on_read=None
+):
+    """Stream up to length bytes from the file's position into the hasher."""
+    remaining = length
+    while remaining > 0:
+        data = file.read(min(buffer_size, remaining))
+        if not data:
+            break
+        if on_read is not None:
+            on_read(len(data))
+        hasher.update(data)
+        remaining -= len(data)
+
+
+def _update_from_mapped_file(
+    hasher, file_path: str, windows: list, buffer_size: int, on_read=None
+):
+    """Hash (start, length) windows of a local file through a memory map.
+
+    The hasher reads directly from memoryview slices of the map, so no
+    intermediate bytes objects are allocated regardless of the window size.
+    If on_read is given, the windows are hashed buffer_size bytes at a time,
+    calling on_read before each.
+    """
+    with open(file_path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped, and contribute no bytes.
+            return
+        with mapped, memoryview(mapped) as view:
+            for start, length in windows:
+                end = len(view) if math.isinf(length) else start + length
+                end = min(end, len(view))
+                step = end - start if on_read is None else buffer_size
+                for offset in range(start, end, max(step, 1)):
+                    window_end = min(offset + step, end)
+                    if on_read is not None:
+                        on_read(window_end - offset)
+                    with view[offset:window_end] as window:
+                        hasher.update(window)
+
+
+def _update_from_windows(
+    hasher,
+    file_system: AbstractFileSystem,
+    file_path: str,
+    windows: list,
+    buffer_size: int,
+    on_read=None,
+):
+    """Hash (start, length) windows of a file, in order.
+
+    Local files are memory mapped. Files on other file systems are streamed
+    through a buffer of buffer_size bytes.
+    """
+    if isinstance(file_system, LocalFileSystem):
+        _update_from_mapped_file(
+            hasher, file_path, windows, buffer_size, on_read
+        )
+        return
+    with file_system.open(file_path, "rb") as file:
+        for start, length in windows:
+            file.seek(start)
+            _update_from_file(hasher, file, length, buffer_size, on_read)
+
+
+def hash_file_sampled(
+    file_system: AbstractFileSystem,
+    file_path: str,
+    file_size: int,
+    byte_count: int,
+    **kwargs,
+) -> str:
+    """Hash the beginning, middle, and end bytes of a large file.
+
+    Files no larger than 3 * byte_count are hashed in their entirety. Each
+    window is memory mapped (local files) or streamed (other file systems)
+    into the hasher, so memory use is not bounded by the byte_count.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system hosting the file.
+    file_path: str
+        Path to the file to be hashed.
+    file_size: int
+        Size of the file in bytes.
+    byte_count: int
+        Number of bytes hashed from each of the three windows.
+    **buffer_size: int (default=DEFAULT_BUFFER_SIZE)
+        Size in bytes of the buffer used to stream non-local files into the
+        hasher.
+    **hash_algorithm: str (default=DEFAULT_HASH_ALGORITHM)
+        One of weave.hashing.hash_algorithms.
+    **on_read: callable (optional)
+        Called with the size in bytes of each buffer read.
+
+    Returns
+    ----------
+    The hex digest of the sampled bytes (string).
+    """
+    if file_size <= byte_count * 3:
+        return hash_file_full(file_system, file_path, **kwargs)
+
+    buffer_size = kwargs.get("buffer_size", DEFAULT_BUFFER_SIZE)
+    hasher = get_hasher(
+        kwargs.get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+    )
+    midpoint = file_size / 2.0
+    midpoint_seek_position = math.floor(midpoint - byte_count / 2.0)
+    end_seek_position = file_size - byte_count
+    windows = [
+        (seek_position, byte_count)
+        for seek_position in (0, midpoint_seek_position, end_seek_position)
+    ]
+    _update_from_windows(
+        hasher, file_system, file_path, windows, buffer_size,
+        kwargs.get("on_read", None),
+    )
+    return hasher.hexdigest()
+
+
+def hash_bytes(data: bytes, byte_count: int, **kwargs) -> str:
+    """Return the sampled hash of an in-memory file.
+
+    The result is identical to hash_file_sampled on a file with the same
+    contents, without the contents ever being written to disk.
+
+    Parameters
+    ----------
+    data: bytes
+        Contents of the file.
+    byte_count: int
+        Number of bytes hashed from each of the three windows.
+    **hash_algorithm: str (default=DEFAULT_HASH_ALGORITHM)
+        One of weave.hashing.hash_algorithms.
+
+    Returns
+    ----------
+    The hex digest of the sampled bytes (string).
+    """
+    hasher = get_hasher(
+        kwargs.get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+    )
+    with memoryview(data) as view:
+        file_size = len(view)
+        if file_size <= byte_count * 3:
+            hasher.update(view)
+            return hasher.hexdigest()
+        midpoint_seek_position = math.floor(file_size / 2.0 - byte_count / 2.0)
+        for start in (0, midpoint_seek_position, file_size - byte_count):
+            with view[start:start + byte_count] as window:
+                hasher.update(window)
+    return hasher.hexdigest()
+
+
+def hash_file_full(
+    file_system: AbstractFileSystem, file_path: str, **kwargs
+) -> str:
+    """Hash every byte of a file, memory mapped or streamed in fixed size
+    buffers.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system hosting the file.
+    file_path: str
+        Path to the file to be hashed.
+    **buffer_size: int (default=DEFAULT_BUFFER_SIZE)
+        Size in bytes of the buffer used to stream non-local files into the
+        hasher.
+    **hash_algorithm: str (default=DEFAULT_HASH_ALGORITHM)
+        One of weave.hashing.hash_algorithms.
+    **on_read: callable (optional)
+        Called with the size in bytes of each buffer read.
+
+    Returns
+    ----------
+    The hex digest of the file (string).
+    """
+    buffer_size = kwargs.get("buffer_size", DEFAULT_BUFFER_SIZE)
+    hasher = get_hasher(
+        kwargs.get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+    )
+    _update_from_windows(
+        hasher, file_system, file_path, [(0, math.inf)], buffer_size,
+        kwargs.get("on_read", None),
+    )
+    return hasher.hexdigest()
+
+
+def _hash_chunk(
+    file_system: AbstractFileSystem,
+    file_path: str,
+    start: int,
+    length: int,
+    buffer_size: int,
+    hash_algorithm: str,
+    on_read=None,
+) -> bytes:
+    """Return the raw digest of a single chunk of a file."""
+    hasher = get_hasher(hash_algorithm)
+    # Each chunk opens its own handle so chunks can be read concurrently.
+    _update_from_windows(
+        hasher, file_system, file_path, [(start, length)], buffer_size,
+        on_read,
+    )
+    return hasher.digest()
+
+
+def hash_file_chunked(
+    file_system: AbstractFileSystem,
+    file_path: str,
+    file_size: int,
+    **kwargs,
+) -> str:
+    """Hash a file as a two level tree of fixed size chunks.
+
+    Each chunk of the file is hashed independently (and concurrently), then
+    the concatenation of the chunk digests is hashed to produce the root hash.
+    The result covers every byte of the file, but is NOT equal to the full
+    file hash, so the chunk_size must be recorded to verify it later.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system hosting the file.
+    file_path: str
+        Path to the file to be hashed.
+    file_size: int
+        Size of the file in bytes.
+    **chunk_size: int (default=DEFAULT_CHUNK_SIZE)
+        Size in bytes of each chunk.
+    **max_workers: int (optional)
+        Maximum number of threads used to hash the chunks.
+    **buffer_size: int (default=DEFAULT_BUFFER_SIZE)
+        Size in bytes of the buffer used to stream non-local files into the
+        hasher.
+    **hash_algorithm: str (default=DEFAULT_HASH_ALGORITHM)
+        One of weave.hashing.hash_algorithms.
+    **on_read: callable (optional)
+        Called with the size in bytes of each buffer read. It
+        must be thread safe, as chunks are read concurrently.
+
+    Returns
+    ----------
+    The hex digest of the root hash (string).
+    """
+    chunk_size = kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    buffer_size = kwargs.get("buffer_size", DEFAULT_BUFFER_SIZE)
+    hash_algorithm = kwargs.get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+    on_read = kwargs.get("on_read", None)
+
+    # An empty file is treated as a single empty chunk.
+    chunk_starts = range(0, max(file_size, 1), chunk_size)
+    with ThreadPoolExecutor(max_workers=kwargs.get("max_workers")) as pool:
+        digests = pool.map(
+            lambda start: _hash_chunk(
+                file_system, file_path, start, chunk_size, buffer_size,
+                hash_algorithm, on_read,
+            ),
+            chunk_starts,
+        )
+        root_hasher = get_hasher(hash_algorithm)
+        for digest in digests:
+            root_hasher.update(digest)
+    return root_hasher.hexdigest()
+
+
+class StreamHasher():
+    """Incrementally hash a file whose bytes are received in order.
+
+    This produces the same hash as hash_file for every hash mode, so a file
+    can be verified while it is being transferred, without reading it again.
+    """
+
+    def __init__(self, file_size: int, byte_count: int, **kwargs):
+        """Initializes the StreamHasher.
+
+        Parameters
+        ----------
+        file_size: int
+            Size of the file in bytes.
+        byte_count: int
+            Number of bytes hashed from each window when using the sampled
+            mode.
+        **hash_mode: str (default="sampled")
+            One of weave.hashing.hash_modes.
+        **chunk_size: int (default=DEFAULT_CHUNK_SIZE)
+            Size in bytes of each chunk when using the chunked mode.
+        **hash_algorithm: str (default=DEFAULT_HASH_ALGORITHM)
+            One of weave.hashing.hash_algorithms.
+        """
+        hash_mode = kwargs.get("hash_mode", "sampled")
+        if hash_mode not in hash_modes:
+            raise ValueError(
+                f"'hash_mode' must be one of {hash_modes}: '{hash_mode}'"
+            )
+        self.hash_algorithm = kwargs.get(
+            "hash_algorithm", DEFAULT_HASH_ALGORITHM
+        )
+        self.hasher = get_hasher(self.hash_algorithm)
+        self.position = 0
+
+        # Byte windows which are hashed, as in hash_file_sampled.
+        self.windows = [(0, math.inf)]
+        if hash_mode == "sampled" and file_size > byte_count * 3:
+            midpoint_seek_position = math.floor(
+                file_size / 2.0 - byte_count / 2.0
+            )
+            self.windows = [
+                (start, byte_count) for start in
+                (0, midpoint_seek_position, file_size - byte_count)
+            ]
+
+        self.chunk_size = None
+        if hash_mode == "chunked":
+            self.chunk_size = kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE)
+            self.chunk_hasher = get_hasher(self.hash_algorithm)
+
+    def update(self, data: bytes):
+        """Hash the next bytes of the file."""
+        with memoryview(data) as view:
+            if self.chunk_size is not None:
+                self._update_chunks(view)
+            else:
+                for start, length in self.windows:
+                    begin = max(start - self.position, 0)
+                    end = min(start + length - self.position, len(view))
+                    if begin < end:
+                        with view[begin:end] as window:
+                            self.hasher.update(window)
+        self.position += len(data)
+
+    def _update_chunks(self, view: memoryview):
+        """Hash the bytes into chunks, as in hash_file_chunked."""
+        offset = 0
+        while offset < len(view):
+            chunk_remaining = (
+                self.chunk_size - (self.position + offset) % self.chunk_size
+            )
+            end = min(offset + chunk_remaining, len(view))
+            with view[offset:end] as chunk:
+                self.chunk_hasher.update(chunk)
+            offset = end
+            if (self.position + offset) % self.chunk_size == 0:
+                self.hasher.update(self.chunk_hasher.digest())
+                self.chunk_hasher = get_hasher(self.hash_algorithm)
+
+    def hexdigest(self) -> str:
+        """Return the hex digest of the bytes received so far."""
+        if self.chunk_size is None:
+            return self.hasher.hexdigest()
+        root_hasher = self.hasher.copy()
+        # The last (partial) chunk, or the single empty chunk of an empty
+        # file, has not been added to the root hash yet.
+        if self.position == 0 or self.position % self.chunk_size != 0:
+            root_hasher.update(self.chunk_hasher.digest())
+        return root_hasher.hexdigest()
@@ -43,11 +43,7 @@ def create_index_from_fs(
         raise FileNotFoundError(f"'root_dir' does not exist '{root_dir}'")
 
     manifest_paths = _get_list_of_basket_jsons(root_dir, file_system)
-    index_columns = get_index_column_names()
-    index_dict = {}
-
-    for key in index_columns:
-        index_dict[key] = []
+    index_dict = _create_empty_index_dict()
 
     bad_baskets = []
     for manifest_path in manifest_paths:
@@ -56,36 +52,85 @@ def create_index_from_fs(
             if not validate_basket_dict(basket_dict):
                 bad_baskets.append(os.path.dirname(manifest_path))
                 continue
-            basket_dict["upload_time"] = pd.Timestamp(
-                                                basket_dict["upload_time"]
-                                         )
             if basket_dict["basket_type"] == "index":
                 continue
-
-            for field in basket_dict.keys():
-                index_dict[field].append(basket_dict[field])
-
-            if manifest_path.startswith('/'):
-                address = os.path.normpath(os.path.dirname(manifest_path))
-            else:
-                address = os.path.relpath(os.path.dirname(manifest_path))
-            index_dict["address"].append(address)
-
-            index_dict["storage_type"].append(
-                file_system.__class__.__name__
+            _append_manifest_to_index_dict(
+                index_dict,
+                basket_dict,
+                os.path.dirname(manifest_path),
+                file_system,
             )
 
-            if "weave_version" not in basket_dict.keys():
-                # Every basket uploaded before 0.13.0, should not have a
-                # version number, therefore every basket with no version
-                # number will be shown as <0.13.0
-                index_dict["weave_version"].append("<0.13.0")
-
     if len(bad_baskets) != 0:
         warnings.warn("baskets found in the following locations "
                       "do not follow specified weave schema:\n"
                       f"{bad_baskets}")
 
+    return _index_dict_to_df(index_dict)
+
+
+def create_index_from_manifests(
+    manifests: dict[str, dict], file_system: AbstractFileSystem
+) -> pd.DataFrame:
+    """Create index rows from manifests already held in memory.
+
+    Unlike create_index_from_fs, this performs no file system reads. The
+    manifests are assumed to be valid (ie, freshly created by an upload).
+
+    Parameters
+    ----------
+    manifests: dict
+        A dictionary mapping each basket's path to its manifest dictionary.
+    file_system: fsspec object
+        The fsspec file system hosting the baskets.
+
+    Returns
+    ----------
+    index: a pandas DataFrame with the same columns as create_index_from_fs,
+           with one row per manifest.
+    """
+    index_dict = _create_empty_index_dict()
+    for basket_path, manifest in manifests.items():
+        _append_manifest_to_index_dict(
+            index_dict, dict(manifest), basket_path, file_system
+        )
+    return _index_dict_to_df(index_dict)
+
+
+def _create_empty_index_dict() -> dict[str, list]:
+    """Return a dictionary with an empty list for each index column."""
+    return {key: [] for key in get_index_column_names()}
+
+
+def _append_manifest_to_index_dict(
+    index_dict: dict[str, list],
+    basket_dict: dict,
+    basket_path: str,
+    file_system: AbstractFileSystem,
+):
+    """Append the index row of a single basket to the index dictionary."""
+    basket_dict["upload_time"] = pd.Timestamp(basket_dict["upload_time"])
+
+    for field in basket_dict.keys():
+        index_dict[field].append(basket_dict[field])
+
+    if basket_path.startswith('/'):
+        address = os.path.normpath(basket_path)
+    else:
+        address = os.path.relpath(basket_path)
+    index_dict["address"].append(address)
+
+    index_dict["storage_type"].append(file_system.__class__.__name__)
+
+    if "weave_version" not in basket_dict.keys():
+        # Every basket uploaded before 0.13.0, should not have a
+        # version number, therefore every basket with no version
+        # number will be shown as <0.13.0
+        index_dict["weave_version"].append("<0.13.0")
+
+
+def _index_dict_to_df(index_dict: dict[str, list]) -> pd.DataFrame:
+    """Convert an index dictionary into an index DataFrame."""
     index = pd.DataFrame(index_dict)
     index["uuid"] = index["uuid"].astype(str)
     return index
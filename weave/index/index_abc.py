@@ -123,6 +123,10 @@ class IndexABC(abc.ABC):
         ----------
         entry_df : pandas.DataFrame
             Uploaded baskets to append to the index.
+        **basket_metadata: dict (optional)
+            Dictionary mapping the uuids of the baskets to their metadata,
+            used to populate the metadata table when the index tracks
+            metadata. Metadata which is not provided is read from the pantry.
         Optional kwargs controlled by concrete implementations.
         """
 
@@ -302,6 +306,63 @@ class IndexABC(abc.ABC):
         pandas.DataFrame of the resulting query.
         """
 
+    @abc.abstractmethod
+    def set_basket_metadata(self, basket_metadata: dict, **kwargs):
+        """Replace the metadata table entries of the given baskets.
+
+        Does nothing if the index does not track metadata.
+
+        Parameters
+        ----------
+        basket_metadata: dict
+            Dictionary mapping basket uuids to their (nested) metadata.
+        Optional kwargs controlled by concrete implementations.
+        """
+
+    @abc.abstractmethod
+    def query_metadata(
+        self,
+        filters: dict,
+        max_rows: Optional[int] = None,
+        offset: int = 0,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Returns a pandas dataframe of baskets whose metadata matches.
+
+        Requires the index to track metadata (track_metadata=True), in which
+        case the flattened basket metadata is kept in a metadata table. Nested
+        metadata keys are joined with a '.', ie {"a": {"b": 1}} is queried
+        with {"a.b": 1}.
+
+        Parameters
+        ----------
+        filters: dict
+            Dictionary mapping flattened metadata keys to values. Baskets are
+            returned if their metadata is equal to every value.
+        max_rows: int or None (default=None)
+            Max rows returned in the pandas dataframe. If None, all rows will
+            be returned.
+        offset: int (default=0)
+            Offset from the beginning of the index to begin the query
+        Optional kwargs controlled by concrete implementations.
+
+        Returns
+        ----------
+        pandas.DataFrame containing the manifest data of matching baskets.
+        """
+        if not isinstance(filters, dict):
+            raise TypeError(f"'filters' must be a dictionary: '{filters}'")
+        for key, value in filters.items():
+            if not isinstance(value, (str, int, float, bool, type(None))):
+                raise TypeError(
+                    f"Metadata filter values must be scalars: '{key}'"
+                )
+        if not getattr(self, "track_metadata", False):
+            raise ValueError(
+                "This index does not track metadata. Create the index with "
+                "track_metadata=True to query metadata."
+            )
+
     @abc.abstractmethod
     def __len__(self) -> int:
         """Returns the number of baskets in the index."""
@@ -1,7 +1,7 @@
 """ This module is for handling the pandas based backend of the Index object.
 """
+import json
 import os
-import tempfile
 import warnings
 from datetime import datetime
 from time import time_ns
@@ -9,11 +9,11 @@ from typing import Optional
 
 import pandas as pd
 from fsspec import AbstractFileSystem
-from fsspec.implementations.local import LocalFileSystem
 
-from ..upload import UploadBasket
+from ..upload import upload_file_contents_as_basket
 from .create_index import create_index_from_fs
 from .index_abc import IndexABC
+from .metadata_table import create_metadata_rows, read_metadata_from_fs
 
 def slice_df(
     df: pd.DataFrame, max_rows: Optional[int] = None, offset: int = 0
@@ -69,6 +69,12 @@ class IndexPandas(IndexABC):
         **auto_cleanup: bool (default=True)
             A bool that flags whether or not old indices are removed when a
             new one is created and the limit is met.
+        **track_metadata: bool (default=False)
+            If True, the flattened basket metadata is kept in a metadata table
+            so baskets can be filtered by metadata (see query_metadata). The
+            table is saved as a '{time}-metadata.json' sidecar next to each
+            index json, and is rebuilt from the pantry if the sidecar of the
+            latest index is missing.
         """
         super().__init__(file_system=file_system,
                          pantry_path=pantry_path,
@@ -83,6 +89,8 @@ class IndexPandas(IndexABC):
         self.index_df = None
         self.pantry_read_only = kwargs.get("pantry_read_only", False)
         self.auto_cleanup = kwargs.get("auto_cleanup", True)
+        self.track_metadata = bool(kwargs.get("track_metadata", False))
+        self.metadata_df = pd.DataFrame(columns=["uuid", "key", "value"])
 
     def __len__(self) -> int:
         """Returns the number of baskets in the index."""
@@ -160,6 +168,32 @@ class IndexPandas(IndexABC):
         self.index_df = pd.read_json(
             self.file_system.open(latest_index_path), dtype = {"uuid": str}
         )
+        if self.track_metadata:
+            self._load_metadata(latest_index_path)
+
+    def _load_metadata(self, index_path: str):
+        """Load the metadata table saved next to the given index json.
+
+        If it does not exist, the metadata table is rebuilt from the pantry.
+        """
+        metadata_path = index_path.replace("-index.json", "-metadata.json")
+        if self.file_system.exists(metadata_path):
+            with self.file_system.open(metadata_path, "rb") as file:
+                self.metadata_df = self._create_metadata_df(json.load(file))
+        else:
+            self.metadata_df = self._create_metadata_df(
+                create_metadata_rows(
+                    read_metadata_from_fs(self.index_df, self.file_system)
+                )
+            )
+
+    @staticmethod
+    def _create_metadata_df(metadata_rows: list) -> pd.DataFrame:
+        """Create the metadata table from (uuid, key, value) rows."""
+        # The object dtype keeps the values' types as they are.
+        return pd.DataFrame(
+            metadata_rows, columns=["uuid", "key", "value"], dtype=object
+        )
 
     def _get_index_time_from_path(self, path: str) -> int:
         """Returns time as int from index_json path."""
@@ -248,6 +282,12 @@ class IndexPandas(IndexABC):
         **kwargs unused for this class.
         """
         index = create_index_from_fs(self.pantry_path, self.file_system)
+        if self.track_metadata:
+            self.metadata_df = self._create_metadata_df(
+                create_metadata_rows(
+                    read_metadata_from_fs(index, self.file_system)
+                )
+            )
         self._upload_index(index=index)
 
     def clear_index(self, refresh: bool = False, **kwargs):
@@ -279,18 +319,21 @@ class IndexPandas(IndexABC):
         n_secs = time_ns()
         # If the pantry is read-only, don't upload the index.
         if not self.pantry_read_only:
-            with tempfile.TemporaryDirectory() as out:
-                temp_json_path = os.path.join(out, f"{n_secs}-index.json")
-                index.to_json(temp_json_path,
-                              date_format="iso",
-                              date_unit="ns")
-                UploadBasket(
-                    upload_items=[{"path":temp_json_path, "stub":False}],
-                    basket_type=self.index_basket_dir_name,
-                    file_system=self.file_system,
-                    source_file_system=LocalFileSystem(),
-                    pantry_path=self.pantry_path
-                )
+            extra_files = {}
+            if self.track_metadata:
+                extra_files[f"{n_secs}-metadata.json"] = json.dumps(
+                    self.metadata_df.values.tolist()
+                ).encode("utf-8")
+            upload_file_contents_as_basket(
+                f"{n_secs}-index.json",
+                index.to_json(date_format="iso", date_unit="ns").encode(
+                    "utf-8"
+                ),
+                basket_type=self.index_basket_dir_name,
+                file_system=self.file_system,
+                pantry_path=self.pantry_path,
+                extra_files=extra_files,
+            )
         self.index_df = index
         self.index_json_time = n_secs
 
@@ -328,6 +371,10 @@ class IndexPandas(IndexABC):
 
         self.index_df.drop(remove_item.index, inplace=True)
         self.index_df.reset_index(drop=True, inplace=True)
+        if self.track_metadata:
+            self.metadata_df = self.metadata_df[
+                ~self.metadata_df["uuid"].isin(remove_item["uuid"])
+            ].reset_index(drop=True)
         if upload_index:
             self._upload_index(self.index_df)
 
@@ -534,8 +581,10 @@ class IndexPandas(IndexABC):
         ----------
         entry_df : pd.DataFrame
             The entry to be added to the index.
-
-        **kwargs unused for this class.
+        **basket_metadata: dict (optional)
+            Dictionary mapping the uuids of the baskets to their metadata.
+            Only used if the index tracks metadata, in which case metadata
+            which is not provided is read from the pantry.
         """
         index_paths = self.file_system.glob(
             os.path.join(self.index_basket_dir_path, "**", "*-index.json")
@@ -543,6 +592,19 @@ class IndexPandas(IndexABC):
         if len(index_paths) > 0:
             self._sync_if_needed()
         if not self._sync_if_needed():
+            if self.track_metadata:
+                basket_metadata = kwargs.get("basket_metadata", None) or {}
+                missing = entry_df[~entry_df["uuid"].isin(basket_metadata)]
+                basket_metadata = {
+                    basket_uuid: basket_metadata[basket_uuid]
+                    for basket_uuid in entry_df["uuid"]
+                    if basket_uuid in basket_metadata
+                }
+                if len(missing) > 0:
+                    basket_metadata.update(
+                        read_metadata_from_fs(missing, self.file_system)
+                    )
+                self._set_metadata_rows(basket_metadata)
             self._upload_index(
                 pd.concat(
                     [df for df in [self.index_df, entry_df] if len(df) > 0],
@@ -698,6 +760,84 @@ class IndexPandas(IndexABC):
             max_rows,
             offset)
 
+    def _set_metadata_rows(self, basket_metadata: dict):
+        """Replace the metadata table rows of the given baskets in memory."""
+        self.metadata_df = pd.concat(
+            [
+                df for df in [
+                    self.metadata_df[
+                        ~self.metadata_df["uuid"].isin(basket_metadata)
+                    ],
+                    self._create_metadata_df(
+                        create_metadata_rows(basket_metadata)
+                    ),
+                ] if len(df) > 0
+            ] or [self._create_metadata_df([])],
+            ignore_index=True,
+        )
+
+    def set_basket_metadata(self, basket_metadata: dict, **kwargs):
+        """Replace the metadata table entries of the given baskets.
+
+        Does nothing if the index does not track metadata. A new index is
+        uploaded with the updated metadata table.
+
+        Parameters
+        ----------
+        basket_metadata: dict
+            Dictionary mapping basket uuids to their (nested) metadata.
+
+        **kwargs unused for this class.
+        """
+        if not self.track_metadata or not basket_metadata:
+            return
+        self._sync_if_needed()
+        self._set_metadata_rows(basket_metadata)
+        self._upload_index(self.index_df)
+
+    def query_metadata(
+        self,
+        filters: dict,
+        max_rows: Optional[int] = None,
+        offset: int = 0,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Returns a pandas dataframe of baskets whose metadata matches.
+
+        Parameters
+        ----------
+        filters: dict
+            Dictionary mapping flattened metadata keys (ie 'a.b' for
+            {"a": {"b": 1}}) to values. Baskets are returned if their
+            metadata is equal to every value.
+        max_rows: int or None (default=None)
+            Max rows returned in the pandas dataframe. If None, all rows will
+            be returned.
+        offset: int (default=0)
+            Offset from the beginning of the index to begin the query
+
+        **kwargs unused for this class.
+
+        Returns
+        ----------
+        pandas.DataFrame containing the manifest data of matching baskets.
+        """
+        super().query_metadata(filters)
+        self._sync_if_needed()
+        mask = self.index_df["uuid"].notna()
+        for key, value in filters.items():
+            rows = self.metadata_df[self.metadata_df["key"] == key]
+            if value is None:
+                rows = rows[rows["value"].isna()]
+            else:
+                rows = rows[rows["value"].map(
+                    lambda x, y=value: x == y
+                ).astype(bool)]
+            mask &= self.index_df["uuid"].isin(rows["uuid"])
+        return slice_df(
+            self.index_df[mask].sort_values("uuid").iloc[offset:], max_rows
+        )
+
     def query(self, expr, **kwargs):
         """Returns a pandas dataframe of the results of the query.
 
@@ -2,6 +2,7 @@
 # Pylint doesn't like the similarity between this file and the SQLite file, but
 # it doesn't make sense to write shared functions for them. So ignore pylint.
 # pylint: disable=duplicate-code
+import json
 import os
 import warnings
 from datetime import datetime
@@ -26,6 +27,21 @@ from fsspec import AbstractFileSystem
 
 from .index_abc import IndexABC
 from .create_index import create_index_from_fs
+from .metadata_table import create_metadata_rows, read_metadata_from_fs
+
+
+def _encode_metadata_value(value) -> str:
+    """JSON encode a metadata value, as stored in the metadata table.
+
+    Numbers (and bools) are encoded by their value, so equal values match
+    whatever their type, as in the other indexes (ie 1, 1.0 and True).
+    """
+    if isinstance(value, bool):
+        value = int(value)
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return json.dumps(value)
+
 
 class IndexSQL(IndexABC):
     """Concrete implementation of Index, using SQL."""
@@ -47,6 +63,12 @@ class IndexSQL(IndexABC):
         **pantry_schema: str (default=<pantry_path>)
             The schema to use for the pantry. If none is set, defaults to the
             pantry path (with _ replacements when necessary).
+        **track_metadata: bool (default=False)
+            If True, the flattened basket metadata is kept in a metadata table
+            so baskets can be filtered by metadata (see query_metadata). It
+            should be set consistently for a given schema, as baskets tracked
+            while it is False have no metadata entries (clear_index with
+            refresh=True repopulates them).
         """
         if not _HAS_REQUIRED_DEPS:
             raise ImportError("Missing Dependencies. The packages: 'psycopg2'"
@@ -97,6 +119,7 @@ class IndexSQL(IndexABC):
             d_schema_name = "weave"
         self._pantry_schema = kwargs.get("pantry_schema", d_schema_name)
         self._pantry_schema = self._pantry_schema.lower()
+        self.track_metadata = bool(kwargs.get("track_metadata", False))
 
         self._engine = sqla.create_engine(
             sqla.engine.url.URL(
@@ -129,6 +152,7 @@ class IndexSQL(IndexABC):
         sql_query: str,
         params: Optional[dict] = None,
         commit: bool = False,
+        connection: Optional["sqla.engine.Connection"] = None,
     ) -> tuple[list, list] | int | None:
         """Executes the given SQL query. Returns the results.
 
@@ -140,6 +164,10 @@ class IndexSQL(IndexABC):
             The parameters to be used in the query.
         commit: bool (default=False)
             Whether or not to commit the query.
+        connection: sqlalchemy.engine.Connection (optional)
+            Connection of an open transaction (ie from engine.begin()) to
+            execute the query in. The query is then committed with the
+            transaction, and commit is ignored. Defaults to a new connection.
 
         Returns
         ----------
@@ -148,47 +176,47 @@ class IndexSQL(IndexABC):
             If statement affects rows, returns the number of rows affected.
             If the query does not return any results, returns None.
         """
-        try:
-            with self._engine.connect() as connection:
-                if isinstance(sql_query, sqla.sql.elements.TextClause):
-                    query = sql_query
-                elif isinstance(sql_query, str):
-                    query = sqla.sql.text(sql_query)
-                else:
-                    raise ValueError(
-                        "sql_query should be a str or a "
-                        "sqlalchemy TextClause object"
-                    )
+        if isinstance(sql_query, sqla.sql.elements.TextClause):
+            query = sql_query
+        elif isinstance(sql_query, str):
+            query = sqla.sql.text(sql_query)
+        else:
+            raise ValueError(
+                "sql_query should be a str or a "
+                "sqlalchemy TextClause object"
+            )
 
-                if params is not None:
-                    if not isinstance(params, dict):
-                        raise TypeError("params should be a dict")
+        if params is not None and not isinstance(params, dict):
+            raise TypeError("params should be a dict")
 
-                    # Execute the SQL query with parameters
-                    result = connection.execute(query, params)
-                else:
-                    # Execute the SQL query without parameters
-                    result = connection.execute(query)
+        if connection is not None:
+            return self._get_sql_results(connection.execute(query, params))
+
+        with self._engine.connect() as connection:
+            # Execute the SQL query (with parameters, if any).
+            result = connection.execute(query, params)
 
-                # In older sqlalchemy versions (1.4.x) the commit function
-                # is not an attribute of the connection, thus do not call
-                # commit if the version is 1.4.x and instead rely on
-                # the built-in auto-commit.
-                if commit and not sqla.__version__.startswith("1.4."):
-                    connection.commit()
+            # In older sqlalchemy versions (1.4.x) the commit function
+            # is not an attribute of the connection, thus do not call
+            # commit if the version is 1.4.x and instead rely on
+            # the built-in auto-commit.
+            if commit and not sqla.__version__.startswith("1.4."):
+                connection.commit()
 
-                # Fetch and return the results
-                if result.returns_rows:
-                    return result.fetchall(), list(result.keys())
+            return self._get_sql_results(result)
 
-                # Return rows affected (used for INSERT, DELETE, etc.)
-                if result.rowcount != -1:
-                    return result.rowcount
+    @staticmethod
+    def _get_sql_results(result) -> tuple[list, list] | int | None:
+        """Returns the results of an executed query (see execute_sql)."""
+        # Fetch and return the results
+        if result.returns_rows:
+            return result.fetchall(), list(result.keys())
 
-                return None
+        # Return rows affected (used for INSERT, DELETE, etc.)
+        if result.rowcount != -1:
+            return result.rowcount
 
-        except sqla.exc.SQLAlchemyError as err:
-            raise err
+        return None
 
     def _create_schema(self):
         """Create the schema if it does not already exist."""
@@ -233,6 +261,23 @@ class IndexSQL(IndexABC):
                 );
                 """, commit=True
             )
+        if not sqla.inspect(self._engine).has_table("basket_metadata",
+                                                    self.pantry_schema):
+            # Values are stored JSON encoded (see _encode_metadata_value).
+            # They are indexed by their hash, as btree entries are limited in
+            # size, and values are not.
+            self.execute_sql(
+                f"""
+                CREATE TABLE {self.pantry_schema}.basket_metadata (
+                    uuid varchar(64),
+                    key TEXT,
+                    value TEXT,
+                    PRIMARY KEY(uuid, key)
+                );
+                CREATE INDEX basket_metadata_key_value
+                    ON {self.pantry_schema}.basket_metadata(key, md5(value));
+                """, commit=True
+            )
 
     @property
     def file_system(self) -> AbstractFileSystem:
@@ -379,13 +424,31 @@ class IndexSQL(IndexABC):
     def track_basket(self, entry_df: pd.DataFrame, **kwargs):
         """Track a basket (or many baskets) from the pantry with the Index.
 
+        The index rows, parent uuids and metadata are written in a single
+        transaction, so the tables are never partially updated.
+
         Parameters
         ----------
         entry_df: pd.DataFrame
             Uploaded baskets' manifest data to append to the index.
-
-        **kwargs unused for this function.
+        **basket_metadata: dict (optional)
+            Dictionary mapping the uuids of the baskets to their metadata.
+            Only used if the index tracks metadata, in which case metadata
+            which is not provided is read from the pantry.
         """
+        if self.track_metadata:
+            basket_metadata = kwargs.get("basket_metadata", None) or {}
+            missing = entry_df[~entry_df["uuid"].isin(basket_metadata)]
+            basket_metadata = {
+                basket_uuid: basket_metadata[basket_uuid]
+                for basket_uuid in entry_df["uuid"]
+                if basket_uuid in basket_metadata
+            }
+            if len(missing) > 0:
+                basket_metadata.update(
+                    read_metadata_from_fs(missing, self.file_system)
+                )
+
         # Insert the parent_uuids.
         sql = sqla.text(
             f"INSERT INTO {self.pantry_schema}.parent_uuids "
@@ -397,38 +460,47 @@ class IndexSQL(IndexABC):
             "AND parent_uuid = CAST(:parent_uuid AS text));"
         )
 
-        # Loop all uuids and parent uuids (list of lists).
-        for _, entry in entry_df[["uuid", "parent_uuids"]].iterrows():
-            # Loop all parent uuids (now a list of strings)
-            for parent_uuid in entry.parent_uuids:
-                self.execute_sql(
-                    sql,
-                    {
-                        "uuid": entry.uuid,
-                        "parent_uuid": parent_uuid,
-                    },
-                    commit=True,
-                )
+        with self._engine.begin() as connection:
+            # Loop all uuids and parent uuids (list of lists).
+            for _, entry in entry_df[["uuid", "parent_uuids"]].iterrows():
+                # Loop all parent uuids (now a list of strings)
+                for parent_uuid in entry.parent_uuids:
+                    self.execute_sql(
+                        sql,
+                        {
+                            "uuid": entry.uuid,
+                            "parent_uuid": parent_uuid,
+                        },
+                        connection=connection,
+                    )
 
-        # Convert the parent_uuids to a string, and the upload_time to an int.
-        entry_df.loc[:,"parent_uuids"] = entry_df["parent_uuids"].astype(str)
-        entry_df["upload_time"] = (
-            entry_df["upload_time"].astype(int) // 1e9
-        ).astype(int)
-
-        for basket_dict in entry_df.to_dict(orient="records"):
-            index_columns = list(basket_dict.keys())
-            # Insert into pantry_index.
-            sql = sqla.text(
-                f"INSERT INTO {self.pantry_schema}.pantry_index ("
-                f"{', '.join([f'{column}' for column in index_columns])}) "
-                "SELECT "
-                f"{', '.join([f':{column}' for column in index_columns])} "
-                "WHERE NOT EXISTS "
-                f"(SELECT 1 FROM {self.pantry_schema}.pantry_index "
-                "WHERE uuid = CAST(:uuid AS text));"
+            # Convert the parent_uuids to a string, and the upload_time to an
+            # int.
+            entry_df.loc[:,"parent_uuids"] = (
+                entry_df["parent_uuids"].astype(str)
             )
-            self.execute_sql(sql, basket_dict, commit=True)
+            entry_df["upload_time"] = (
+                entry_df["upload_time"].astype(int) // 1e9
+            ).astype(int)
+
+            for basket_dict in entry_df.to_dict(orient="records"):
+                index_columns = list(basket_dict.keys())
+                # Insert into pantry_index.
+                sql = sqla.text(
+                    f"INSERT INTO {self.pantry_schema}.pantry_index ("
+                    f"{', '.join([f'{column}' for column in index_columns])}"
+                    ") SELECT "
+                    f"{', '.join([f':{column}' for column in index_columns])}"
+                    " WHERE NOT EXISTS "
+                    f"(SELECT 1 FROM {self.pantry_schema}.pantry_index "
+                    "WHERE uuid = CAST(:uuid AS text));"
+                )
+                self.execute_sql(sql, basket_dict, connection=connection)
+
+            if self.track_metadata:
+                self.set_basket_metadata(
+                    basket_metadata, _connection=connection
+                )
 
     def untrack_basket(self, basket_address: str | list[str], **kwargs):
         """Remove a basket from being tracked of given UUID or path.
@@ -488,6 +560,66 @@ class IndexSQL(IndexABC):
         )
         self.execute_sql(query, {"uuids": uuids}, commit=True)
 
+        # Delete from basket_metadata.
+        query = (
+            f"DELETE FROM {self.pantry_schema}.basket_metadata "
+            " WHERE uuid IN ( "
+                " SELECT unnest(CAST(:uuids AS text[]))"
+            ");"
+        )
+        self.execute_sql(query, {"uuids": uuids}, commit=True)
+
+    def set_basket_metadata(self, basket_metadata: dict, **kwargs):
+        """Replace the metadata table entries of the given baskets.
+
+        Does nothing if the index does not track metadata.
+
+        Parameters
+        ----------
+        basket_metadata: dict
+            Dictionary mapping basket uuids to their (nested) metadata.
+        **_connection: sqlalchemy.engine.Connection (optional)
+            Connection of an open transaction to write the entries in.
+            Argument is to facilitate track_basket()
+        """
+        if not self.track_metadata or not basket_metadata:
+            return
+        connection = kwargs.get("_connection", None)
+        if connection is None:
+            # Delete and insert the entries in a single transaction.
+            with self._engine.begin() as connection:
+                self.set_basket_metadata(
+                    basket_metadata, _connection=connection
+                )
+            return
+
+        self.execute_sql(
+            f"DELETE FROM {self.pantry_schema}.basket_metadata "
+            " WHERE uuid IN ( "
+                " SELECT unnest(CAST(:uuids AS text[]))"
+            ");",
+            {"uuids": list(basket_metadata)},
+            connection=connection,
+        )
+        rows = create_metadata_rows(basket_metadata)
+        if not rows:
+            return
+        # Insert every row in a single statement.
+        self.execute_sql(
+            f"INSERT INTO {self.pantry_schema}.basket_metadata "
+            "(uuid, key, value) "
+            "SELECT * FROM unnest("
+            "CAST(:uuids AS text[]), "
+            "CAST(:keys AS text[]), "
+            "CAST(:values AS text[]));",
+            {
+                "uuids": [row[0] for row in rows],
+                "keys": [row[1] for row in rows],
+                "values": [_encode_metadata_value(row[2]) for row in rows],
+            },
+            connection=connection,
+        )
+
     def get_rows(
         self, basket_address: str | list[str], **kwargs
     ) -> pd.DataFrame:
@@ -918,6 +1050,70 @@ class IndexSQL(IndexABC):
         )
         return ind_df
 
+    def query_metadata(
+        self,
+        filters: dict,
+        max_rows: Optional[int] = None,
+        offset: int = 0,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Returns a pandas dataframe of baskets whose metadata matches.
+
+        Parameters
+        ----------
+        filters: dict
+            Dictionary mapping flattened metadata keys (ie 'a.b' for
+            {"a": {"b": 1}}) to values. Baskets are returned if their
+            metadata is equal to every value.
+        max_rows: int or None (default=None)
+            Max rows returned in the pandas dataframe. If None, all rows will
+            be returned.
+        offset: int (default=0)
+            Offset from the beginning of the index to begin the query
+
+        **kwargs unused for this function.
+
+        Returns
+        ----------
+        pandas.DataFrame containing the manifest data of matching baskets.
+        """
+        super().query_metadata(filters)
+        query = (
+            f"SELECT * FROM {self.pantry_schema}.pantry_index WHERE 1 = 1"
+        )
+        params = {}
+        for i, (key, value) in enumerate(filters.items()):
+            query += (
+                " AND uuid IN (SELECT uuid FROM "
+                f"{self.pantry_schema}.basket_metadata "
+                f"WHERE key = :key_{i} "
+                # The hash matches the basket_metadata_key_value index, and
+                # the value itself rules out hash collisions.
+                f"AND md5(value) = md5(:value_{i}) AND value = :value_{i})"
+            )
+            params[f"key_{i}"] = key
+            params[f"value_{i}"] = _encode_metadata_value(value)
+        query += " ORDER BY UUID"
+        if max_rows is not None:
+            query += (
+                " OFFSET (:offset) ROWS FETCH FIRST (:max_rows) ROWS ONLY"
+            )
+            params.update({"offset": offset, "max_rows": max_rows})
+        elif offset:
+            query += " OFFSET (:offset) ROWS"
+            params["offset"] = offset
+        result, columns = self.execute_sql(query, params)
+        result = [list(row) for row in result]
+
+        ind_df = pd.DataFrame(result, columns=columns)
+        ind_df["parent_uuids"] = ind_df["parent_uuids"].apply(ast.literal_eval)
+        ind_df["upload_time"] = pd.to_datetime(
+            ind_df["upload_time"],
+            unit="s",
+            origin="unix",
+        )
+        return ind_df
+
     def query(self, expr: str, **kwargs) -> pd.DataFrame:
         """Returns a pandas dataframe of the results of the expression.
 
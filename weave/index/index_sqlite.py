@@ -12,6 +12,7 @@ from fsspec import AbstractFileSystem
 from .index_abc import IndexABC
 from .list_baskets import _get_list_of_basket_jsons
 from .create_index import create_index_from_fs
+from .metadata_table import create_metadata_rows, read_metadata_from_fs
 
 
 class IndexSQLite(IndexABC):
@@ -31,6 +32,12 @@ class IndexSQLite(IndexABC):
         **db_path: str (optional)
             Path to the sqlite db file to be used. If none is set, defaults to
             '{pantry_path}.db'
+        **track_metadata: bool (default=False)
+            If True, the flattened basket metadata is kept in a metadata table
+            so baskets can be filtered by metadata (see query_metadata). It
+            should be set consistently for a given db, as baskets tracked
+            while it is False have no metadata entries (clear_index with
+            refresh=True repopulates them).
         """
         self._file_system = file_system
         self._pantry_path = pantry_path
@@ -38,13 +45,19 @@ class IndexSQLite(IndexABC):
         db_file_name = self._pantry_path.replace(os.sep, "-")
 
         self.db_path = kwargs.get("db_path", f"{db_file_name}.db")
+        self.track_metadata = bool(kwargs.get("track_metadata", False))
         self.con = sqlite3.connect(self.db_path)
         self.cur = self.con.cursor()
         self._create_tables()
 
     def __del__(self):
         """Close the database connection before closing."""
-        self.con.close()
+        try:
+            self.con.close()
+        except sqlite3.ProgrammingError:
+            # The connection was opened in another thread (see AsyncPantry),
+            # which is responsible for closing it.
+            pass
 
     def _create_tables(self):
         """Create the required DB tables if they do not already exist."""
@@ -63,6 +76,16 @@ class IndexSQLite(IndexABC):
                 uuid TEXT, parent_uuid TEXT,
                 PRIMARY KEY(uuid, parent_uuid), UNIQUE(uuid, parent_uuid));
         """)
+
+        # The value column has no declared type, so values keep their type.
+        self.cur.execute("""
+            CREATE TABLE IF NOT EXISTS basket_metadata(
+                uuid TEXT, key TEXT, value, PRIMARY KEY(uuid, key));
+        """)
+        self.cur.execute("""
+            CREATE INDEX IF NOT EXISTS basket_metadata_key_value
+                ON basket_metadata(key, value);
+        """)
         self.con.commit()
 
     @property
@@ -113,12 +136,24 @@ class IndexSQLite(IndexABC):
         basket_jsons = _get_list_of_basket_jsons(self.pantry_path,
                                                  self.file_system)
 
+        entries = []
         for basket_json_address in basket_jsons:
             entry = create_index_from_fs(basket_json_address,
                                          file_system=self.file_system)
             if not entry.empty:
                 if len(self.get_rows(entry['uuid'].iloc[0])) == 0:
-                    self.track_basket(entry, _commit_db=False)
+                    entries.append(entry)
+
+        # Read the metadata of every new basket in a single batch.
+        basket_metadata = {}
+        if self.track_metadata and entries:
+            basket_metadata = read_metadata_from_fs(
+                pd.concat(entries, ignore_index=True), self.file_system
+            )
+        for entry in entries:
+            self.track_basket(
+                entry, basket_metadata=basket_metadata, _commit_db=False
+            )
 
         self.con.commit()
 
@@ -210,6 +245,10 @@ class IndexSQLite(IndexABC):
         entry_df: pd.DataFrame
             Uploaded baskets' manifest data to append to the index.
 
+        **basket_metadata: dict (optional)
+            Dictionary mapping the uuids of the baskets to their metadata.
+            Only used if the index tracks metadata, in which case metadata
+            which is not provided is read from the pantry.
         **_commit_db: bool (default=True)
             Commit the SQL database. Argument is to facilitate generate_index()
         """
@@ -217,6 +256,18 @@ class IndexSQLite(IndexABC):
         uuids = entry_df["uuid"]
         parent_uuids = entry_df["parent_uuids"]
 
+        if self.track_metadata:
+            basket_metadata = kwargs.get("basket_metadata", None) or {}
+            missing = entry_df[~entry_df["uuid"].isin(basket_metadata)]
+            basket_metadata = {
+                basket_uuid: basket_metadata[basket_uuid]
+                for basket_uuid in uuids if basket_uuid in basket_metadata
+            }
+            if len(missing) > 0:
+                basket_metadata.update(
+                    read_metadata_from_fs(missing, self.file_system)
+                )
+
         entry_df["parent_uuids"] = entry_df["parent_uuids"].astype(str)
         entry_df["upload_time"] = (
             entry_df["upload_time"].astype('int64') // 1e9
@@ -235,6 +286,9 @@ class IndexSQLite(IndexABC):
             for parent_uuid in parent_uuids:
                 # Add the uuid, parent_uuid combo to the parent_uuids table.
                 self.cur.execute(sql, (uuid, parent_uuid))
+
+        if self.track_metadata:
+            self.set_basket_metadata(basket_metadata, _commit_db=False)
         if _commit_db:
             self.con.commit()
 
@@ -284,8 +338,40 @@ class IndexSQLite(IndexABC):
             f"({','.join(['?']*len(uuids))})",
             uuids,
         )
+
+        # Delete from basket_metadata.
+        self.cur.execute(
+            "DELETE FROM basket_metadata WHERE uuid in "
+            f"({','.join(['?']*len(uuids))})",
+            uuids,
+        )
         self.con.commit()
 
+    def set_basket_metadata(self, basket_metadata: dict, **kwargs):
+        """Replace the metadata table entries of the given baskets.
+
+        Does nothing if the index does not track metadata.
+
+        Parameters
+        ----------
+        basket_metadata: dict
+            Dictionary mapping basket uuids to their (nested) metadata.
+        **_commit_db: bool (default=True)
+            Commit the SQL database. Argument is to facilitate track_basket()
+        """
+        if not self.track_metadata or not basket_metadata:
+            return
+        self.cur.executemany(
+            "DELETE FROM basket_metadata WHERE uuid = ?",
+            [(basket_uuid,) for basket_uuid in basket_metadata],
+        )
+        self.cur.executemany(
+            "INSERT INTO basket_metadata(uuid, key, value) VALUES(?,?,?)",
+            create_metadata_rows(basket_metadata),
+        )
+        if kwargs.get("_commit_db", True):
+            self.con.commit()
+
     def get_rows(
         self, basket_address: str | list[str], **kwargs
     ) -> pd.DataFrame:
@@ -693,6 +779,65 @@ class IndexSQLite(IndexABC):
 
         return ind_df
 
+    def query_metadata(
+        self,
+        filters: dict,
+        max_rows: Optional[int] = None,
+        offset: int = 0,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Returns a pandas dataframe of baskets whose metadata matches.
+
+        Parameters
+        ----------
+        filters: dict
+            Dictionary mapping flattened metadata keys (ie 'a.b' for
+            {"a": {"b": 1}}) to values. Baskets are returned if their
+            metadata is equal to every value.
+        max_rows: int or None (default=None)
+            Max rows returned in the pandas dataframe. If None, all rows will
+            be returned.
+        offset: int (default=0)
+            Offset from the beginning of the index to begin the query
+
+        **kwargs unused for this function.
+
+        Returns
+        ----------
+        pandas.DataFrame containing the manifest data of matching baskets.
+        """
+        super().query_metadata(filters)
+        columns = (
+            [info[1] for info in
+             self.cur.execute("PRAGMA table_info(pantry_index)").fetchall()]
+        )
+        # IS is used rather than =, so None values match NULL.
+        query = "SELECT * FROM pantry_index WHERE 1 = 1"
+        params = tuple()
+        for key, value in filters.items():
+            query += """ AND uuid IN (SELECT uuid FROM basket_metadata
+                         WHERE key = ? AND value IS ?)"""
+            params += (key, value)
+        query += " ORDER BY UUID"
+        if max_rows is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += (max_rows, offset)
+        elif offset:
+            # A negative limit is no limit in SQLite.
+            query += " LIMIT -1 OFFSET ?"
+            params += (offset,)
+        ind_df = pd.DataFrame(
+            self.cur.execute(query, params).fetchall(),
+            columns=columns,
+        )
+        ind_df["parent_uuids"] = ind_df["parent_uuids"].apply(ast.literal_eval)
+        ind_df["upload_time"] = pd.to_datetime(
+            ind_df["upload_time"],
+            unit="s",
+            origin="unix",
+        )
+        return ind_df
+
     def query(self, expr: str, **kwargs) -> pd.DataFrame:
         """Returns a pandas dataframe of the results of the expression.
 
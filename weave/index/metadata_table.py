@@ -0,0 +1,94 @@
+"""Wherein is contained functionality concerning the optional metadata table
+of an index, which holds the flattened basket_metadata.json of each basket.
+"""
+import json
+import os
+
+import pandas as pd
+from fsspec import AbstractFileSystem
+
+# Types of the metadata values stored in the metadata table.
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def flatten_metadata(metadata: dict, parent_key: str = "") -> dict:
+    """Flatten nested metadata into a dictionary of scalar values.
+
+    Nested keys are joined with a '.', ie {"a": {"b": 1}} is flattened to
+    {"a.b": 1}. Values which are not scalars (ie lists) are not queryable,
+    and are left out.
+
+    Parameters
+    ----------
+    metadata: dict
+        The (nested) metadata of a basket.
+    parent_key: str (default="")
+        Prefix of the flattened keys, used for recursion.
+
+    Returns
+    ----------
+    A flat dictionary mapping dotted keys to scalar values.
+    """
+    flat_metadata = {}
+    for key, value in (metadata or {}).items():
+        key = f"{parent_key}.{key}" if parent_key else str(key)
+        if isinstance(value, dict):
+            flat_metadata.update(flatten_metadata(value, key))
+        elif isinstance(value, _SCALAR_TYPES):
+            flat_metadata[key] = value
+    return flat_metadata
+
+
+def create_metadata_rows(basket_metadata: dict) -> list[tuple]:
+    """Create the metadata table rows of the given baskets.
+
+    Parameters
+    ----------
+    basket_metadata: dict
+        Dictionary mapping basket uuids to their (nested) metadata.
+
+    Returns
+    ----------
+    A list of (uuid, key, value) tuples, one per flattened metadata value.
+    """
+    return [
+        (basket_uuid, key, value)
+        for basket_uuid, metadata in basket_metadata.items()
+        for key, value in flatten_metadata(metadata).items()
+    ]
+
+
+def read_metadata_from_fs(
+    index_df: pd.DataFrame, file_system: AbstractFileSystem
+) -> dict:
+    """Read the basket_metadata.json of every basket in the index rows.
+
+    The files are read in a single batched call.
+
+    Parameters
+    ----------
+    index_df: pd.DataFrame
+        Index rows of the baskets.
+    file_system: fsspec object
+        The file system hosting the baskets.
+
+    Returns
+    ----------
+    A dictionary mapping basket uuids to their metadata. Baskets without
+    metadata are mapped to an empty dictionary.
+    """
+    paths = {
+        basket_uuid: os.path.join(address, "basket_metadata.json")
+        for basket_uuid, address in zip(index_df["uuid"], index_df["address"])
+    }
+    contents = {}
+    if paths:
+        contents = file_system.cat(list(paths.values()), on_error="omit")
+    # The contents are keyed by the file system's normalized paths.
+    # pylint: disable-next=protected-access
+    strip_protocol = file_system._strip_protocol
+    return {
+        basket_uuid: json.loads(contents[strip_protocol(path)])
+        if strip_protocol(path) in contents else {}
+        for basket_uuid, path in paths.items()
+    }
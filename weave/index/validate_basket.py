@@ -2,10 +2,7 @@
 basket_manifest.json file.
 """
 
-import jsonschema
-from jsonschema import validate
-
-from ..config import manifest_schema
+from ..schema_validation import manifest_validator
 
 
 # Validate basket keys and value data types on read in
@@ -23,9 +20,4 @@ def validate_basket_dict(basket_dict: dict) -> bool:
     bool: True if basket has correct schema, False otherwise.
     """
 
-    try:
-        validate(instance=basket_dict, schema=manifest_schema)
-        return True
-
-    except jsonschema.exceptions.ValidationError:
-        return False
+    return manifest_validator.is_valid(basket_dict)
@@ -264,6 +264,65 @@ class MongoLoader():
         self.load_mongo_manifest(uuids, collection=manifest_collection)
         self.load_mongo_supplement(uuids, collection=supplement_collection)
 
+    def load_mongo_many(self, baskets: list[dict], **kwargs):
+        """Load the metadata, manifests, and supplements of many newly
+        uploaded baskets into the mongo database with one bulk write per
+        collection.
+
+        Unlike load_mongo, the basket data is provided in memory, so no
+        baskets are read from the pantry. The baskets are assumed to be new,
+        so no existing documents are checked for or replaced.
+
+        Parameters
+        ----------
+        baskets: [dict]
+            A list of dictionaries, one per basket, with the keys 'manifest'
+            and 'supplement' (dicts), and optionally 'metadata' (dict).
+        **metadata_collection: str (default=self.metadata_collection)
+            Metadata will be added to the Mongo collection specified.
+        **manifest_collection: str (default=self.manifest_collection)
+            Manifest will be added to the Mongo collection specified.
+        **supplement_collection: str (default=self.supplement_collection)
+            Supplement will be added to the Mongo collection specified.
+        """
+        metadata_collection = kwargs.get("metadata_collection",
+                                         self.metadata_collection)
+        manifest_collection = kwargs.get("manifest_collection",
+                                         self.manifest_collection)
+        supplement_collection = kwargs.get("supplement_collection",
+                                           self.supplement_collection)
+
+        documents = {
+            metadata_collection: [],
+            manifest_collection: [],
+            supplement_collection: [],
+        }
+        for basket in baskets:
+            manifest = basket["manifest"]
+            # Copy the manifest, as insert_many adds an _id to each document.
+            documents[manifest_collection].append(dict(manifest))
+
+            mongo_supplement = {}
+            mongo_supplement["uuid"] = manifest["uuid"]
+            mongo_supplement["basket_type"] = manifest["basket_type"]
+            mongo_supplement.update(basket["supplement"])
+            documents[supplement_collection].append(mongo_supplement)
+
+            metadata = basket.get("metadata")
+            if metadata:
+                mongo_metadata = {}
+                mongo_metadata["uuid"] = manifest["uuid"]
+                mongo_metadata["basket_type"] = manifest["basket_type"]
+                mongo_metadata["parent_uuids"] = manifest["parent_uuids"]
+                mongo_metadata.update(metadata)
+                documents[metadata_collection].append(mongo_metadata)
+
+        for collection, collection_documents in documents.items():
+            if collection_documents:
+                self.database[collection].insert_many(
+                    collection_documents, ordered=False
+                )
+
     def clear_mongo(self, refresh: bool = False):
         """Clear the metadata, manifest, and supplement collections optionally,
         refreshing them from the pantry.
@@ -4,6 +4,7 @@ import json
 import os
 import uuid
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import PurePosixPath, PurePath
 
 import pandas as pd
@@ -25,12 +26,43 @@ else:
     _HAS_PYMONGO = True
 
 from .mongo_loader import MongoLoader
+from .artifact_cache import ArtifactCache
+from .audit import audit_pantry
 from .basket import Basket
 from .config import get_file_system
-from .index.create_index import create_index_from_fs
+from .hashing import DEFAULT_HASH_ALGORITHM, get_hash_kwargs, get_hasher
+from .index.create_index import create_index_from_manifests
 from .index.index_abc import IndexABC
 from .upload import UploadBasket, derive_integrity_data
-from .validate import validate_pantry
+from .validate import create_validation_report, validate_pantry
+from .validation_report import ValidationReport
+
+# Maximum number of basket addresses looked up in a single index query.
+_GET_ROWS_BATCH_SIZE = 10_000
+
+
+def _get_recorded_hash_kwargs(integrity_data: dict) -> dict:
+    """Return the kwargs of derive_integrity_data reproducing the hash
+    recorded in a file's integrity data.
+
+    Only the settings which change the hash of the mode are kept, so files
+    hashed the same way give equal kwargs.
+    """
+    integrity_data = {
+        key: value for key, value in integrity_data.items()
+        if value is not None
+    }
+    hash_kwargs = get_hash_kwargs(integrity_data)
+    if hash_kwargs["hash_mode"] != "chunked":
+        hash_kwargs.pop("chunk_size", None)
+    elif "chunk_size" in hash_kwargs:
+        hash_kwargs["chunk_size"] = int(hash_kwargs["chunk_size"])
+    if hash_kwargs["hash_mode"] == "sampled":
+        hash_kwargs["byte_count"] = int(
+            integrity_data.get("byte_count", 10**8)
+        )
+    return hash_kwargs
+
 
 # pylint: disable-next=too-many-instance-attributes
 class Pantry():
@@ -71,6 +103,22 @@ class Pantry():
             MONGODB_USERNAME, MONGODB_PASSWORD, METADATA_COLLECTION,
             MANIFEST_COLLECTION, SUPPLEMENT_COLLECTION.
             If keys are not present, default values will be used if necessary.
+        **hash_algorithm: str (optional)
+            The hash algorithm used for the integrity data of baskets uploaded
+            to this pantry. One of weave.hashing.hash_algorithms. This is
+            saved in the pantry's config.json. If not provided, the value from
+            config.json is used, falling back to "sha256".
+        **hash_cache: weave.HashCache (optional)
+            A persistent cache of file hashes, consulted when deriving the
+            integrity data of uploaded files so unchanged files are not
+            re-hashed.
+        **artifact_cache_size: int (default=0)
+            Maximum number of parsed basket artifacts (manifests, supplements
+            and metadata) cached by this pantry and shared by the baskets it
+            returns. The cache is disabled when 0.
+        **validate_artifact_cache: bool (default=False)
+            If True, cached artifacts are checked against their ETag (or
+            modification time) on each access. See weave.ArtifactCache.
         """
         self.file_system = kwargs.pop("file_system", None)
         if self.file_system is None:
@@ -94,6 +142,25 @@ class Pantry():
         self.setup_config = {}
         self.load_setup_config()
 
+        self.hash_algorithm = self.setup_config.get(
+            "hash_algorithm", DEFAULT_HASH_ALGORITHM
+        )
+        if "hash_algorithm" in kwargs:
+            self.hash_algorithm = kwargs.pop("hash_algorithm")
+            # Raise an error for unknown or unavailable algorithms. The
+            # algorithm of the config is only checked when files are hashed
+            # (ie on upload), so the pantry can be read without the optional
+            # dependency of its algorithm.
+            get_hasher(self.hash_algorithm)
+        self.hash_cache = kwargs.pop("hash_cache", None)
+        artifact_cache_size = kwargs.pop("artifact_cache_size", 0)
+        validate_artifact_cache = kwargs.pop("validate_artifact_cache", False)
+        self.artifact_cache = None
+        if artifact_cache_size:
+            self.artifact_cache = ArtifactCache(
+                artifact_cache_size, validate=validate_artifact_cache
+            )
+
         # Check if file system is read-only. If so, raise error.
         try:
             test_file_path = os.path.join(
@@ -171,6 +238,7 @@ class Pantry():
             self.file_system.__class__.__name__
         )
         self.setup_config["pantry_path"] = self.pantry_path
+        self.setup_config["hash_algorithm"] = self.hash_algorithm
 
         # Add the provided mongo_config to the main config dictionary.
         if self.mongo_config:
@@ -192,16 +260,58 @@ class Pantry():
         ) as outfile:
             json.dump(self.setup_config, outfile)
 
-    def validate(self) -> list[Warning | str]:
+    def validate(self, **kwargs) -> list[Warning | str]:
         """Convenient wrapper function to validate the pantry.
 
+        Parameters
+        ----------
+        **kwargs:
+            Additional parameters to pass to create_validation_report, ie
+            max_workers, validation_state and rebuild_index.
+
         Returns
         ----------
         A list of all invalid basket locations (will return an empty list if
         no warnings are raised)
         """
 
-        return validate_pantry(self)
+        return validate_pantry(self, **kwargs)
+
+    def create_validation_report(self, **kwargs) -> ValidationReport:
+        """Convenient wrapper function to validate the pantry into a
+        structured ValidationReport.
+
+        Parameters
+        ----------
+        **kwargs:
+            Additional parameters to pass to create_validation_report, ie
+            max_workers, shard_count, shard_index, validation_state and
+            rebuild_index.
+
+        Returns
+        ----------
+        A ValidationReport with a record of every problem found.
+        """
+
+        return create_validation_report(self, **kwargs)
+
+    def audit(self, **kwargs) -> ValidationReport:
+        """Convenient wrapper function to audit the integrity of the files
+        stored in the pantry, by hashing them again.
+
+        Parameters
+        ----------
+        **kwargs:
+            Additional parameters to pass to audit_pantry, ie basket_uuids,
+            max_workers, max_bytes_per_second, max_files_per_second and
+            checkpoint_path.
+
+        Returns
+        ----------
+        A ValidationReport with a record of every problem found.
+        """
+
+        return audit_pantry(self, **kwargs)
 
     def delete_basket(self, basket_address: str, **kwargs):
         """Deletes basket of given UUID or path.
@@ -231,6 +341,8 @@ class Pantry():
         self.validate_path_in_pantry(remove_item.iloc[0].address)
         self.index.untrack_basket(remove_item.iloc[0].address, **kwargs)
         self.file_system.rm(remove_item.iloc[0].address, recursive=True)
+        if self.artifact_cache is not None:
+            self.artifact_cache.invalidate(remove_item.iloc[0].address)
 
         if self.mongo_client is not None:
             MongoLoader(self).remove_document(remove_item.iloc[0].uuid)
@@ -263,6 +375,9 @@ class Pantry():
             and stored in the basket in upload file_system.
         **label: str (optional)
             Optional user friendly label associated with the basket.
+        **hash_algorithm: str (optional)
+            Hash algorithm used for the basket's integrity data. Defaults to
+            the pantry's hash_algorithm.
         """
         # Check if file system is read-only. If so, raise error.
         if self.is_read_only:
@@ -270,23 +385,18 @@ class Pantry():
                 "Unable to upload a basket to a read-only file system."
             )
 
-        parent_ids = kwargs.pop("parent_ids", [])
-        metadata = kwargs.pop("metadata", {})
-        label = kwargs.pop("label", "")
-
-        up_dir = UploadBasket(
-            upload_items=upload_items,
-            basket_type=basket_type,
-            file_system=self.file_system,
-            pantry_path=self.pantry_path,
-            parent_ids=parent_ids,
-            metadata=metadata,
-            label=label,
-            **kwargs,
-        ).get_upload_path()
+        metadata = kwargs.get("metadata", {})
+        upload = self._upload_basket_to_fs(
+            upload_items, basket_type, **kwargs
+        )
 
-        single_indice_index = create_index_from_fs(up_dir, self.file_system)
-        self.index.track_basket(single_indice_index)
+        # The row is built from the manifest held in memory, so tracking the
+        # basket requires no reads of the freshly uploaded basket.
+        single_indice_index = upload.get_index_row()
+        self.index.track_basket(
+            single_indice_index,
+            basket_metadata={single_indice_index.iloc[0].uuid: metadata},
+        )
 
         if self.mongo_client is not None:
             MongoLoader(self).load_mongo(
@@ -296,7 +406,130 @@ class Pantry():
 
         return single_indice_index
 
-    def get_basket(self, basket_address: str) -> Basket:
+    def upload_baskets(
+        self, basket_specs: list[dict], **kwargs
+    ) -> pd.DataFrame:
+        """Upload many baskets to the pantry concurrently.
+
+        The baskets are tracked by the index in a single bulk write, and (if a
+        mongo_client is set) loaded into mongo with a single bulk write per
+        collection. The index rows are built from the manifests held in
+        memory, so the uploaded baskets are not read back.
+
+        If any basket fails to upload, the baskets that were uploaded
+        successfully are still tracked, and the first exception is re-raised
+        afterwards. Failed baskets are cleaned up by UploadBasket.
+
+        Parameters
+        ----------
+        basket_specs: [dict]
+            A list of dictionaries, one per basket, containing the arguments
+            of upload_basket: 'upload_items' and 'basket_type' (required), and
+            optionally 'parent_ids', 'metadata', 'label' or any other keyword
+            argument accepted by upload_basket.
+        **max_workers: int (optional)
+            Maximum number of baskets uploaded concurrently.
+
+        Returns
+        ----------
+        A pd.DataFrame containing the index rows of the uploaded baskets.
+        """
+        # Check if file system is read-only. If so, raise error.
+        if self.is_read_only:
+            raise ValueError(
+                "Unable to upload a basket to a read-only file system."
+            )
+        if not isinstance(basket_specs, list) or not all(
+            isinstance(spec, dict) for spec in basket_specs
+        ):
+            raise TypeError(
+                "'basket_specs' must be a list of dictionaries: "
+                f"'{basket_specs}'"
+            )
+
+        with ThreadPoolExecutor(
+            max_workers=kwargs.get("max_workers", None)
+        ) as pool:
+            futures = [
+                pool.submit(self._upload_basket_to_fs, **dict(spec))
+                for spec in basket_specs
+            ]
+
+        uploads = []
+        first_exception = None
+        for future in futures:
+            try:
+                uploads.append(future.result())
+            # Every failure is re-raised once the successful uploads are
+            # tracked, so catching broadly here is intentional.
+            # pylint: disable-next=broad-exception-caught
+            except Exception as the_exception:
+                if first_exception is None:
+                    first_exception = the_exception
+
+        index_rows = create_index_from_manifests(
+            {
+                upload.get_upload_path(): upload.get_manifest()
+                for upload in uploads
+            },
+            self.file_system,
+        )
+        if len(index_rows) > 0:
+            # track_basket may modify the frame, so give it a copy.
+            self.index.track_basket(
+                index_rows.copy(),
+                basket_metadata={
+                    upload.get_manifest()["uuid"]:
+                        upload.kwargs.get("metadata", {})
+                    for upload in uploads
+                },
+            )
+
+            if self.mongo_client is not None:
+                MongoLoader(self).load_mongo_many([
+                    {
+                        "manifest": upload.get_manifest(),
+                        "supplement": upload.get_supplement(),
+                        "metadata": upload.kwargs.get("metadata", {}),
+                    }
+                    for upload in uploads
+                ])
+
+        if first_exception is not None:
+            raise first_exception
+        return index_rows
+
+    def _upload_basket_to_fs(
+        self, upload_items: list[dict], basket_type: str, **kwargs
+    ) -> UploadBasket:
+        """Upload a basket to the pantry's file system, without tracking it.
+
+        Accepts the same arguments as upload_basket, and applies the pantry's
+        defaults before handing them to UploadBasket.
+        """
+        kwargs.setdefault("parent_ids", [])
+        kwargs.setdefault("metadata", {})
+        kwargs.setdefault("label", "")
+        kwargs.setdefault("hash_algorithm", self.hash_algorithm)
+        if self.hash_cache is not None:
+            kwargs.setdefault("hash_cache", self.hash_cache)
+        # Raise an error for unknown or unavailable algorithms before anything
+        # is uploaded.
+        get_hasher(kwargs["hash_algorithm"])
+
+        upload = UploadBasket(
+            upload_items=upload_items,
+            basket_type=basket_type,
+            file_system=self.file_system,
+            pantry_path=self.pantry_path,
+            **kwargs,
+        )
+        if self.artifact_cache is not None:
+            # Drop anything cached for a previous basket at the same address.
+            self.artifact_cache.invalidate(upload.get_upload_path())
+        return upload
+
+    def get_basket(self, basket_address: str, lazy: bool = False) -> Basket:
         """Retrieves a basket of given UUID or path.
 
         Parameters
@@ -304,6 +537,9 @@ class Pantry():
         basket_address: str
             Argument can take one of two forms: either a path to the Basket
             directory, or the UUID of the basket.
+        lazy: bool (default=False)
+            If True, the Basket is constructed from the index row without
+            accessing storage. See Basket.from_index_row.
 
         Returns
         ----------
@@ -317,8 +553,178 @@ class Pantry():
         if len(row) == 0:
             raise ValueError(f"Basket does not exist: {basket_address}")
         self.validate_path_in_pantry(row.iloc[0].address)
+        if lazy:
+            return Basket.from_index_row(row.iloc[0], pantry=self)
         return Basket(row.iloc[0].address, pantry=self)
 
+    def iter_baskets(self, index_rows: pd.DataFrame = None):
+        """Lazily iterate over baskets in the pantry.
+
+        Each Basket is constructed from its index row without accessing
+        storage (see Basket.from_index_row), so inspecting members such as
+        basket_type or label is free.
+
+        Parameters
+        ----------
+        index_rows: pd.DataFrame (optional)
+            Index rows of the baskets to iterate over, ie the result of an
+            index query. Defaults to every basket in the index.
+
+        Yields
+        ----------
+        A lazily loaded Basket per index row.
+        """
+        if index_rows is None:
+            index_rows = self.index.to_pandas_df(max_rows=None)
+        for _, row in index_rows.iterrows():
+            self.validate_path_in_pantry(row["address"])
+            yield Basket.from_index_row(row, pantry=self)
+
+    def get_manifest_many(
+        self, baskets: list[str] | pd.DataFrame, **kwargs
+    ) -> dict | pd.DataFrame:
+        """Retrieve the manifests of many baskets at once.
+
+        See get_metadata_many for the parameters and return values.
+        """
+        return self._get_artifacts_many(
+            baskets, "basket_manifest.json", **kwargs
+        )
+
+    def get_supplement_many(
+        self, baskets: list[str] | pd.DataFrame, **kwargs
+    ) -> dict | pd.DataFrame:
+        """Retrieve the supplements of many baskets at once.
+
+        See get_metadata_many for the parameters and return values.
+        """
+        return self._get_artifacts_many(
+            baskets, "basket_supplement.json", **kwargs
+        )
+
+    def get_metadata_many(
+        self, baskets: list[str] | pd.DataFrame, **kwargs
+    ) -> dict | pd.DataFrame:
+        """Retrieve the metadata of many baskets at once.
+
+        The baskets are looked up in the index in bulk, and their artifacts
+        are fetched concurrently with batched reads rather than one basket at
+        a time.
+
+        Parameters
+        ----------
+        baskets: [str] or pd.DataFrame
+            Either a list of basket UUIDs or paths, or index rows (ie the
+            result of an index query), in which case no index lookup is made.
+        **as_dataframe: bool (default=False)
+            If True, return a pd.DataFrame indexed by uuid, with a column per
+            (flattened) key of the artifacts. Otherwise return a dictionary.
+        **max_workers: int (optional)
+            Maximum number of artifacts fetched concurrently.
+
+        Returns
+        ----------
+        A dictionary mapping each basket's uuid to its parsed artifact (None
+        if the artifact does not exist), or a pd.DataFrame if as_dataframe is
+        True.
+        """
+        return self._get_artifacts_many(
+            baskets, "basket_metadata.json", **kwargs
+        )
+
+    def _get_artifacts_many(
+        self, baskets: list[str] | pd.DataFrame, file_name: str, **kwargs
+    ) -> dict | pd.DataFrame:
+        """Retrieve the given artifact of many baskets at once.
+
+        See get_metadata_many.
+        """
+        if isinstance(baskets, pd.DataFrame):
+            index_rows = baskets
+        elif isinstance(baskets, list):
+            baskets = [str(basket) for basket in baskets]
+            index_rows = pd.concat(
+                [
+                    self.index.get_rows(
+                        baskets[start:start + _GET_ROWS_BATCH_SIZE]
+                    )
+                    for start in range(
+                        0, len(baskets), _GET_ROWS_BATCH_SIZE
+                    )
+                ] or [pd.DataFrame(columns=["uuid", "address"])],
+                ignore_index=True,
+            )
+            missing = set(baskets).difference(
+                index_rows["uuid"], index_rows["address"]
+            )
+            if missing:
+                raise ValueError(
+                    f"Baskets do not exist: {sorted(missing)}"
+                )
+        else:
+            raise TypeError(
+                "'baskets' must be a list of basket addresses or a "
+                f"pd.DataFrame of index rows: '{baskets}'"
+            )
+
+        paths = {}
+        for basket_uuid, address in zip(
+            index_rows["uuid"], index_rows["address"]
+        ):
+            self.validate_path_in_pantry(address)
+            paths[basket_uuid] = os.path.join(address, file_name)
+
+        contents = self._cat_files(
+            list(paths.values()), kwargs.get("max_workers", None)
+        )
+        artifacts = {}
+        for basket_uuid, path in paths.items():
+            content = contents.get(path, None)
+            if isinstance(content, FileNotFoundError):
+                content = None
+            elif isinstance(content, Exception):
+                raise content
+            artifacts[basket_uuid] = (
+                None if content is None else json.loads(content)
+            )
+
+        if not kwargs.get("as_dataframe", False):
+            return artifacts
+        artifacts_df = pd.json_normalize(
+            [artifact or {} for artifact in artifacts.values()]
+        )
+        artifacts_df.index = pd.Index(list(artifacts), name="uuid")
+        return artifacts_df
+
+    def _cat_files(
+        self, paths: list[str], max_workers: int = None
+    ) -> dict:
+        """Read many files concurrently.
+
+        Async file systems (ie s3fs) batch the reads on their event loop.
+        Other file systems read the files from a pool of threads.
+
+        Returns
+        ----------
+        A dictionary mapping each path to its contents, or to the exception
+        raised while reading it.
+        """
+        if getattr(self.file_system, "async_impl", False):
+            return self.file_system.cat(
+                paths, on_error="return", batch_size=max_workers
+            )
+
+        def cat_file(path):
+            try:
+                return self.file_system.cat_file(path)
+            # The exception is handed back to the caller.
+            # pylint: disable-next=broad-exception-caught
+            except Exception as the_exception:
+                return the_exception
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(paths, pool.map(cat_file, paths)))
+
     def does_file_exist(self, file_path: str, **kwargs) -> list[str]:
         """Check if a file already exists inside the pantry and return
         the uuids where it does.
@@ -335,12 +741,17 @@ class Pantry():
         ----------
         list of basket uuids of where the file exists if it does. If file does
         not exist in the pantry, an empty list is returned.
+
+        The file is hashed with every combination of hash algorithm, hash
+        mode, chunk size and byte count recorded in the pantry, and hashes are
+        only compared against integrity data recorded with the same hash
+        algorithm. Integrity data without a recorded algorithm or mode
+        predates them and is treated as sha256 and 'sampled'.
         """
         if not _HAS_PYMONGO:
             raise ImportError("Missing Dependency. The package 'pymongo' "
                               "is required to use this function.")
 
-        integrity_data = derive_integrity_data(file_path)['hash']
         try:
             mongo_loader = MongoLoader(pantry=self)
         except pymongo.errors.ServerSelectionTimeoutError:
@@ -353,9 +764,54 @@ class Pantry():
 
         supplement_collection = mongo_loader.database['supplement']
 
-        uuids = [f['uuid'] for f in supplement_collection.find(
-            {'integrity_data.hash': {'$in': [integrity_data]}},
-            {'uuid':1, '_id':0}
-        )]
+        # The file is hashed once for every distinct way files in the pantry
+        # were hashed, as a file hashed in another mode (ie 'full' or
+        # 'chunked') has a different hash.
+        hash_settings = {
+            tuple(sorted(_get_recorded_hash_kwargs(document['_id']).items()))
+            for document in supplement_collection.aggregate([
+                {'$unwind': '$integrity_data'},
+                {'$group': {'_id': {
+                    'hash_algorithm': '$integrity_data.hash_algorithm',
+                    'hash_mode': '$integrity_data.hash_mode',
+                    'chunk_size': '$integrity_data.chunk_size',
+                    'byte_count': '$integrity_data.byte_count',
+                }}},
+            ])
+        }
+        hash_settings.add(
+            tuple(sorted(_get_recorded_hash_kwargs({}).items()))
+        )
+
+        file_hashes = {}
+        for hash_setting in sorted(hash_settings, key=str):
+            hash_kwargs = dict(hash_setting)
+            try:
+                file_hash = derive_integrity_data(file_path, **hash_kwargs)[
+                    'hash'
+                ]
+            except (ImportError, ValueError):
+                # The algorithm is unknown or unavailable in this environment.
+                continue
+            file_hashes.setdefault(
+                hash_kwargs['hash_algorithm'], set()
+            ).add(file_hash)
+
+        uuids = []
+        for hash_algorithm, hashes in sorted(file_hashes.items()):
+            recorded_algorithms = [hash_algorithm]
+            if hash_algorithm == DEFAULT_HASH_ALGORITHM:
+                # A null match also matches entries missing the field.
+                recorded_algorithms.append(None)
+
+            for document in supplement_collection.find(
+                {'integrity_data': {'$elemMatch': {
+                    'hash': {'$in': sorted(hashes)},
+                    'hash_algorithm': {'$in': recorded_algorithms},
+                }}},
+                {'uuid':1, '_id':0}
+            ):
+                if document['uuid'] not in uuids:
+                    uuids.append(document['uuid'])
 
         return uuids
@@ -0,0 +1,161 @@
+"""Wherein is contained the SchemaValidator class, and the validators of the
+basket manifest and supplement schemas, which are compiled once on import."""
+import jsonschema
+
+from .config import manifest_schema, supplement_schema
+
+# Checks of the JSON schema types supported by the fast path. They are at
+# least as strict as jsonschema's, ie booleans are not numbers.
+_TYPE_CHECKS = {
+    "string": lambda x: isinstance(x, str),
+    "number": lambda x: (
+        isinstance(x, (int, float)) and not isinstance(x, bool)
+    ),
+    "integer": lambda x: isinstance(x, int) and not isinstance(x, bool),
+    "boolean": lambda x: isinstance(x, bool),
+    "array": lambda x: isinstance(x, list),
+    "object": lambda x: isinstance(x, dict),
+}
+
+# JSON schema keywords supported by the fast path.
+_FAST_PATH_KEYWORDS = {
+    "type",
+    "enum",
+    "properties",
+    "required",
+    "additionalProperties",
+    "items",
+    "minItems",
+}
+
+
+# The compiled check mirrors the structure of the schema keywords.
+# pylint: disable-next=too-many-return-statements
+def compile_fast_check(schema: dict):
+    """Compile a JSON schema into a plain python check.
+
+    Only a subset of JSON schema is supported (see _FAST_PATH_KEYWORDS). The
+    check never accepts an instance jsonschema would reject, but may reject
+    instances jsonschema would accept (ie decimal numbers), so a rejected
+    instance must be checked again with jsonschema.
+
+    Parameters
+    ----------
+    schema: dict
+        The JSON schema to compile.
+
+    Returns
+    ----------
+    A function taking an instance and returning True if it is valid, or None
+    if the schema uses unsupported keywords.
+    """
+    if not isinstance(schema, dict) or set(schema) - _FAST_PATH_KEYWORDS:
+        return None
+
+    type_check = None
+    if "type" in schema:
+        if not isinstance(schema["type"], str):
+            return None
+        type_check = _TYPE_CHECKS.get(schema["type"], None)
+        if type_check is None:
+            return None
+
+    properties = {}
+    for key, property_schema in schema.get("properties", {}).items():
+        properties[key] = compile_fast_check(property_schema)
+        if properties[key] is None:
+            return None
+
+    items_check = None
+    if "items" in schema:
+        items_check = compile_fast_check(schema["items"])
+        if items_check is None:
+            return None
+
+    additional_properties = schema.get("additionalProperties", True)
+    if not isinstance(additional_properties, bool):
+        return None
+    enum = schema.get("enum", None)
+    required = schema.get("required", [])
+    min_items = schema.get("minItems", 0)
+
+    # pylint: disable-next=too-many-return-statements
+    def check(instance) -> bool:
+        if type_check is not None and not type_check(instance):
+            return False
+        if enum is not None and not any(
+            # Unlike ==, jsonschema's enum does not treat True as 1.
+            type(instance) is type(value) and instance == value
+            for value in enum
+        ):
+            return False
+        # As in JSON schema, object keywords only apply to objects, and
+        # array keywords only apply to arrays.
+        if isinstance(instance, dict):
+            if any(key not in instance for key in required):
+                return False
+            if not additional_properties and any(
+                key not in properties for key in instance
+            ):
+                return False
+            for key, property_check in properties.items():
+                if key in instance and not property_check(instance[key]):
+                    return False
+        elif isinstance(instance, list):
+            if len(instance) < min_items:
+                return False
+            if items_check is not None and not all(
+                items_check(item) for item in instance
+            ):
+                return False
+        return True
+
+    return check
+
+
+class SchemaValidator():
+    """A JSON schema validator which is compiled once, and reused for every
+    document.
+
+    Documents are first checked by a plain python fast path compiled from
+    the schema. Only documents rejected by the fast path are validated by
+    jsonschema, which gives the error messages.
+    """
+
+    def __init__(self, schema: dict):
+        """Initializes the SchemaValidator.
+
+        Parameters
+        ----------
+        schema: dict
+            The JSON schema to validate against.
+        """
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        self.schema = schema
+        self._validator = validator_class(schema)
+        self._fast_check = compile_fast_check(schema)
+
+    def is_valid(self, instance) -> bool:
+        """Return True if the instance is valid against the schema."""
+        if self._fast_check is not None and self._fast_check(instance):
+            return True
+        return self._validator.is_valid(instance)
+
+    def validate(self, instance):
+        """Validate the instance against the schema.
+
+        Raises jsonschema.exceptions.ValidationError if the instance is
+        invalid, like jsonschema.validate.
+        """
+        if self._fast_check is not None and self._fast_check(instance):
+            return
+        error = jsonschema.exceptions.best_match(
+            self._validator.iter_errors(instance)
+        )
+        if error is not None:
+            raise error
+
+
+manifest_validator = SchemaValidator(manifest_schema)
+supplement_validator = SchemaValidator(supplement_schema)
@@ -0,0 +1,111 @@
+"""Wherein is contained functionality concerning basket supplements whose
+integrity data is stored in a JSON Lines sidecar file, so it can be written
+and read one entry at a time."""
+import json
+import os
+
+# Name of the sidecar file holding the integrity data of a supplement, one
+# JSON entry per line.
+INTEGRITY_DATA_FILENAME = "basket_integrity_data.jsonl"
+
+
+class SupplementWriter():
+    """Write the integrity data of a supplement to its sidecar file, one
+    entry at a time, as the entries are derived.
+
+    The supplement itself then only holds the upload_items, an empty
+    integrity_data list and the name of the sidecar (integrity_data_file).
+    """
+
+    def __init__(self, file_system, basket_path: str):
+        """Initializes the SupplementWriter.
+
+        Parameters
+        ----------
+        file_system: fsspec object
+            The file system hosting the basket.
+        basket_path: str
+            Path of the basket directory the sidecar is written to.
+        """
+        self.path = os.path.join(basket_path, INTEGRITY_DATA_FILENAME)
+        # pylint: disable-next=consider-using-with
+        self._file = file_system.open(self.path, "w", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, integrity_data: dict):
+        """Append the integrity data of a file to the sidecar."""
+        self._file.write(json.dumps(integrity_data) + "\n")
+
+    def close(self):
+        """Close the sidecar file, committing it to the file system."""
+        self._file.close()
+
+
+def iter_integrity_data(
+    file_system, supplement_path: str, supplement: dict = None
+):
+    """Yield the integrity data entries of a supplement.
+
+    If the supplement has a sidecar, its entries are read one line at a time,
+    so the integrity data is never all held in memory.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system hosting the basket.
+    supplement_path: str
+        Path of the basket_supplement.json.
+    supplement: dict (optional)
+        The loaded supplement. Defaults to loading it from supplement_path.
+    """
+    if supplement is None:
+        with file_system.open(supplement_path, "rb") as file:
+            supplement = json.load(file)
+    yield from supplement["integrity_data"]
+    if "integrity_data_file" not in supplement:
+        return
+
+    sidecar_path = os.path.join(
+        os.path.dirname(supplement_path), supplement["integrity_data_file"]
+    )
+    with file_system.open(sidecar_path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_supplement(
+    file_system, supplement_path: str, supplement: dict = None
+) -> dict:
+    """Load a supplement with every entry of its sidecar (if any) in its
+    integrity_data, as in supplements without a sidecar.
+
+    Parameters
+    ----------
+    file_system: fsspec object
+        The file system hosting the basket.
+    supplement_path: str
+        Path of the basket_supplement.json.
+    supplement: dict (optional)
+        The loaded supplement. Defaults to loading it from supplement_path.
+
+    Returns
+    ----------
+    The supplement as a python dictionary.
+    """
+    if supplement is None:
+        with file_system.open(supplement_path, "rb") as file:
+            supplement = json.load(file)
+    if "integrity_data_file" not in supplement:
+        return supplement
+    return {
+        **supplement,
+        "integrity_data": list(
+            iter_integrity_data(file_system, supplement_path, supplement)
+        ),
+    }
@@ -190,6 +190,11 @@ def cleanup_sql_index(index):
             DROP TABLE IF EXISTS {index.pantry_schema}.parent_uuids;
         """, commit=True)
 
+        # Drop the basket_metadata (User Table) if it exists.
+        index.execute_sql(f"""
+            DROP TABLE IF EXISTS {index.pantry_schema}.basket_metadata;
+        """, commit=True)
+
         # Drop the pantry_schema (Schema) if it exists.
         index.execute_sql(f"""
             DROP SCHEMA IF EXISTS {index.pantry_schema};
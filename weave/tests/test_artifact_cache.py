@@ -0,0 +1,174 @@
+"""Pytests for the ArtifactCache functionality."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from fsspec.implementations.local import LocalFileSystem
+from fsspec.implementations.memory import MemoryFileSystem
+
+from weave import ArtifactCache, IndexPandas, Pantry
+from weave.tests.pytest_resources import PantryForTest, get_file_systems
+
+
+# Create fsspec objects to be tested, and add to file_systems list.
+file_systems, file_systems_ids = get_file_systems()
+
+
+# Test with different fsspec file systems (above).
+@pytest.fixture(
+    name="test_pantry",
+    params=file_systems,
+    ids=file_systems_ids,
+)
+def fixture_test_pantry(request, tmpdir):
+    """Sets up test pantry for the tests."""
+    file_system = request.param
+    test_pantry = PantryForTest(tmpdir, file_system)
+    yield test_pantry
+    test_pantry.cleanup_pantry()
+
+
+def write_artifact(tmp_path, basket_name, contents):
+    """Write a basket_metadata.json artifact and return its path."""
+    basket_path = tmp_path / basket_name
+    basket_path.mkdir(exist_ok=True)
+    artifact_path = basket_path / "basket_metadata.json"
+    artifact_path.write_text(json.dumps(contents))
+    return str(artifact_path)
+
+
+def test_artifact_cache_load_reads_once(tmp_path):
+    """Test that an artifact is only read on the first load, and that copies
+    are returned.
+    """
+    file_system = LocalFileSystem()
+    artifact_path = write_artifact(tmp_path, "basket", {"key": "value"})
+    cache = ArtifactCache()
+
+    assert cache.load(file_system, artifact_path) == {"key": "value"}
+    with patch.object(file_system, "open") as mock_open:
+        artifact = cache.load(file_system, artifact_path)
+        mock_open.assert_not_called()
+    assert artifact == {"key": "value"}
+
+    artifact["key"] = "modified"
+    assert cache.load(file_system, artifact_path) == {"key": "value"}
+
+
+def test_artifact_cache_evicts_least_recently_used(tmp_path):
+    """Test that the least recently used artifact is evicted when the cache
+    is full.
+    """
+    file_system = LocalFileSystem()
+    paths = [write_artifact(tmp_path, f"basket_{i}", i) for i in range(3)]
+    cache = ArtifactCache(max_entries=2)
+
+    cache.load(file_system, paths[0])
+    cache.load(file_system, paths[1])
+    # Using basket_0 makes basket_1 the least recently used artifact.
+    cache.load(file_system, paths[0])
+    cache.load(file_system, paths[2])
+
+    assert len(cache) == 2
+    with patch.object(file_system, "open") as mock_open:
+        cache.load(file_system, paths[0])
+        cache.load(file_system, paths[2])
+        mock_open.assert_not_called()
+
+
+def test_artifact_cache_invalidate(tmp_path):
+    """Test that invalidating a basket removes its cached artifacts."""
+    file_system = LocalFileSystem()
+    artifact_path = write_artifact(tmp_path, "basket", {"key": "value"})
+    cache = ArtifactCache()
+    cache.load(file_system, artifact_path)
+
+    cache.invalidate(str(tmp_path / "basket"))
+    assert len(cache) == 0
+
+
+def test_artifact_cache_validate_detects_modification(tmp_path):
+    """Test that a validating cache re-reads an artifact modified outside of
+    the cache.
+    """
+    file_system = LocalFileSystem()
+    artifact_path = write_artifact(tmp_path, "basket", {"key": "value"})
+    cache = ArtifactCache(validate=True)
+    cache.load(file_system, artifact_path)
+
+    write_artifact(tmp_path, "basket", {"key": "new value"})
+    stat = os.stat(artifact_path)
+    os.utime(artifact_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.load(file_system, artifact_path) == {"key": "new value"}
+
+
+def test_artifact_cache_validate_without_version():
+    """Test that a validating cache re-reads artifacts on file systems which
+    report no version identifier, even when their size is unchanged.
+    """
+    file_system = MemoryFileSystem()
+    file_system.pipe("/basket/basket_metadata.json", b'{"key": "aaa"}')
+    cache = ArtifactCache(validate=True)
+    try:
+        cache.load(file_system, "/basket/basket_metadata.json")
+        file_system.pipe(
+            "/basket/basket_metadata.json", b'{"key": "bbb"}'
+        )
+        assert cache.load(file_system, "/basket/basket_metadata.json") == {
+            "key": "bbb"
+        }
+    finally:
+        file_system.rm("/basket", recursive=True)
+
+
+def test_artifact_cache_max_entries_invalid():
+    """Test that ArtifactCache raises errors for an invalid max_entries."""
+    with pytest.raises(TypeError, match="'max_entries' must be an int"):
+        ArtifactCache("1")
+    with pytest.raises(
+        ValueError, match="'max_entries' must be greater than zero"
+    ):
+        ArtifactCache(0)
+
+
+def test_pantry_artifact_cache_shared_between_baskets(test_pantry):
+    """Test that baskets retrieved from a pantry with an artifact cache share
+    it, and that update_metadata and delete_basket invalidate it.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        artifact_cache_size=16,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    uuid = pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        basket_type="test_basket",
+        metadata={"key": "value"},
+    ).iloc[0].uuid
+
+    assert pantry.get_basket(uuid).get_metadata() == {"key": "value"}
+    with patch.object(pantry.artifact_cache, "put") as mock_put:
+        basket = pantry.get_basket(uuid)
+        assert basket.get_metadata() == {"key": "value"}
+        mock_put.assert_not_called()
+
+    # Mongo is not under test here.
+    with patch("weave.basket.MongoLoader"):
+        basket.update_metadata({"key": "new value"})
+    assert pantry.get_basket(uuid).get_metadata() == {"key": "new value"}
+
+    pantry.delete_basket(uuid)
+    assert len(pantry.artifact_cache) == 0
+
+
+def test_pantry_artifact_cache_disabled_by_default(test_pantry):
+    """Test that the pantry's artifact cache is disabled by default."""
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    assert pantry.artifact_cache is None
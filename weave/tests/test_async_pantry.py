@@ -0,0 +1,232 @@
+"""Pytests for the AsyncPantry and AsyncBasket functionality."""
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
+from fsspec.implementations.local import LocalFileSystem
+
+from weave import AsyncBasket, AsyncPantry, IndexPandas, IndexSQLite, Pantry
+from weave.async_pantry import call_file_system
+from weave.tests.pytest_resources import PantryForTest, get_file_systems
+
+
+# Create fsspec objects to be tested, and add to file_systems list.
+file_systems, file_systems_ids = get_file_systems()
+
+
+# Test with different fsspec file systems (above).
+@pytest.fixture(
+    name="test_pantry",
+    params=file_systems,
+    ids=file_systems_ids,
+)
+def fixture_test_pantry(request, tmpdir):
+    """Sets up test pantry for the tests."""
+    file_system = request.param
+    test_pantry = PantryForTest(tmpdir, file_system)
+    yield test_pantry
+    test_pantry.cleanup_pantry()
+
+
+@pytest.mark.parametrize("index", [IndexPandas, IndexSQLite])
+def test_async_pantry_upload_and_get_basket(test_pantry, index, tmp_path):
+    """Test that a basket uploaded through the AsyncPantry can be retrieved
+    and read through an AsyncBasket.
+    """
+    pantry = Pantry(
+        index,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        db_path=str(tmp_path / "index.db"),
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+
+    async def run():
+        async with AsyncPantry(pantry) as async_pantry:
+            row = await async_pantry.upload_basket(
+                [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+                basket_type="test_basket",
+                metadata={"key": "value"},
+            )
+            uuid = row.iloc[0].uuid
+            basket = await async_pantry.get_basket(uuid)
+            return (
+                uuid,
+                basket,
+                await basket.get_manifest(),
+                await basket.get_supplement(),
+                await basket.get_metadata(),
+                await basket.ls(),
+                await async_pantry.get_baskets_of_type("test_basket"),
+            )
+
+    (uuid, basket, manifest, supplement, metadata, ls_results,
+     baskets_of_type) = asyncio.run(run())
+
+    assert isinstance(basket, AsyncBasket)
+    assert basket.uuid == uuid
+    assert manifest == pantry.get_basket(uuid).get_manifest()
+    assert supplement == pantry.get_basket(uuid).get_supplement()
+    assert metadata == {"key": "value"}
+    assert [os.path.basename(path) for path in ls_results] == ["basket_one"]
+    assert baskets_of_type.iloc[0].uuid == uuid
+
+
+def test_async_pantry_sqlite_thread(test_pantry, tmp_path):
+    """Test that the AsyncPantry uses its own SQLite connection, leaving the
+    pantry's connection bound to the thread that opened it.
+    """
+    pantry = Pantry(
+        IndexSQLite,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        db_path=str(tmp_path / "index.db"),
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+
+    async def run():
+        async with AsyncPantry(pantry) as async_pantry:
+            await async_pantry.upload_basket(
+                [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+                basket_type="test_basket",
+            )
+            return await async_pantry.to_pandas_df()
+
+    assert len(asyncio.run(run())) == 1
+    assert len(pantry.index.to_pandas_df()) == 1
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(sqlite3.ProgrammingError):
+            executor.submit(pantry.index.to_pandas_df).result()
+
+
+def test_async_pantry_get_basket_does_not_exist(test_pantry):
+    """Test that getting a basket that is not in the index raises an error."""
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+
+    async def run():
+        async with AsyncPantry(pantry) as async_pantry:
+            await async_pantry.get_basket("does_not_exist")
+
+    with pytest.raises(ValueError, match="Basket does not exist"):
+        asyncio.run(run())
+
+
+def test_async_basket_download(test_pantry, tmp_path):
+    """Test that an AsyncBasket downloads the basket's contents."""
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    upload_path = test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+
+    async def run():
+        async with AsyncPantry(pantry) as async_pantry:
+            basket = await AsyncBasket.from_path(upload_path, async_pantry)
+            await basket.download(str(tmp_path))
+
+    asyncio.run(run())
+    downloaded = tmp_path / "0001" / "basket_one" / "test.txt"
+    assert downloaded.read_text() == "This is a test"
+    assert not (tmp_path / "0001" / "basket_manifest.json").exists()
+
+
+def test_async_basket_download_resume_verify(test_pantry, tmp_path):
+    """Test that AsyncBasket.download supports Basket.download's resuming
+    and verification."""
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    upload_path = test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    downloaded = tmp_path / "0001" / "basket_one" / "test.txt"
+
+    async def run(**kwargs):
+        async with AsyncPantry(pantry) as async_pantry:
+            basket = await AsyncBasket.from_path(upload_path, async_pantry)
+            await basket.download(str(tmp_path), **kwargs)
+
+    asyncio.run(run(verify=True))
+    assert downloaded.read_text() == "This is a test"
+
+    # Truncate the file, as an interrupted download would leave it.
+    downloaded.write_text("This")
+    with pytest.raises(FileExistsError, match="already exists"):
+        asyncio.run(run())
+    asyncio.run(run(resume=True, verify=True))
+    assert downloaded.read_text() == "This is a test"
+    assert not list(tmp_path.rglob("*.part"))
+
+
+def test_async_basket_read_range(test_pantry):
+    """Test that an AsyncBasket reads byte ranges of the basket's files."""
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    upload_path = test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+
+    async def run():
+        async with AsyncPantry(pantry) as async_pantry:
+            basket = await AsyncBasket.from_path(upload_path, async_pantry)
+            return await basket.read_range(
+                os.path.join("basket_one", "test.txt"), 5, 7
+            )
+
+    assert asyncio.run(run()) == b"is"
+
+
+def test_async_basket_from_path_missing_supplement(test_pantry):
+    """Test that loading a basket without a supplement raises an error."""
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    upload_path = test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    test_pantry.file_system.rm(
+        os.path.join(upload_path, "basket_supplement.json")
+    )
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+
+    async def run():
+        async with AsyncPantry(pantry) as async_pantry:
+            await AsyncBasket.from_path(upload_path, async_pantry)
+
+    with pytest.raises(FileNotFoundError, match="basket_supplement.json"):
+        asyncio.run(run())
+
+
+@pytest.mark.parametrize("asynchronous", [True, False])
+def test_call_file_system_async_file_system(tmp_path, asynchronous):
+    """Test that call_file_system awaits the coroutine methods of async file
+    systems, whether or not they were created on the running loop.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    async def run():
+        file_system = AsyncFileSystemWrapper(
+            LocalFileSystem(), asynchronous=asynchronous
+        )
+        return await call_file_system(file_system, "cat_file", str(test_file))
+
+    assert asyncio.run(run()) == b"0123456789"
+
+
+def test_async_pantry_requires_pantry():
+    """Test that AsyncPantry raises a TypeError if not given a Pantry."""
+    with pytest.raises(TypeError, match="'pantry' must be a weave.Pantry"):
+        AsyncPantry("not a pantry")
@@ -0,0 +1,217 @@
+"""Pytests for the pantry integrity audit functionality."""
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from weave import IndexPandas, Pantry
+from weave import audit
+from weave.audit import RateLimiter
+from weave.tests.pytest_resources import PantryForTest, get_file_systems
+
+
+# Create fsspec objects to be tested, and add to file_systems list.
+file_systems, file_systems_ids = get_file_systems()
+
+
+# Test with different fsspec file systems (above).
+@pytest.fixture(
+    name="test_pantry",
+    params=file_systems,
+    ids=file_systems_ids,
+)
+def fixture_test_pantry(request, tmpdir):
+    """Sets up test pantry for the tests."""
+    file_system = request.param
+    test_pantry = PantryForTest(tmpdir, file_system)
+    yield test_pantry
+    test_pantry.cleanup_pantry()
+
+
+def upload_baskets(test_pantry, count):
+    """Upload baskets to the test pantry, and return the pantry and the
+    uploaded index rows.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    rows = []
+    for i in range(count):
+        tmp_basket_dir = test_pantry.set_up_basket(f"basket_{i}")
+        rows.append(pantry.upload_basket(
+            [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+            basket_type="test_basket",
+        ).iloc[0])
+    return pantry, rows
+
+
+def test_audit_valid_pantry(test_pantry):
+    """Test that auditing an unchanged pantry finds no problems."""
+    pantry, rows = upload_baskets(test_pantry, 2)
+
+    report = pantry.audit()
+    assert report.is_valid
+    assert sorted(report.baskets) == sorted(row.address for row in rows)
+
+
+def test_audit_finds_corrupted_files(test_pantry):
+    """Test that modified and deleted files are reported, with the basket
+    they belong to.
+    """
+    pantry, rows = upload_baskets(test_pantry, 3)
+    file_system = test_pantry.file_system
+    modified_path = os.path.join(rows[0].address, "basket_0", "test.txt")
+    deleted_path = os.path.join(rows[1].address, "basket_1", "test.txt")
+    # Same size, different content, so only the hash can detect it.
+    file_system.pipe_file(modified_path, b"This is a tesT")
+    file_system.rm(deleted_path)
+
+    report = pantry.audit(max_workers=2)
+    assert sorted(report.invalid_baskets) == sorted(
+        [rows[0].address, rows[1].address]
+    )
+    codes = {
+        os.path.basename(os.path.dirname(record.path)): record.code
+        for record in report
+    }
+    assert codes == {
+        "basket_0": "hash_mismatch",
+        "basket_1": "file_not_in_file_system",
+    }
+
+
+def test_audit_file_size_mismatch(test_pantry):
+    """Test that a truncated file is reported without being hashed."""
+    pantry, rows = upload_baskets(test_pantry, 1)
+    test_pantry.file_system.pipe_file(
+        os.path.join(rows[0].address, "basket_0", "test.txt"), b"This"
+    )
+
+    report = pantry.audit()
+    assert [record.code for record in report] == ["file_size_mismatch"]
+
+
+def test_audit_skips_stubs(test_pantry):
+    """Test that stubbed files, which are not uploaded, are not audited."""
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_0")
+    pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": True}],
+        basket_type="test_basket",
+    )
+
+    assert pantry.audit().is_valid
+
+
+def test_audit_basket_uuids(test_pantry):
+    """Test that only the given baskets are audited."""
+    pantry, rows = upload_baskets(test_pantry, 2)
+
+    report = pantry.audit(basket_uuids=[rows[1].uuid])
+    assert report.baskets == [rows[1].address]
+
+
+def test_audit_checkpoint_resume(test_pantry, tmp_path):
+    """Test that baskets in the checkpoint are not audited again, and that
+    their results are kept in the report.
+    """
+    pantry, rows = upload_baskets(test_pantry, 2)
+    checkpoint_path = str(tmp_path / "audit.jsonl")
+    test_pantry.file_system.pipe_file(
+        os.path.join(rows[0].address, "basket_0", "test.txt"),
+        b"This is a tesT",
+    )
+
+    # Audit the first basket, as if the audit was interrupted.
+    pantry.audit(basket_uuids=[rows[0].uuid], checkpoint_path=checkpoint_path)
+    # An incomplete line, as written by a killed audit, is ignored.
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        checkpoint.write('{"uuid": ')
+
+    # Corrupt the first basket again. It is not re-hashed on resume, so the
+    # checkpointed record is reported instead.
+    test_pantry.file_system.rm(
+        os.path.join(rows[0].address, "basket_0", "test.txt")
+    )
+    report = pantry.audit(checkpoint_path=checkpoint_path)
+    assert sorted(report.baskets) == sorted(row.address for row in rows)
+    assert [record.code for record in report] == ["hash_mismatch"]
+
+    with open(checkpoint_path, "r", encoding="utf-8") as checkpoint:
+        lines = checkpoint.read().splitlines()
+    audited = [json.loads(line)["uuid"] for line in lines[:1] + lines[2:]]
+    assert audited == [rows[0].uuid, rows[1].uuid]
+
+
+def test_audit_files_of_basket_concurrently(test_pantry):
+    """Test that the files within a basket are audited concurrently."""
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_0")
+    test_pantry.add_lower_dir_to_temp_basket(tmp_basket_dir)
+    pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        basket_type="test_basket",
+    )
+
+    # Each file waits for the other, which times out if they are serial.
+    barrier = threading.Barrier(2, timeout=10)
+    audit_file = audit._audit_file
+
+    def wait_and_audit_file(*args):
+        barrier.wait()
+        return audit_file(*args)
+
+    with patch("weave.audit._audit_file", side_effect=wait_and_audit_file):
+        assert pantry.audit(max_workers=2).is_valid
+
+
+def test_audit_bounded_pending_files(test_pantry):
+    """Test that each basket gets the results of its own files when few
+    files are pending at a time.
+    """
+    pantry, rows = upload_baskets(test_pantry, 3)
+    test_pantry.file_system.pipe_file(
+        os.path.join(rows[1].address, "basket_1", "test.txt"),
+        b"This is a tesT",
+    )
+
+    with patch("weave.audit._AUDIT_MAX_PENDING_FILES", 1):
+        report = pantry.audit(max_workers=2)
+    assert report.baskets == [row.address for row in rows]
+    assert report.invalid_baskets == [rows[1].address]
+
+
+def test_audit_max_bytes_per_second(test_pantry):
+    """Test that the bytes read are throttled as the files are read."""
+    pantry, _ = upload_baskets(test_pantry, 2)
+
+    start = time.monotonic()
+    assert pantry.audit(max_bytes_per_second=100).is_valid
+    # Each file has 14 bytes, so the second file waits 0.14s.
+    assert time.monotonic() - start >= 0.14
+
+
+def test_rate_limiter():
+    """Test that the rate limiter spaces out acquisitions to its rate."""
+    rate_limiter = RateLimiter(100)
+    start = time.monotonic()
+    for _ in range(6):
+        rate_limiter.acquire(2)
+    # The first acquisition is immediate, the others wait 0.02s each.
+    assert time.monotonic() - start >= 0.1
+
+    with pytest.raises(ValueError, match="must be greater than zero"):
+        RateLimiter(0)
@@ -5,7 +5,9 @@ import os
 import re
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path, PurePosixPath
+from unittest.mock import patch
 
 import pytest
 import pandas as pd
@@ -888,6 +890,198 @@ def test_basket_download_include_artifacts_arg(test_pantry):
     shutil.rmtree(tmp_download_dir, ignore_errors=True)
 
 
+def test_basket_download_verify_and_resume(test_pantry, tmp_path):
+    """Test that a verified download can be resumed, only downloading the
+    files which are missing locally.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("test_basket_tmp_dir")
+    tmp_basket_dir = test_pantry.add_lower_dir_to_temp_basket(tmp_basket_dir)
+    basket_path = test_pantry.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, hash_mode="full"
+    )
+    basket = Basket(basket_path, file_system=test_pantry.file_system)
+
+    basket.download(tmp_path, max_workers=2, verify=True)
+    downloaded_dir = tmp_path / basket.uuid / "test_basket_tmp_dir"
+    assert (downloaded_dir / "test.txt").read_text() == "This is a test"
+    assert (downloaded_dir / "nested_dir" / "another_test.txt").exists()
+
+    # Remove a file, then resume. Only the removed file is downloaded.
+    os.remove(downloaded_dir / "test.txt")
+    with patch.object(
+        basket, "_download_and_hash", wraps=basket._download_and_hash
+    ) as mock_download:
+        basket.download(tmp_path, resume=True, verify=True)
+        assert mock_download.call_count == 1
+    assert (downloaded_dir / "test.txt").read_text() == "This is a test"
+    assert not list(tmp_path.rglob("*.part"))
+
+
+def test_basket_download_verify_detects_corruption(test_pantry, tmp_path):
+    """Test that a verified download removes files which do not match the
+    basket's integrity data, and raises an error listing them.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("test_basket_tmp_dir")
+    basket_path = test_pantry.upload_basket(tmp_basket_dir=tmp_basket_dir)
+    basket = Basket(basket_path, file_system=test_pantry.file_system)
+    # Modify the file in the pantry, keeping its size.
+    test_pantry.file_system.pipe_file(
+        os.path.join(basket_path, "test_basket_tmp_dir", "test.txt"),
+        b"This is a tesT",
+    )
+
+    with patch.object(
+        basket, "_download_and_hash", wraps=basket._download_and_hash
+    ) as mock_download:
+        with pytest.raises(ValueError, match="do not match the basket's"):
+            basket.download(tmp_path, verify=True, retries=1)
+        # The corrupted file is retried once.
+        assert mock_download.call_count == 2
+    assert not list((tmp_path / basket.uuid).rglob("test.txt*"))
+
+
+def test_basket_download_verify_single_pass(test_pantry, tmp_path):
+    """Test that a verified download hashes files as they are downloaded,
+    rather than reading the downloaded files again.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("test_basket_tmp_dir")
+    basket_path = test_pantry.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, hash_mode="chunked", chunk_size=4
+    )
+    basket = Basket(basket_path, file_system=test_pantry.file_system)
+
+    with patch("weave.basket.hash_file") as mock_hash_file:
+        basket.download(tmp_path, verify=True)
+        mock_hash_file.assert_not_called()
+    assert (
+        tmp_path / basket.uuid / "test_basket_tmp_dir" / "test.txt"
+    ).read_text() == "This is a test"
+
+
+def test_basket_download_basket_in_place(test_pantry, tmp_path):
+    """Test that a basket whose supplement doesn't record upload paths (ie a
+    basket created in place) is downloaded by listing the basket.
+    """
+    file_system = test_pantry.file_system
+    directory = os.path.join(test_pantry.pantry_path, "TestBasketInPlace")
+    file_system.makedirs(os.path.join(directory, "nested"))
+    file_system.pipe_file(
+        os.path.join(directory, "nested", "file1.txt"), b"test file 1"
+    )
+    index_row = create_basket_in_place(
+        directory, metadata={"author": "test"}, file_system=file_system
+    )
+    basket = Basket(index_row.iloc[0].address, file_system=file_system)
+
+    basket.download(tmp_path)
+    downloaded = tmp_path / basket.uuid
+    assert (downloaded / "nested" / "file1.txt").read_text() == "test file 1"
+    assert not (downloaded / "basket_manifest.json").exists()
+
+
+def test_basket_open_and_read_range(test_pantry):
+    """Test that files in a basket can be opened and read in ranges without
+    downloading the basket.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("test_basket_tmp_dir")
+    basket_path = test_pantry.upload_basket(tmp_basket_dir=tmp_basket_dir)
+    basket = Basket(basket_path, file_system=test_pantry.file_system)
+    relative_path = os.path.join("test_basket_tmp_dir", "test.txt")
+
+    with basket.open(relative_path) as file:
+        file.seek(5)
+        assert file.read(2) == b"is"
+    with basket.open(
+        relative_path, "r", cache_type="blockcache", block_size=4
+    ) as file:
+        assert file.read() == "This is a test"
+
+    assert basket.read_range(relative_path, 0, 4) == b"This"
+    assert basket.read_range(relative_path, -4) == b"test"
+    assert basket.read_range(relative_path) == b"This is a test"
+
+
+def test_basket_open_outside_of_basket(test_pantry):
+    """Test that files outside of the basket cannot be opened or read, and
+    that files cannot be opened for writing.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("test_basket_tmp_dir")
+    basket_path = test_pantry.upload_basket(tmp_basket_dir=tmp_basket_dir)
+    basket = Basket(basket_path, file_system=test_pantry.file_system)
+
+    with pytest.raises(ValueError, match="outside of the basket"):
+        basket.open(os.path.join("..", "other_basket", "test.txt"))
+    with pytest.raises(ValueError, match="outside of the basket"):
+        basket.read_range(os.path.abspath("test.txt"))
+    with pytest.raises(ValueError, match="'mode' must be 'rb' or 'r'"):
+        basket.open("test.txt", "wb")
+
+
+def test_basket_from_index_row_does_not_access_storage(test_pantry):
+    """Test that a Basket constructed from an index row populates its members
+    without accessing storage, and loads its artifacts on first access.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    pantry.index.generate_index()
+    row = pantry.index.get_rows("0001")
+    eager_basket = Basket("0001", pantry=pantry)
+
+    with patch.object(
+        test_pantry.file_system, "exists"
+    ) as mock_exists, patch.object(
+        test_pantry.file_system, "open"
+    ) as mock_open:
+        basket = Basket.from_index_row(row, pantry=pantry)
+        mock_exists.assert_not_called()
+        mock_open.assert_not_called()
+
+    for member in ("uuid", "parent_uuids", "basket_type", "label",
+                   "weave_version", "address", "storage_type"):
+        assert getattr(basket, member) == getattr(eager_basket, member)
+    assert basket.get_manifest() == eager_basket.get_manifest()
+    assert basket.get_supplement() == eager_basket.get_supplement()
+
+
+def test_basket_from_index_row_validates_on_access(test_pantry):
+    """Test that a lazily constructed Basket is validated when its contents
+    are first accessed.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    upload_path = test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    pantry.index.generate_index()
+    row = pantry.index.get_rows("0001")
+    test_pantry.file_system.rm(
+        os.path.join(upload_path, "basket_supplement.json")
+    )
+
+    basket = Basket.from_index_row(row, pantry=pantry)
+    assert basket.basket_type == "test_basket"
+    with pytest.raises(
+        FileNotFoundError, match="basket_supplement.json does not exist"
+    ):
+        basket.get_manifest()
+
+
+def test_basket_from_index_row_multiple_rows(test_pantry):
+    """Test that from_index_row raises an error for a multi-row DataFrame."""
+    rows = pd.DataFrame({"uuid": ["1", "2"]})
+    with pytest.raises(
+        ValueError, match="'index_row' must contain exactly one row"
+    ):
+        Basket.from_index_row(rows, file_system=test_pantry.file_system)
+
+
 def test_create_basket_in_place(test_pantry):
     """Test create basekt in place works without a pantry.
     """
@@ -990,3 +1184,166 @@ def test_create_basket_in_place_with_pantry(test_pantry):
     assert manifest_data["parent_uuids"] == index_row.iloc[0]["parent_uuids"]
     assert manifest_data["basket_type"] == index_row.iloc[0]["basket_type"]
     assert manifest_data["label"] == index_row.iloc[0]["label"]
+
+
+def test_create_basket_in_place_nested_basket(test_pantry):
+    """Test create basket in place rejects a directory containing a basket,
+    however deep, but not one holding only a plain directory.
+    """
+    file_system = test_pantry.file_system
+    directory = os.path.join(test_pantry.pantry_path, "TestBasketInPlace")
+    file_system.mkdirs(os.path.join(directory, "plain_dir"))
+    file_system.mkdirs(os.path.join(directory, "a", "b"))
+    file_system.pipe_file(
+        os.path.join(directory, "plain_dir", "file1.txt"), b"test"
+    )
+    file_system.pipe_file(
+        os.path.join(directory, "a", "b", "basket_manifest.json"), b"{}"
+    )
+
+    with pytest.raises(ValueError, match="cannot be a valid basket"):
+        create_basket_in_place(directory, file_system=file_system)
+
+    file_system.rm(os.path.join(directory, "a"), recursive=True)
+    index_row = create_basket_in_place(directory, file_system=file_system)
+    assert not index_row.empty
+
+
+def test_create_basket_in_place_inside_basket(test_pantry):
+    """Test create basket in place rejects a directory inside a basket."""
+    file_system = test_pantry.file_system
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.add_lower_dir_to_temp_basket(tmp_basket_dir)
+    upload_path = test_pantry.upload_basket(tmp_basket_dir)
+
+    with pytest.raises(ValueError, match="cannot be a valid basket"):
+        create_basket_in_place(
+            os.path.join(upload_path, "basket_one", "nested_dir"),
+            file_system=file_system,
+        )
+
+
+def test_create_basket_in_place_inside_tracked_basket(test_pantry):
+    """Test create basket in place uses the pantry's index to reject a
+    directory inside a tracked basket, without probing the file system.
+    """
+    file_system = test_pantry.file_system
+    pantry = weave.Pantry(
+        weave.IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=file_system,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.add_lower_dir_to_temp_basket(tmp_basket_dir)
+    address = pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        basket_type="test_basket",
+    ).iloc[0].address
+
+    with patch.object(
+        file_system, "exists", wraps=file_system.exists
+    ) as exists:
+        with pytest.raises(ValueError, match="cannot be a valid basket"):
+            create_basket_in_place(
+                os.path.join(address, "basket_one", "nested_dir"),
+                file_system=file_system,
+                pantry=pantry,
+            )
+    exists.assert_not_called()
+
+
+def test_create_basket_in_place_hash_options(test_pantry):
+    """Test create basket in place hashes files concurrently with the given
+    hashing options, and records them as stored at their own path.
+    """
+    file_system = test_pantry.file_system
+    directory = os.path.join(test_pantry.pantry_path, "TestBasketInPlace")
+    file_system.mkdirs(os.path.join(directory, "nested_dir"))
+    file_paths = [
+        os.path.join(directory, f"file{i}.txt") for i in range(5)
+    ] + [os.path.join(directory, "nested_dir", "file5.txt")]
+    for i, file_path in enumerate(file_paths):
+        file_system.pipe_file(file_path, f"This is test file {i}.".encode())
+    pantry = weave.Pantry(
+        weave.IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=file_system,
+    )
+
+    create_basket_in_place(
+        directory,
+        file_system=file_system,
+        pantry=pantry,
+        hash_mode="full",
+        hash_algorithm="blake2b",
+        max_workers=3,
+    )
+
+    with file_system.open(
+        os.path.join(directory, "basket_supplement.json"), encoding="utf-8"
+    ) as f:
+        supplement = json.load(f)
+    integrity_data = {
+        os.path.basename(x["upload_path"]): x
+        for x in supplement["integrity_data"]
+    }
+    assert sorted(integrity_data) == [f"file{i}.txt" for i in range(6)]
+    for file_data in integrity_data.values():
+        assert file_data["stub"] is False
+        assert file_data["hash_mode"] == "full"
+        assert file_data["hash_algorithm"] == "blake2b"
+    assert len(supplement["upload_items"]) == 6
+    # The recorded hashes match the stored files.
+    assert pantry.audit().is_valid
+
+
+def test_create_basket_in_place_hash_failure(test_pantry):
+    """Test that a file failing to hash leaves no (truncated) supplement, nor
+    manifest, in the directory.
+    """
+    file_system = test_pantry.file_system
+    directory = os.path.join(test_pantry.pantry_path, "TestBasketInPlace")
+    file_system.mkdirs(directory)
+    for i in range(3):
+        file_system.pipe_file(
+            os.path.join(directory, f"file{i}.txt"), b"This is a test file."
+        )
+    derive_integrity_data = weave.basket.derive_integrity_data
+
+    def fail_on_file1(file_path, **kwargs):
+        if os.path.basename(file_path) == "file1.txt":
+            raise OSError("Unable to read file1.txt")
+        return derive_integrity_data(file_path=file_path, **kwargs)
+
+    with patch(
+        "weave.basket.derive_integrity_data", side_effect=fail_on_file1
+    ):
+        with pytest.raises(OSError, match="Unable to read file1.txt"):
+            create_basket_in_place(
+                directory, file_system=file_system, max_workers=2
+            )
+
+    assert sorted(
+        os.path.basename(path) for path in file_system.ls(directory)
+    ) == ["file0.txt", "file1.txt", "file2.txt"]
+
+
+def test_create_basket_in_place_map_bounded():
+    """Test that the bounded map yields every result in order, with at most
+    max_pending calls pending.
+    """
+    calls = []
+
+    def double(x):
+        calls.append(x)
+        return x * 2
+
+    results = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # pylint: disable-next=protected-access
+        for result in weave.basket._map_bounded(
+            executor, double, range(10), max_pending=3
+        ):
+            assert len(calls) <= len(results) + 3
+            results.append(result)
+    assert results == [x * 2 for x in range(10)]
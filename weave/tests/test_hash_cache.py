@@ -0,0 +1,199 @@
+"""Pytests for the HashCache functionality."""
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+from fsspec.implementations.local import LocalFileSystem
+from fsspec.implementations.memory import MemoryFileSystem
+
+from weave import HashCache
+from weave.hash_cache import get_file_identity
+from weave.upload import derive_integrity_data
+
+
+# Ignoring pylint's warning "redefined-outer-name" as this is simply
+# how pytest works when it comes to pytest fixtures.
+# pylint: disable=redefined-outer-name
+@pytest.fixture
+def hash_cache(tmp_path):
+    """Yield a HashCache persisted in a temporary directory."""
+    cache = HashCache(str(tmp_path / "hash_cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_hash_cache_get_put(hash_cache):
+    """Test that a hash put in the cache can be retrieved with the same key,
+    and is not returned for a different key.
+    """
+    assert hash_cache.get("a.txt", 10, "1", "sha256") is None
+
+    hash_cache.put("a.txt", 10, "1", "sha256", "abc")
+    assert hash_cache.get("a.txt", 10, "1", "sha256") == "abc"
+    assert hash_cache.get("a.txt", 10, "2", "sha256") is None
+    assert hash_cache.get("a.txt", 11, "1", "sha256") is None
+    assert hash_cache.get("a.txt", 10, "1", "blake2b") is None
+
+
+def test_hash_cache_put_discards_stale_versions(hash_cache):
+    """Test that putting a new version of a file discards the hashes of the
+    previous versions.
+    """
+    hash_cache.put("a.txt", 10, "1", "sha256", "abc")
+    hash_cache.put("a.txt", 10, "2", "sha256", "def")
+
+    assert len(hash_cache) == 1
+    assert hash_cache.get("a.txt", 10, "2", "sha256") == "def"
+
+
+def test_hash_cache_evicts_least_recently_used(tmp_path):
+    """Test that the least recently used hashes are evicted when the cache
+    holds more than max_entries hashes.
+    """
+    cache = HashCache(str(tmp_path / "hash_cache.db"), max_entries=2)
+    with patch("weave.hash_cache.time.time", side_effect=[1, 2, 3, 4]):
+        cache.put("a.txt", 1, "1", "sha256", "a")
+        cache.put("b.txt", 1, "1", "sha256", "b")
+        # Using a.txt makes b.txt the least recently used hash.
+        cache.get("a.txt", 1, "1", "sha256")
+        cache.put("c.txt", 1, "1", "sha256", "c")
+
+    assert len(cache) == 2
+    assert cache.get("b.txt", 1, "1", "sha256") is None
+    assert cache.get("a.txt", 1, "1", "sha256") == "a"
+    assert cache.get("c.txt", 1, "1", "sha256") == "c"
+    cache.close()
+
+
+def test_hash_cache_defers_last_used(tmp_path):
+    """Test that cache hits are not written to the db until the next put,
+    or until the cache is closed.
+    """
+    db_path = str(tmp_path / "hash_cache.db")
+    cache = HashCache(db_path)
+
+    def read_last_used():
+        con = sqlite3.connect(db_path)
+        last_used = dict(con.execute("SELECT path, last_used FROM hash_cache"))
+        con.close()
+        return last_used
+
+    with patch("weave.hash_cache.time.time", side_effect=[1, 2, 3, 4]):
+        cache.put("a.txt", 1, "1", "sha256", "a")
+        cache.get("a.txt", 1, "1", "sha256")
+        assert read_last_used() == {"a.txt": 1}
+        cache.put("b.txt", 1, "1", "sha256", "b")
+        assert read_last_used() == {"a.txt": 2, "b.txt": 3}
+        cache.get("b.txt", 1, "1", "sha256")
+    cache.close()
+    assert read_last_used() == {"a.txt": 2, "b.txt": 4}
+
+
+def test_hash_cache_counts_entries(tmp_path):
+    """Test that replacing and discarding hashes keeps the count of the
+    cache, so eviction starts at max_entries.
+    """
+    db_path = str(tmp_path / "hash_cache.db")
+    cache = HashCache(db_path, max_entries=3)
+    cache.put("a.txt", 1, "1", "sha256", "a")
+    cache.put("a.txt", 1, "1", "sha256", "a")
+    cache.put("b.txt", 1, "1", "sha256", "b")
+    cache.put("b.txt", 1, "2", "sha256", "b")
+    cache.close()
+
+    # The count is read back when the cache is opened.
+    cache = HashCache(db_path, max_entries=3)
+    cache.put("c.txt", 1, "1", "sha256", "c")
+    assert len(cache) == 3
+    cache.put("d.txt", 1, "1", "sha256", "d")
+    assert len(cache) == 3
+    assert cache.get("a.txt", 1, "1", "sha256") is None
+    cache.close()
+
+
+def test_hash_cache_persists(tmp_path):
+    """Test that cached hashes persist between HashCache instances."""
+    db_path = str(tmp_path / "hash_cache.db")
+    cache = HashCache(db_path)
+    cache.put("a.txt", 10, "1", "sha256", "abc")
+    cache.close()
+
+    cache = HashCache(db_path)
+    assert cache.get("a.txt", 10, "1", "sha256") == "abc"
+    cache.close()
+
+
+def test_hash_cache_max_entries_invalid(tmp_path):
+    """Test that HashCache raises errors for an invalid max_entries."""
+    with pytest.raises(TypeError, match="'max_entries' must be an int"):
+        HashCache(str(tmp_path / "hash_cache.db"), max_entries="1")
+    with pytest.raises(
+        ValueError, match="'max_entries' must be greater than zero"
+    ):
+        HashCache(str(tmp_path / "hash_cache.db"), max_entries=0)
+
+
+def test_derive_integrity_data_uses_hash_cache(tmp_path, hash_cache):
+    """Test that derive_integrity_data does not re-hash a file that is in the
+    hash cache, and re-hashes it once it has been modified.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    first = derive_integrity_data(str(test_file), hash_cache=hash_cache)
+    with patch("weave.upload.hash_file") as mock_hash_file:
+        second = derive_integrity_data(str(test_file), hash_cache=hash_cache)
+        mock_hash_file.assert_not_called()
+    assert first["hash"] == second["hash"]
+
+    # A different hash_mode must not use the cached sampled hash.
+    with patch("weave.upload.hash_file", return_value="x") as mock_hash_file:
+        derive_integrity_data(
+            str(test_file), hash_cache=hash_cache, hash_mode="chunked"
+        )
+        mock_hash_file.assert_called_once()
+
+    test_file.write_text("9876543210")
+    stat = os.stat(test_file)
+    os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    third = derive_integrity_data(str(test_file), hash_cache=hash_cache)
+    assert third["hash"] != first["hash"]
+
+
+def test_get_file_identity_local(tmp_path):
+    """Test get_file_identity returns the size and mtime of a local file."""
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    file_size, identity = get_file_identity(LocalFileSystem(), str(test_file))
+    assert file_size == 10
+    assert identity == str(os.stat(test_file).st_mtime_ns)
+
+
+def test_hash_cache_file_without_version(tmp_path, hash_cache):
+    """Test that files on a file system reporting no version identifier
+    (no ETag or modification time) are never served from the cache, as a
+    rewrite with the same size could not be detected.
+    """
+    file_system = MemoryFileSystem()
+    file_system.pipe("/test.txt", b"0123456789")
+    try:
+        assert get_file_identity(file_system, "/test.txt") == (10, None)
+    finally:
+        file_system.rm("/test.txt")
+
+    hash_cache.put("a.txt", 10, None, "sha256", "abc")
+    assert hash_cache.get("a.txt", 10, None, "sha256") is None
+    assert len(hash_cache) == 0
+
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+    with patch(
+        "weave.upload.get_file_identity", return_value=(10, None)
+    ):
+        first = derive_integrity_data(str(test_file), hash_cache=hash_cache)
+        # Rewritten in place with the same size.
+        test_file.write_text("9876543210")
+        second = derive_integrity_data(str(test_file), hash_cache=hash_cache)
+    assert first["hash"] != second["hash"]
@@ -0,0 +1,160 @@
+"""Pytests for the hashing functionality."""
+import hashlib
+from unittest.mock import patch
+
+import pytest
+from fsspec.implementations.local import LocalFileSystem
+from fsspec.implementations.memory import MemoryFileSystem
+
+from weave.hashing import StreamHasher, hash_bytes, hash_file, hash_modes
+
+
+# Ignoring pylint's warning "redefined-outer-name" as this is simply
+# how pytest works when it comes to pytest fixtures.
+# pylint: disable=redefined-outer-name
+@pytest.fixture
+def memory_file_system():
+    """Yield an empty in-memory file system, used to exercise the streamed
+    (non memory mapped) hashing path.
+    """
+    file_system = MemoryFileSystem()
+    file_system.store.clear()
+    yield file_system
+    file_system.store.clear()
+
+
+@pytest.mark.parametrize("hash_mode", hash_modes)
+@pytest.mark.parametrize("contents", [b"", b"0123456789" * 100])
+def test_hash_file_mapped_matches_streamed(
+    tmp_path, memory_file_system, hash_mode, contents
+):
+    """Test that memory mapped hashing of local files produces the same hash
+    as streamed hashing on other file systems, for every hash mode.
+    """
+    local_path = tmp_path / "test.bin"
+    local_path.write_bytes(contents)
+    memory_file_system.pipe("/test.bin", contents)
+
+    kwargs = {"hash_mode": hash_mode, "chunk_size": 64, "buffer_size": 7}
+    local_hash = hash_file(
+        LocalFileSystem(), str(local_path), len(contents), 10, **kwargs
+    )
+    memory_hash = hash_file(
+        memory_file_system, "/test.bin", len(contents), 10, **kwargs
+    )
+    assert local_hash == memory_hash
+
+
+@pytest.mark.parametrize("hash_mode", hash_modes)
+def test_hash_file_on_read(tmp_path, memory_file_system, hash_mode):
+    """Test that on_read is called with the size of every buffer read, and
+    does not change the hash.
+    """
+    contents = b"0123456789" * 100
+    local_path = tmp_path / "test.bin"
+    local_path.write_bytes(contents)
+    memory_file_system.pipe("/test.bin", contents)
+    # Only the 3 windows of 100 bytes are read in the sampled mode.
+    bytes_read = 300 if hash_mode == "sampled" else len(contents)
+
+    kwargs = {"hash_mode": hash_mode, "chunk_size": 64, "buffer_size": 7}
+    for file_system, path in [
+        (LocalFileSystem(), str(local_path)),
+        (memory_file_system, "/test.bin"),
+    ]:
+        reads = []
+        assert hash_file(
+            file_system, path, len(contents), 100,
+            on_read=reads.append, **kwargs,
+        ) == hash_file(file_system, path, len(contents), 100, **kwargs)
+        assert sum(reads) == bytes_read
+        assert max(reads) == 7
+
+
+def test_hash_file_sampled_windows(tmp_path):
+    """Test the sampled hash of a local file is the hash of its beginning,
+    middle, and end bytes.
+    """
+    local_path = tmp_path / "test.txt"
+    local_path.write_bytes(b"0123456789")
+
+    file_hash = hash_file(LocalFileSystem(), str(local_path), 10, 2)
+    assert file_hash == hashlib.sha256(b"014589").hexdigest()
+
+
+def test_hash_file_local_uses_memory_map(tmp_path):
+    """Test that local files are hashed through a memory map rather than by
+    reading the file into memory.
+    """
+    local_path = tmp_path / "test.txt"
+    local_path.write_bytes(b"0123456789")
+
+    with patch.object(LocalFileSystem, "open") as mock_open:
+        file_hash = hash_file(
+            LocalFileSystem(), str(local_path), 10, 2, hash_mode="full"
+        )
+        mock_open.assert_not_called()
+    assert file_hash == hashlib.sha256(b"0123456789").hexdigest()
+
+
+@pytest.mark.parametrize("contents", [b"", b"0123456789", b"0123456789" * 9])
+def test_hash_bytes_matches_hash_file(tmp_path, contents):
+    """Test that hashing in-memory contents produces the same hash as hashing
+    a file with the same contents.
+    """
+    local_path = tmp_path / "test.bin"
+    local_path.write_bytes(contents)
+
+    assert hash_bytes(contents, 10) == hash_file(
+        LocalFileSystem(), str(local_path), len(contents), 10
+    )
+
+
+@pytest.mark.parametrize("hash_mode", hash_modes)
+@pytest.mark.parametrize("contents", [b"", b"0123456789" * 100])
+@pytest.mark.parametrize("block_size", [1, 7, 64, 5000])
+def test_stream_hasher_matches_hash_file(
+    tmp_path, hash_mode, contents, block_size
+):
+    """Test that hashing a file's bytes as they are received produces the same
+    hash as hash_file, for every hash mode and block size.
+    """
+    local_path = tmp_path / "test.bin"
+    local_path.write_bytes(contents)
+    kwargs = {"hash_mode": hash_mode, "chunk_size": 64}
+
+    stream_hasher = StreamHasher(len(contents), 10, **kwargs)
+    for start in range(0, len(contents), block_size):
+        stream_hasher.update(contents[start:start + block_size])
+    assert stream_hasher.hexdigest() == hash_file(
+        LocalFileSystem(), str(local_path), len(contents), 10, **kwargs
+    )
+
+
+@pytest.mark.parametrize("hash_mode", hash_modes)
+def test_hash_file_xxh3_128(tmp_path, hash_mode):
+    """Test that files are hashed, and verified while streamed, with the
+    optional xxh3_128 hash_algorithm.
+    """
+    xxhash = pytest.importorskip("xxhash")
+    contents = b"0123456789" * 100
+    local_path = tmp_path / "test.bin"
+    local_path.write_bytes(contents)
+    kwargs = {
+        "hash_mode": hash_mode, "chunk_size": 64, "hash_algorithm": "xxh3_128"
+    }
+
+    file_hash = hash_file(
+        LocalFileSystem(), str(local_path), len(contents), 1000, **kwargs
+    )
+    if hash_mode != "chunked":
+        # The file is smaller than 3 * byte_count, so every byte is hashed.
+        assert file_hash == xxhash.xxh3_128(contents).hexdigest()
+
+    stream_hasher = StreamHasher(len(contents), 1000, **kwargs)
+    stream_hasher.update(contents)
+    assert stream_hasher.hexdigest() == file_hash
+    assert file_hash != hash_file(
+        LocalFileSystem(), str(local_path), len(contents), 1000,
+        hash_mode=hash_mode, chunk_size=64,
+    )
@@ -1970,3 +1970,120 @@ def test_clear_index_with_refresh_works(test_pantry):
 
     # The basket should have been re-added to the index after refreshing.
     assert len(ind) == 1
+
+
+@pytest.fixture(name="test_metadata_pantry", params=params, ids=params_ids)
+def fixture_test_metadata_pantry(request, tmpdir):
+    """Sets up test pantry, with an index tracking metadata, for the tests."""
+    file_system = request.param[0]
+    pantry_path = (
+        "pytest-temp-pantry" f"{os.environ.get('WEAVE_PYTEST_SUFFIX', '')}"
+    )
+
+    test_pantry = PantryForTest(tmpdir, file_system, pantry_path=pantry_path)
+
+    test_index = IndexForTest(
+        index_constructor=request.param[1],
+        file_system=file_system,
+        pantry_path=pantry_path,
+        track_metadata=True,
+    )
+    index = test_index.index
+
+    yield test_pantry, index
+    test_pantry.cleanup_pantry()
+    test_index.cleanup_index()
+
+
+def test_index_abc_query_metadata_works(test_metadata_pantry):
+    """Test IndexABC query_metadata returns the baskets whose flattened
+    metadata matches every filter, after generating the index.
+    """
+    test_pantry, ind = test_metadata_pantry
+
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0001",
+        metadata={"site": "a", "sensor": {"id": 1, "ok": True}},
+    )
+    test_pantry.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0002",
+        metadata={"site": "a", "sensor": {"id": 2}, "tags": ["x"]},
+    )
+    test_pantry.upload_basket(tmp_basket_dir=tmp_basket_dir, uid="0003")
+    ind.generate_index()
+
+    assert list(ind.query_metadata({"site": "a"})["uuid"]) == [
+        "0001", "0002"
+    ]
+    assert list(
+        ind.query_metadata({"site": "a", "sensor.id": 2})["uuid"]
+    ) == ["0002"]
+    assert list(ind.query_metadata({"sensor.ok": True})["uuid"]) == ["0001"]
+    assert list(
+        ind.query_metadata({"site": "a"}, max_rows=1, offset=1)["uuid"]
+    ) == ["0002"]
+    assert list(
+        ind.query_metadata({"site": "a"}, offset=1)["uuid"]
+    ) == ["0002"]
+    assert len(ind.query_metadata({"site": "a"}, max_rows=0)) == 0
+    assert len(ind.query_metadata({"site": "b"})) == 0
+    # Non-scalar values are not queryable.
+    with pytest.raises(TypeError, match="must be scalars: 'tags'"):
+        ind.query_metadata({"tags": ["x"]})
+
+
+def test_index_abc_query_metadata_value_types(test_metadata_pantry):
+    """Test query_metadata matches equal numbers whatever their type, as
+    python does, and long values.
+    """
+    test_pantry, ind = test_metadata_pantry
+
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0001",
+        metadata={"count": 1, "ratio": 2.0, "ok": True, "notes": "x" * 5000},
+    )
+    ind.generate_index()
+
+    for filters in [
+        {"count": 1.0}, {"ratio": 2}, {"ok": 1}, {"notes": "x" * 5000}
+    ]:
+        assert list(ind.query_metadata(filters)["uuid"]) == ["0001"]
+    assert len(ind.query_metadata({"count": "1"})) == 0
+    assert len(ind.query_metadata({"notes": "x" * 4999})) == 0
+
+
+def test_index_abc_query_metadata_tracks_changes(test_metadata_pantry):
+    """Test the metadata table is maintained when baskets are tracked,
+    untracked, and when their metadata is set.
+    """
+    test_pantry, ind = test_metadata_pantry
+    ind.generate_index()
+
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    address = test_pantry.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0001", metadata={"site": "a"},
+    )
+    # Metadata not given to track_basket is read from the pantry.
+    ind.track_basket(create_index_from_fs(address, test_pantry.file_system))
+    assert list(ind.query_metadata({"site": "a"})["uuid"]) == ["0001"]
+
+    ind.set_basket_metadata({"0001": {"site": "b"}})
+    assert len(ind.query_metadata({"site": "a"})) == 0
+    assert list(ind.query_metadata({"site": "b"})["uuid"]) == ["0001"]
+
+    ind.untrack_basket("0001")
+    assert len(ind.query_metadata({"site": "b"})) == 0
+
+
+def test_index_abc_query_metadata_not_tracked(test_pantry):
+    """Test query_metadata raises errors when metadata is not tracked, and for
+    invalid filters.
+    """
+    _, ind = test_pantry
+
+    with pytest.raises(ValueError, match="does not track metadata"):
+        ind.query_metadata({"site": "a"})
+    with pytest.raises(TypeError, match="'filters' must be a dictionary"):
+        ind.query_metadata("site == 'a'")
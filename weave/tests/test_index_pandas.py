@@ -4,6 +4,8 @@ import re
 import tempfile
 import warnings
 
+from unittest.mock import patch
+
 import pytest
 
 from weave.pantry import Pantry
@@ -285,3 +287,45 @@ def test_index_updated_after_new_pantry_basket_upload(test_pantry):
                 basket_type="test-1",
             )
     assert len(pantry2.index.to_pandas_df()) == 2
+
+
+def test_index_pandas_metadata_table_saved_with_index(test_pantry):
+    """Test the metadata table of an IndexPandas tracking metadata is saved
+    next to the index, and loaded by other index objects without reading the
+    baskets' metadata.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        track_metadata=True,
+    )
+    pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        basket_type="test_basket",
+        metadata={"site": {"name": "a"}},
+    )
+    assert test_pantry.file_system.glob(
+        os.path.join(test_pantry.pantry_path, "index", "**", "*-metadata.json")
+    )
+
+    other_pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        track_metadata=True,
+    )
+    with patch(
+        "weave.index.index_pandas.read_metadata_from_fs"
+    ) as mock_read_metadata:
+        rows = other_pantry.index.query_metadata({"site.name": "a"})
+        mock_read_metadata.assert_not_called()
+    assert len(rows) == 1
+
+    basket = other_pantry.get_basket(rows.iloc[0].uuid)
+    # Mongo is not under test here.
+    with patch("weave.basket.MongoLoader"):
+        basket.update_metadata({"site": {"name": "b"}})
+    assert len(other_pantry.index.query_metadata({"site.name": "a"})) == 0
+    assert len(pantry.index.query_metadata({"site.name": "b"})) == 1
@@ -258,3 +258,37 @@ def test_index_sql_check_duplicate_schema_name(test_index):
     # different pantry_path casing.
     _ = IndexSQL(LocalFileSystem(), pantry_path.upper())
     _ = IndexSQL(LocalFileSystem(), pantry_path.lower())
+
+
+# Skip tests if sqlalchemy is not installed.
+@pytest.mark.skipif(
+    not _HAS_REQUIRED_DEPS
+    or not os.environ.get("WEAVE_SQL_PASSWORD", False),
+    reason="Modules: 'psycopg2', 'sqlalchemy' required for this test "
+    "AND env variables: 'WEAVE_SQL_HOST', 'WEAVE_SQL_PASSWORD'",
+)
+def test_index_sql_track_basket_single_transaction():
+    """Test that track_basket does not leave index rows behind when writing
+    the metadata fails.
+    """
+    test_index = IndexForTest(IndexSQL, LocalFileSystem(), track_metadata=True)
+    ind = test_index.index
+    sample_basket_df = get_sample_basket_df()
+    sample_basket_df["uuid"] = "1000"
+    sample_basket_df.parent_uuids = [["0001"]]
+
+    try:
+        with mock.patch.object(
+            ind, "set_basket_metadata", side_effect=RuntimeError("failed")
+        ):
+            with pytest.raises(RuntimeError, match="failed"):
+                ind.track_basket(
+                    sample_basket_df, basket_metadata={"1000": {"a": 1}}
+                )
+        assert len(ind) == 0
+        rows, _ = ind.execute_sql(
+            f"SELECT * FROM {ind.pantry_schema}.parent_uuids"
+        )
+        assert len(rows) == 0
+    finally:
+        test_index.cleanup_index()
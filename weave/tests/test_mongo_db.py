@@ -105,6 +105,35 @@ def test_load_mongo_metadata(set_up):
     assert truth_db == compared_data
 
 
+@pytest.mark.skipif(
+    get_pymongo_skip_condition(), reason=get_pymongo_skip_reason()
+)
+def test_load_mongo_many(set_up):
+    """Test that load_mongo_many loads in-memory basket data into every
+    collection.
+    """
+    baskets = []
+    for uuid in ["1234", "nometadata"]:
+        basket = set_up.pantry.get_basket(uuid)
+        baskets.append({
+            "manifest": basket.get_manifest(),
+            "supplement": basket.get_supplement(),
+            "metadata": basket.get_metadata(),
+        })
+    MongoLoader(pantry=set_up.pantry).load_mongo_many(baskets)
+
+    metadata = list(set_up.database[set_up.metadata_collection].find(
+        {}, {"_id": 0}
+    ))
+    assert metadata == [{"uuid": "1234", "basket_type": "test_basket",
+                         "parent_uuids": [], "key1": "value1"}]
+    manifests = set_up.database[set_up.manifest_collection]
+    assert sorted(manifests.distinct("uuid")) == ["1234", "nometadata"]
+    supplements = set_up.database[set_up.supplement_collection]
+    assert sorted(supplements.distinct("uuid")) == ["1234", "nometadata"]
+    assert "_id" not in baskets[0]["manifest"]
+
+
 @pytest.mark.skipif(
     get_pymongo_skip_condition(), reason=get_pymongo_skip_reason()
 )
@@ -768,3 +797,31 @@ def test_bad_mongo_query_raises_error(set_up):
               "other type that inherits from collections.Mapping"
     ):
         manifest_collection.find("basket_type = test_basket")
+
+
+@pytest.mark.skipif(
+    get_pymongo_skip_condition(), reason=get_pymongo_skip_reason()
+)
+@pytest.mark.parametrize("hash_mode", ["full", "chunked"])
+def test_check_file_already_exists_hash_mode(set_up, hash_mode):
+    """Check that files uploaded with another hash mode than the default are
+    found, by hashing the file the way the pantry's files were hashed.
+    """
+    pantry = set_up.pantry
+
+    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
+        tmp_file.write(b'This is my temporary file that we will hash')
+        tmp_file.flush()
+        pantry.upload_basket(
+            upload_items=[{'path':tmp_file.name, 'stub':False}],
+            basket_type='filealreadyexists',
+            unique_id='file_already_exists_uuid',
+            hash_mode=hash_mode,
+            chunk_size=8,
+        )
+
+        mongo_loader = MongoLoader(pantry=pantry)
+        mongo_loader.load_mongo_supplement(uuids=["file_already_exists_uuid"])
+        uuids = pantry.does_file_exist(tmp_file.name)
+
+        assert uuids == ['file_already_exists_uuid']
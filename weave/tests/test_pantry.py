@@ -428,6 +428,197 @@ def test_upload_basket_updates_the_pantry(test_pantry):
     assert len(fs_baskets) == 4
 
 
+def test_pantry_upload_basket_does_not_read_back_basket(test_pantry):
+    """Test that upload_basket tracks the new basket without reading it back
+    from the file system, and that the row matches one read from the file
+    system.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    # Generate the (empty) index first, as that legitimately reads the pantry.
+    pantry.index.generate_index()
+
+    with patch("weave.index.create_index._get_list_of_basket_jsons") as mock:
+        row = pantry.upload_basket(
+            [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+            basket_type="test_basket",
+            parent_ids=[],
+        )
+        mock.assert_not_called()
+
+    fs_row = create_index_from_fs(row.iloc[0].address,
+                                  test_pantry.file_system)
+    pd.testing.assert_frame_equal(row, fs_row)
+
+
+def test_pantry_get_basket_lazy(test_pantry):
+    """Test that get_basket with lazy=True returns a Basket without reading
+    the basket's manifest.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    pantry.index.generate_index()
+
+    with patch.object(Basket, "get_manifest") as mock_get_manifest:
+        basket = pantry.get_basket("0001", lazy=True)
+        mock_get_manifest.assert_not_called()
+    assert basket.uuid == "0001"
+    assert basket.get_manifest()["uuid"] == "0001"
+
+
+def test_pantry_iter_baskets(test_pantry):
+    """Test that iter_baskets yields a lazy Basket per index row."""
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.upload_basket(tmp_basket_dir, uid="0001")
+    test_pantry.upload_basket(tmp_basket_dir, uid="0002",
+                              basket_type="other_basket")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    pantry.index.generate_index()
+
+    baskets = list(pantry.iter_baskets())
+    assert sorted(basket.uuid for basket in baskets) == ["0001", "0002"]
+
+    baskets = list(pantry.iter_baskets(
+        pantry.index.get_baskets_of_type("other_basket")
+    ))
+    assert [basket.uuid for basket in baskets] == ["0002"]
+    assert baskets[0].get_manifest()["basket_type"] == "other_basket"
+
+
+def test_pantry_upload_baskets(test_pantry):
+    """Test that upload_baskets uploads every basket and tracks them all in a
+    single index write.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    upload_items = [{"path": str(tmp_basket_dir.realpath()), "stub": False}]
+    basket_specs = [
+        {"upload_items": upload_items, "basket_type": "test_basket",
+         "label": f"label_{i}", "metadata": {"index": i}}
+        for i in range(3)
+    ]
+
+    with patch.object(
+        pantry.index, "track_basket", wraps=pantry.index.track_basket
+    ) as mock_track_basket:
+        rows = pantry.upload_baskets(basket_specs, max_workers=2)
+        mock_track_basket.assert_called_once()
+
+    assert len(rows) == 3
+    assert sorted(rows["label"]) == ["label_0", "label_1", "label_2"]
+    assert len(pantry.index.to_pandas_df()) == 3
+
+    # The in-memory rows must match the rows created from the file system.
+    fs_rows = create_index_from_fs(test_pantry.pantry_path,
+                                   test_pantry.file_system)
+    pd.testing.assert_frame_equal(
+        rows.sort_values("uuid").reset_index(drop=True),
+        fs_rows.sort_values("uuid").reset_index(drop=True),
+    )
+    for row in rows.itertuples():
+        basket = pantry.get_basket(row.uuid)
+        assert basket.get_metadata() == {"index": int(row.label[-1])}
+
+
+def test_pantry_upload_baskets_partial_failure(test_pantry):
+    """Test that upload_baskets tracks the baskets that uploaded successfully
+    before re-raising the exception of a failed basket.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    upload_items = [{"path": str(tmp_basket_dir.realpath()), "stub": False}]
+    basket_specs = [
+        {"upload_items": upload_items, "basket_type": "test_basket"},
+        {"upload_items": upload_items, "basket_type": "test_basket",
+         "label": 1},
+    ]
+
+    with pytest.raises(TypeError, match="Invalid datatype: 'label"):
+        pantry.upload_baskets(basket_specs)
+    assert len(pantry.index.to_pandas_df()) == 1
+
+
+def test_pantry_upload_baskets_invalid_specs(test_pantry):
+    """Test that upload_baskets raises a TypeError for invalid specs."""
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    with pytest.raises(
+        TypeError, match="'basket_specs' must be a list of dictionaries"
+    ):
+        pantry.upload_baskets(["not a spec"])
+
+
+def test_pantry_get_artifacts_many(test_pantry):
+    """Test that the get_*_many functions retrieve the artifacts of many
+    baskets, by uuid or from index rows, as a dictionary or DataFrame.
+    """
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.upload_basket(tmp_basket_dir, uid="0001",
+                              metadata={"a": {"b": 1}})
+    test_pantry.upload_basket(tmp_basket_dir, uid="0002")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    pantry.index.generate_index()
+
+    assert pantry.get_metadata_many(["0001", "0002"]) == {
+        "0001": {"a": {"b": 1}}, "0002": None
+    }
+    manifests = pantry.get_manifest_many(pantry.index.to_pandas_df())
+    assert sorted(manifests) == ["0001", "0002"]
+    assert manifests["0001"] == pantry.get_basket("0001").get_manifest()
+    supplements = pantry.get_supplement_many(["0002"], max_workers=1)
+    assert supplements["0002"] == pantry.get_basket("0002").get_supplement()
+
+    metadata_df = pantry.get_metadata_many(
+        ["0001", "0002"], as_dataframe=True
+    )
+    assert list(metadata_df.index) == ["0001", "0002"]
+    assert metadata_df.loc["0001", "a.b"] == 1
+    assert pd.isna(metadata_df.loc["0002", "a.b"])
+
+
+def test_pantry_get_artifacts_many_missing_basket(test_pantry):
+    """Test that the get_*_many functions raise errors for baskets that are
+    not in the index, and for invalid arguments.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system
+    )
+    with pytest.raises(ValueError, match="Baskets do not exist"):
+        pantry.get_metadata_many(["does_not_exist"])
+    with pytest.raises(TypeError, match="'baskets' must be a list"):
+        pantry.get_manifest_many("0001")
+
+
 @patch.object(uuid_lib, "uuid1")
 @patch("weave.upload.UploadBasket.upload_basket_supplement_to_fs")
 def test_upload_basket_gracefully_fails(
@@ -578,9 +769,106 @@ def test_pantry_get_metadata_basic_data(test_pantry):
     )
 
     # Below are the basic keys that should always exist in a config dictionary.
-    basic_keys = ("index_setup_config", "index", "file_system", "pantry_path")
-    assert len(pantry.setup_config) == 4
+    basic_keys = ("index_setup_config", "index", "file_system", "pantry_path",
+                  "hash_algorithm")
+    assert len(pantry.setup_config) == 5
     assert all(k in pantry.setup_config for k in basic_keys)
+    assert pantry.setup_config["hash_algorithm"] == "sha256"
+
+
+def test_pantry_hash_algorithm_saved_and_loaded(test_pantry):
+    """Test the Pantry's hash_algorithm is saved to, and loaded from, the
+    pantry's config.json.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        hash_algorithm="blake2b",
+    )
+    pantry.save_setup_config()
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    assert pantry.hash_algorithm == "blake2b"
+    assert pantry.setup_config["hash_algorithm"] == "blake2b"
+
+
+def test_pantry_hash_algorithm_used_for_upload(test_pantry):
+    """Test baskets uploaded to the pantry record the pantry's
+    hash_algorithm in their integrity data.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        hash_algorithm="blake2b",
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    uuid = pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        basket_type="test_basket",
+    ).iloc[0].uuid
+
+    supplement = pantry.get_basket(uuid).get_supplement()
+    for integrity_data in supplement["integrity_data"]:
+        assert integrity_data["hash_algorithm"] == "blake2b"
+
+
+def test_pantry_invalid_hash_algorithm(test_pantry):
+    """Test the Pantry raises an error for an unknown hash_algorithm."""
+    with pytest.raises(
+        ValueError, match="'hash_algorithm' must be one of"
+    ):
+        Pantry(
+            IndexPandas,
+            pantry_path=test_pantry.pantry_path,
+            file_system=test_pantry.file_system,
+            hash_algorithm="md4",
+        )
+
+
+def test_pantry_hash_algorithm_unavailable(test_pantry):
+    """Test a pantry whose config.json records an algorithm with a missing
+    optional dependency can be read, and raises an error on upload.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    uuid = pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        basket_type="test_basket",
+    ).iloc[0].uuid
+    pantry.setup_config["hash_algorithm"] = "xxh3_128"
+    pantry.save_setup_config()
+
+    with patch("weave.hashing._HAS_XXHASH", False):
+        pantry = Pantry(
+            IndexPandas,
+            pantry_path=test_pantry.pantry_path,
+            file_system=test_pantry.file_system,
+        )
+        assert pantry.hash_algorithm == "xxh3_128"
+        assert pantry.get_basket(uuid).uuid == uuid
+        with pytest.raises(ImportError, match="'xxhash' is required"):
+            pantry.upload_basket(
+                [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+                basket_type="test_basket",
+            )
+        with pytest.raises(ImportError, match="'xxhash' is required"):
+            Pantry(
+                IndexPandas,
+                pantry_path=test_pantry.pantry_path,
+                file_system=test_pantry.file_system,
+                hash_algorithm="xxh3_128",
+            )
+    assert len(pantry.index.to_pandas_df()) == 1
 
 
 def test_pantry_save_setup_config(test_pantry):
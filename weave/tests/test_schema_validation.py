@@ -0,0 +1,132 @@
+"""Pytests for the SchemaValidator functionality."""
+import copy
+
+import jsonschema
+import pytest
+
+from weave.config import manifest_schema, supplement_schema
+from weave.schema_validation import (
+    SchemaValidator,
+    compile_fast_check,
+    manifest_validator,
+    supplement_validator,
+)
+
+VALID_MANIFEST = {
+    "uuid": "0001",
+    "upload_time": "1970-01-01T01:01:12+0:00",
+    "parent_uuids": ["0000"],
+    "basket_type": "test_basket",
+    "label": "label",
+    "weave_version": "1.0.0",
+}
+
+VALID_SUPPLEMENT = {
+    "upload_items": [{"path": "test.txt", "stub": False}],
+    "integrity_data": [
+        {
+            "file_size": 14,
+            "hash": "hash",
+            "access_date": "date",
+            "source_path": "test.txt",
+            "byte_count": 14,
+            "stub": False,
+            "upload_path": "pantry/0001/test.txt",
+            "hash_mode": "full",
+            "hash_algorithm": "sha256",
+            "chunk_size": 1.5,
+        }
+    ],
+}
+
+
+def mutate(document, path, value=None, delete=False):
+    """Return a copy of the document with the value at the path replaced or
+    deleted.
+    """
+    document = copy.deepcopy(document)
+    parent = document
+    for key in path[:-1]:
+        parent = parent[key]
+    if delete:
+        del parent[path[-1]]
+    else:
+        parent[path[-1]] = value
+    return document
+
+
+MANIFESTS = [
+    VALID_MANIFEST,
+    mutate(VALID_MANIFEST, ["uuid"], 100),
+    mutate(VALID_MANIFEST, ["parent_uuids", 0], 1),
+    mutate(VALID_MANIFEST, ["parent_uuids"], "0000"),
+    mutate(VALID_MANIFEST, ["label"], delete=True),
+    mutate(VALID_MANIFEST, ["weave_version"], delete=True),
+    mutate(VALID_MANIFEST, ["extra"], "field"),
+    [],
+    "manifest",
+]
+
+SUPPLEMENTS = [
+    VALID_SUPPLEMENT,
+    mutate(VALID_SUPPLEMENT, ["upload_items"], []),
+    mutate(VALID_SUPPLEMENT, ["upload_items", 0, "stub"], 0),
+    mutate(VALID_SUPPLEMENT, ["upload_items", 0, "path"], delete=True),
+    mutate(VALID_SUPPLEMENT, ["integrity_data", 0, "file_size"], True),
+    mutate(VALID_SUPPLEMENT, ["integrity_data", 0, "file_size"], "14"),
+    mutate(VALID_SUPPLEMENT, ["integrity_data", 0, "hash_mode"], "bad"),
+    mutate(VALID_SUPPLEMENT, ["integrity_data", 0, "extra"], "field"),
+    mutate(VALID_SUPPLEMENT, ["integrity_data"], delete=True),
+    mutate(VALID_SUPPLEMENT, ["integrity_data"], {}),
+]
+
+
+@pytest.mark.parametrize(
+    "validator,schema,document",
+    [(manifest_validator, manifest_schema, x) for x in MANIFESTS]
+    + [(supplement_validator, supplement_schema, x) for x in SUPPLEMENTS],
+)
+def test_schema_validator_matches_jsonschema(validator, schema, document):
+    """Test that the compiled validators accept and reject the same
+    documents as jsonschema, and raise the same errors.
+    """
+    expected_valid = jsonschema.Draft202012Validator(schema).is_valid(
+        document
+    )
+    assert validator.is_valid(document) == expected_valid
+
+    if expected_valid:
+        validator.validate(document)
+    else:
+        with pytest.raises(jsonschema.exceptions.ValidationError) as expected:
+            jsonschema.validate(document, schema)
+        with pytest.raises(jsonschema.exceptions.ValidationError) as error:
+            validator.validate(document)
+        assert error.value.message == expected.value.message
+
+
+def test_compile_fast_check_unsupported_keyword():
+    """Test that schemas with unsupported keywords have no fast path, and are
+    validated by jsonschema alone.
+    """
+    schema = {"type": "string", "pattern": "^a"}
+    assert compile_fast_check(schema) is None
+
+    validator = SchemaValidator(schema)
+    assert validator.is_valid("abc")
+    assert not validator.is_valid("bcd")
+
+
+def test_compile_fast_check_enum_types():
+    """Test that the fast path does not treat booleans as numbers."""
+    check = compile_fast_check({"enum": [1, "a"]})
+    assert check(1)
+    assert check("a")
+    assert not check(True)
+    assert not SchemaValidator({"enum": [1, "a"]}).is_valid(True)
+
+
+def test_schema_validator_invalid_schema():
+    """Test that an invalid schema raises an error when compiled."""
+    with pytest.raises(jsonschema.exceptions.SchemaError):
+        SchemaValidator({"type": 1})
@@ -0,0 +1,224 @@
+"""Pytests for the streamed supplement (integrity data sidecar)
+functionality."""
+import asyncio
+import json
+import os
+
+import pytest
+from fsspec.implementations.local import LocalFileSystem
+
+from weave import AsyncBasket, AsyncPantry, IndexPandas, Pantry
+from weave.config import get_mongo_db
+from weave.supplement import (
+    INTEGRITY_DATA_FILENAME,
+    SupplementWriter,
+    iter_integrity_data,
+    load_supplement,
+)
+from weave.tests.pytest_resources import (PantryForTest, get_file_systems,
+    get_pymongo_skip_reason, get_pymongo_skip_condition)
+
+
+# Create fsspec objects to be tested, and add to file_systems list.
+file_systems, file_systems_ids = get_file_systems()
+
+
+# Test with different fsspec file systems (above).
+@pytest.fixture(
+    name="test_pantry",
+    params=file_systems,
+    ids=file_systems_ids,
+)
+def fixture_test_pantry(request, tmpdir):
+    """Sets up test pantry for the tests."""
+    file_system = request.param
+    test_pantry = PantryForTest(tmpdir, file_system)
+    yield test_pantry
+    test_pantry.cleanup_pantry()
+
+
+def upload_streamed_basket(test_pantry):
+    """Upload a basket of two files with a streamed supplement, and return
+    the pantry and the basket's address.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    test_pantry.add_lower_dir_to_temp_basket(tmp_basket_dir)
+    address = pantry.upload_basket(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        basket_type="test_basket",
+        streaming_supplement=True,
+    ).iloc[0].address
+    return pantry, address
+
+
+def test_streaming_supplement_upload(test_pantry):
+    """Test that a streamed upload writes the integrity data to the sidecar,
+    and that baskets read it as if it were in the supplement.
+    """
+    pantry, address = upload_streamed_basket(test_pantry)
+    file_system = test_pantry.file_system
+    supplement_path = os.path.join(address, "basket_supplement.json")
+
+    with file_system.open(supplement_path, "rb") as file:
+        header = json.load(file)
+    assert header["integrity_data"] == []
+    assert header["integrity_data_file"] == INTEGRITY_DATA_FILENAME
+    with file_system.open(
+        os.path.join(address, INTEGRITY_DATA_FILENAME), "r", encoding="utf-8"
+    ) as file:
+        assert len(file.read().splitlines()) == 2
+
+    basket = pantry.get_basket(address)
+    integrity_data = basket.get_supplement()["integrity_data"]
+    assert sorted(
+        os.path.basename(x["upload_path"]) for x in integrity_data
+    ) == ["another_test.txt", "test.txt"]
+    assert list(pantry.get_basket(address).iter_integrity_data()) == (
+        integrity_data
+    )
+    # The sidecar is an artifact of the basket, not one of its files.
+    assert INTEGRITY_DATA_FILENAME not in [
+        os.path.basename(path) for path in basket.ls()
+    ]
+
+
+def test_streaming_supplement_validate_and_audit(test_pantry):
+    """Test that a pantry with a streamed supplement is valid, and that
+    a missing sidecar is reported.
+    """
+    pantry, address = upload_streamed_basket(test_pantry)
+    assert pantry.validate() == []
+    assert pantry.audit().is_valid
+
+    test_pantry.file_system.rm(os.path.join(address, INTEGRITY_DATA_FILENAME))
+    report = pantry.create_validation_report()
+    assert [record.code for record in report] == ["missing_integrity_data"]
+    assert [record.code for record in pantry.audit()] == [
+        "unreadable_supplement"
+    ]
+
+
+def test_streaming_supplement_async_basket(test_pantry):
+    """Test that an AsyncBasket loads the sidecar into the supplement."""
+    pantry, address = upload_streamed_basket(test_pantry)
+
+    async def run():
+        async with AsyncPantry(pantry) as async_pantry:
+            basket = await AsyncBasket.from_path(address, async_pantry)
+            return await basket.get_supplement()
+
+    assert asyncio.run(run()) == pantry.get_basket(address).get_supplement()
+
+
+def test_streaming_supplement_download_artifacts(test_pantry, tmp_path):
+    """Test that the sidecar is downloaded with the basket's artifacts."""
+    pantry, address = upload_streamed_basket(test_pantry)
+    basket = pantry.get_basket(address)
+
+    basket.download(str(tmp_path), include_artifacts=True)
+    downloaded = tmp_path / basket.uuid
+    assert (downloaded / "basket_supplement.json").exists()
+    assert len(
+        (downloaded / INTEGRITY_DATA_FILENAME).read_text().splitlines()
+    ) == 2
+
+
+def test_streaming_supplement_upload_baskets(test_pantry):
+    """Test that the supplements of streamed uploads include the integrity
+    data of their sidecar, as loaded into mongo by upload_baskets.
+    """
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    # pylint: disable-next=protected-access
+    upload = pantry._upload_basket_to_fs(
+        [{"path": str(tmp_basket_dir.realpath()), "stub": False}],
+        "test_basket",
+        streaming_supplement=True,
+    )
+
+    supplement = upload.get_supplement()
+    assert supplement["integrity_data_file"] == INTEGRITY_DATA_FILENAME
+    assert supplement == pantry.get_basket(
+        upload.get_upload_path()
+    ).get_supplement()
+    assert len(supplement["integrity_data"]) == 1
+
+
+@pytest.mark.skipif(
+    get_pymongo_skip_condition(), reason=get_pymongo_skip_reason()
+)
+def test_streaming_supplement_upload_baskets_mongo(test_pantry):
+    """Test that upload_baskets loads the sidecar's integrity data into the
+    mongo supplement of a streamed upload.
+    """
+    mongo_client = get_mongo_db()
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_pantry.pantry_path,
+        file_system=test_pantry.file_system,
+        mongo_client=mongo_client,
+    )
+    tmp_basket_dir = test_pantry.set_up_basket("basket_one")
+    basket_uuid = pantry.upload_baskets([{
+        "upload_items": [
+            {"path": str(tmp_basket_dir.realpath()), "stub": False}
+        ],
+        "basket_type": "test_basket",
+        "streaming_supplement": True,
+    }]).iloc[0].uuid
+
+    mongo_db = mongo_client[pantry.pantry_path]
+    try:
+        document = mongo_db["supplement"].find_one({"uuid": basket_uuid})
+        assert len(document["integrity_data"]) == 1
+        assert document["integrity_data"] == (
+            pantry.get_basket(basket_uuid).get_supplement()["integrity_data"]
+        )
+    finally:
+        for collection in ("supplement", "metadata", "manifest"):
+            mongo_db[collection].delete_many({"uuid": basket_uuid})
+
+
+def test_supplement_without_sidecar(tmp_path):
+    """Test that supplements without a sidecar are read unchanged."""
+    supplement = {
+        "upload_items": [{"path": "file.txt", "stub": True}],
+        "integrity_data": [{"hash": "abc"}],
+    }
+    supplement_path = tmp_path / "basket_supplement.json"
+    supplement_path.write_text(json.dumps(supplement))
+
+    file_system = LocalFileSystem()
+    assert list(
+        iter_integrity_data(file_system, str(supplement_path))
+    ) == [{"hash": "abc"}]
+    assert load_supplement(file_system, str(supplement_path)) == supplement
+
+
+def test_supplement_writer(tmp_path):
+    """Test that the writer appends one line per entry, read back in
+    order.
+    """
+    file_system = LocalFileSystem()
+    with SupplementWriter(file_system, str(tmp_path)) as writer:
+        for i in range(3):
+            writer.write({"hash": str(i)})
+    supplement = {
+        "upload_items": [],
+        "integrity_data": [],
+        "integrity_data_file": INTEGRITY_DATA_FILENAME,
+    }
+    supplement_path = str(tmp_path / "basket_supplement.json")
+
+    assert load_supplement(file_system, supplement_path, supplement)[
+        "integrity_data"
+    ] == [{"hash": "0"}, {"hash": "1"}, {"hash": "2"}]
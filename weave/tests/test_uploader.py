@@ -1,4 +1,6 @@
 """Pytests for the uploader functionality."""
+import hashlib
+import importlib.util
 import json
 import os
 import time
@@ -18,6 +20,7 @@ from weave.tests.pytest_resources import get_file_systems
 from weave.upload import (
     UploadBasket,
     derive_integrity_data,
+    upload_file_contents_as_basket,
     validate_upload_item,
 )
 
@@ -507,6 +510,129 @@ def test_derive_integrity_data_max_byte_count_exact(tmp_path):
     derive_integrity_data(str(test_file), byte_count=byte_count_in - 1)
 
 
+def test_derive_integrity_data_full_hash_mode(tmp_path):
+    """Test that the full hash_mode hashes every byte of the file, even when
+    the file is larger than 3 * byte_count.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    # Expected sha256 hash of the whole string "0123456789".
+    e_hash = "84d89877f0d4041efb6bf91a16f0248f2fd573e6af05c19f96bedb9f882f7882"
+    integrity_data = derive_integrity_data(
+        str(test_file), 2, hash_mode="full"
+    )
+    assert integrity_data["hash"] == e_hash
+    assert integrity_data["hash_mode"] == "full"
+    assert "chunk_size" not in integrity_data
+
+
+def test_derive_integrity_data_chunked_hash_mode(tmp_path):
+    """Test that the chunked hash_mode returns the hash of the concatenated
+    chunk digests, and records the chunk size.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    chunk_digests = b"".join(
+        hashlib.sha256(chunk).digest()
+        for chunk in (b"0123", b"4567", b"89")
+    )
+    e_hash = hashlib.sha256(chunk_digests).hexdigest()
+
+    integrity_data = derive_integrity_data(
+        str(test_file), hash_mode="chunked", chunk_size=4, max_workers=2
+    )
+    assert integrity_data["hash"] == e_hash
+    assert integrity_data["hash_mode"] == "chunked"
+    assert integrity_data["chunk_size"] == 4
+
+
+def test_derive_integrity_data_default_hash_mode_is_sampled(tmp_path):
+    """Test that derive_integrity_data records the sampled hash_mode by
+    default.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    assert derive_integrity_data(str(test_file), 2)["hash_mode"] == "sampled"
+
+
+def test_derive_integrity_data_invalid_hash_mode(tmp_path):
+    """Test that derive_integrity_data raises a ValueError when the hash_mode
+    is not supported.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    with pytest.raises(ValueError, match="'hash_mode' must be one of"):
+        derive_integrity_data(str(test_file), hash_mode="bad_mode")
+
+
+def test_derive_integrity_data_blake2b_hash_algorithm(tmp_path):
+    """Test that derive_integrity_data hashes with, and records, the requested
+    hash_algorithm.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    integrity_data = derive_integrity_data(
+        str(test_file), hash_algorithm="blake2b"
+    )
+    assert integrity_data["hash"] == hashlib.blake2b(b"0123456789").hexdigest()
+    assert integrity_data["hash_algorithm"] == "blake2b"
+
+
+def test_derive_integrity_data_default_hash_algorithm_is_sha256(tmp_path):
+    """Test that derive_integrity_data defaults to the sha256 algorithm."""
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    integrity_data = derive_integrity_data(str(test_file))
+    assert integrity_data["hash_algorithm"] == "sha256"
+
+
+def test_derive_integrity_data_invalid_hash_algorithm(tmp_path):
+    """Test that derive_integrity_data raises a ValueError when the
+    hash_algorithm is not supported.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    with pytest.raises(ValueError, match="'hash_algorithm' must be one of"):
+        derive_integrity_data(str(test_file), hash_algorithm="md4")
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("xxhash") is not None,
+    reason="xxhash is installed",
+)
+def test_derive_integrity_data_xxhash_not_installed(tmp_path):
+    """Test that derive_integrity_data raises an ImportError when the
+    xxh3_128 hash_algorithm is requested without xxhash installed.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    with pytest.raises(ImportError, match="'xxhash' is required"):
+        derive_integrity_data(str(test_file), hash_algorithm="xxh3_128")
+
+
+def test_derive_integrity_data_chunk_size_0(tmp_path):
+    """Test that derive_integrity_data raises a ValueError when the chunk size
+    is not greater than 0.
+    """
+    test_file = tmp_path / "test.txt"
+    test_file.write_text("0123456789")
+
+    with pytest.raises(
+        ValueError, match="'chunk_size' must be greater than zero: '0'"
+    ):
+        derive_integrity_data(
+            str(test_file), hash_mode="chunked", chunk_size=0
+        )
+
+
 # Test with two different fsspec file systems (top of file).
 @pytest.fixture(params=file_systems, ids=file_systems_ids)
 def test_basket(request, tmpdir):
@@ -1335,6 +1461,81 @@ def test_upload_basket_file_contents_identical(test_basket):
         assert r_file.read() == local_file_data
 
 
+def test_upload_basket_records_hash_mode(test_basket):
+    """Test that the hash_mode passed to UploadBasket is used for, and
+    recorded in, every integrity_data entry of the supplement.
+    """
+    tmp_basket_dir_name = "test_basket_tmp_dir"
+    tmp_basket_dir = test_basket.set_up_basket(tmp_basket_dir_name)
+    upload_path = test_basket.upload_basket(
+        tmp_basket_dir, hash_mode="chunked", chunk_size=4
+    )
+
+    supplement_path = os.path.join(upload_path, "basket_supplement.json")
+    with test_basket.file_system.open(supplement_path, "r") as file:
+        supplement = json.load(file)
+
+    for integrity_data in supplement["integrity_data"]:
+        assert integrity_data["hash_mode"] == "chunked"
+        assert integrity_data["chunk_size"] == 4
+
+
+def test_upload_file_contents_as_basket(test_basket):
+    """Test that in-memory contents are uploaded as a valid single file
+    basket, with integrity data matching a file with the same contents.
+    """
+    contents = b"0123456789"
+    upload_path = upload_file_contents_as_basket(
+        "contents.txt",
+        contents,
+        file_system=test_basket.file_system,
+        pantry_path=test_basket.pantry_path,
+        basket_type="test_basket",
+        unique_id="0001",
+    )
+    file_system = test_basket.file_system
+
+    assert upload_path == os.path.join(
+        test_basket.pantry_path, "test_basket", "0001"
+    )
+    assert file_system.cat(os.path.join(upload_path, "contents.txt")) == (
+        contents
+    )
+    manifest = json.loads(
+        file_system.cat(os.path.join(upload_path, "basket_manifest.json"))
+    )
+    assert manifest["uuid"] == "0001"
+    assert manifest["basket_type"] == "test_basket"
+
+    supplement = json.loads(
+        file_system.cat(os.path.join(upload_path, "basket_supplement.json"))
+    )
+    integrity_data = supplement["integrity_data"][0]
+    assert integrity_data["hash"] == hashlib.sha256(contents).hexdigest()
+    assert integrity_data["file_size"] == len(contents)
+    assert integrity_data["upload_path"] == os.path.join(
+        upload_path, "contents.txt"
+    )
+
+
+def test_upload_basket_does_not_stage_in_temp_dir(test_basket):
+    """Test that UploadBasket writes its JSON artifacts without creating a
+    local temporary directory.
+    """
+    tmp_basket_dir = test_basket.set_up_basket("test_basket_tmp_dir")
+    with patch("tempfile.TemporaryDirectory") as mock_temp_dir:
+        upload_path = test_basket.upload_basket(
+            tmp_basket_dir, metadata={"key": "value"}
+        )
+        mock_temp_dir.assert_not_called()
+
+    for file_name in ("basket_manifest.json", "basket_supplement.json",
+                      "basket_metadata.json"):
+        assert test_basket.file_system.exists(
+            os.path.join(upload_path, file_name)
+        )
+
+
 def test_upload_correct_version_number(test_basket):
     """Test that when a basket is uploaded, the manifest contains the
     correct version of weave.
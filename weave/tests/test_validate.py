@@ -4,10 +4,11 @@ import json
 import os
 from sys import version_info
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from weave import validate
+from weave import ValidationReport, ValidationState, validate
 from weave.pantry import Pantry
 from weave.index.index_pandas import IndexPandas
 from weave.tests.pytest_resources import PantryForTest, get_file_systems
@@ -110,7 +111,7 @@ class ValidateForTest(PantryForTest):
                     "integrity_data":
                     [
                     {
-                        "file_size": 33,
+                        "file_size": 14,
                         "hash": "string",
                         "access_date": "string",
                         "source_path": "string",
@@ -1814,3 +1815,440 @@ def test_validate_check_invalid_metadata_only_basket(test_validate):
     assert warning_msg == ("Invalid Basket. No files in basket and criteria "
                            "not met for metadata-only basket. ")
     assert warning_uuid == "metadataonlybasket"
+
+
+def test_validate_single_bulk_listing(test_validate):
+    """Test that validate_pantry lists the pantry once, instead of listing
+    every directory and file on its own.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    test_validate.add_lower_dir_to_temp_basket(tmp_basket_dir=tmp_basket_dir)
+    for i in range(3):
+        test_validate.upload_basket(tmp_basket_dir=tmp_basket_dir, uid=f"{i}")
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    pantry.index.generate_index()
+    # The index is already up to date, only the validation is under test.
+    with patch.object(pantry.index, "generate_index"), patch.object(
+        pantry.file_system, "find", wraps=pantry.file_system.find
+    ) as mock_find, patch.object(
+        pantry.file_system, "exists", wraps=pantry.file_system.exists
+    ) as mock_exists:
+        assert validate.validate_pantry(pantry) == []
+
+    mock_exists.assert_called_once_with(pantry.pantry_path)
+    mock_find.assert_called_once()
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_validate_max_workers(test_validate, max_workers):
+    """Test that the warnings do not depend on the number of workers
+    validating the baskets concurrently.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    nested_basket_dir = test_validate.set_up_basket(
+        "my_nested_basket", is_man=True, is_sup=True, is_meta=False
+    )
+    test_validate.upload_basket(tmp_basket_dir=tmp_basket_dir, uid="0001")
+    invalid_paths = [
+        test_validate.upload_basket(
+            tmp_basket_dir=nested_basket_dir, uid=f"100{i}"
+        )
+        for i in range(5)
+    ]
+    test_validate.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0002", parent_ids=["BAD"]
+    )
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    warning_list = pantry.validate(max_workers=max_workers)
+
+    # The warnings are in the order of the baskets in the pantry.
+    assert len(warning_list) == 6
+    assert warning_list[0].args[0] == (
+        "The uuids: ['BAD'] were not found in the index, which was found "
+        "inside basket: 0002"
+    )
+    for warn, invalid_path in zip(warning_list[1:], invalid_paths):
+        assert warn.args[0] == (
+            "Invalid Basket. Manifest File found in sub directory of "
+            "basket at: "
+        )
+        assert Path(warn.args[1]).match(invalid_path)
+
+
+def test_validate_nested_basket_after_plain_directory(test_validate):
+    """Test that a nested basket is found when another sub directory of the
+    basket, without a basket in it, comes first.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    test_validate.add_lower_dir_to_temp_basket(
+        tmp_basket_dir=tmp_basket_dir, new_dir_name="a_plain_dir"
+    )
+    test_validate.add_lower_dir_to_temp_basket(
+        tmp_basket_dir=tmp_basket_dir, new_dir_name="b_basket",
+        is_basket=True
+    )
+    basket_path = test_validate.upload_basket(tmp_basket_dir=tmp_basket_dir)
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    warning_list = validate.validate_pantry(pantry)
+
+    assert len(warning_list) == 1
+    assert warning_list[0].args[0] == (
+        "Invalid Basket. Manifest File found in sub directory of basket at: "
+    )
+    assert Path(warning_list[0].args[1]).match(basket_path)
+
+
+def test_validate_create_validation_report(test_validate):
+    """Test that the validation report holds a record of each problem, and
+    a duration for each validated basket.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    nested_basket_dir = test_validate.set_up_basket(
+        "my_nested_basket", is_man=True, is_sup=True, is_meta=False
+    )
+    valid_path = test_validate.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0001"
+    )
+    invalid_path = test_validate.upload_basket(
+        tmp_basket_dir=nested_basket_dir, uid="0002", parent_ids=["BAD"]
+    )
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    report = pantry.create_validation_report()
+
+    assert [record.code for record in report] == [
+        "nested_basket", "missing_parent_uuids"
+    ]
+    for record in report:
+        assert record.severity == "warning"
+        assert Path(record.basket).match(invalid_path)
+    assert Path(report.records[1].path).match(
+        os.path.join(invalid_path, "basket_manifest.json")
+    )
+    assert sorted(report.baskets)[-2:] == sorted(
+        # pylint: disable-next=protected-access
+        test_validate.file_system._strip_protocol(path)
+        for path in (valid_path, invalid_path)
+    )
+    assert all(duration >= 0 for duration in report.durations.values())
+    assert [warn.args for warn in report.to_warnings()] == [
+        warn.args for warn in validate.validate_pantry(pantry)
+    ]
+
+
+def test_validate_shards_merge_into_full_report(test_validate):
+    """Test that the reports of every shard of a pantry merge into the report
+    of the whole pantry.
+    """
+    nested_basket_dir = test_validate.set_up_basket(
+        "my_nested_basket", is_man=True, is_sup=True, is_meta=False
+    )
+    for i in range(6):
+        test_validate.upload_basket(
+            tmp_basket_dir=nested_basket_dir, uid=f"000{i}"
+        )
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    full_report = validate.create_validation_report(pantry)
+    merged_report = ValidationReport()
+    for shard_index in range(3):
+        merged_report = merged_report.merge(
+            validate.create_validation_report(
+                pantry, shard_count=3, shard_index=shard_index
+            )
+        )
+
+    # The full run of generate_index saves an index basket, so only compare
+    # the uploaded baskets.
+    def uploaded_baskets(report):
+        return sorted(
+            basket for basket in report.baskets if "test_basket" in basket
+        )
+
+    assert uploaded_baskets(merged_report) == uploaded_baskets(full_report)
+    assert len(uploaded_baskets(full_report)) == 6
+    added, resolved = merged_report.diff(full_report)
+    assert added == []
+    assert resolved == []
+    assert len(merged_report) == len(full_report) == 6
+
+
+def test_validate_create_validation_report_invalid_shard(test_validate):
+    """Test that invalid shards raise errors."""
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    with pytest.raises(TypeError, match="must be ints"):
+        validate.create_validation_report(pantry, shard_count="2")
+    with pytest.raises(ValueError, match="'shard_index' must be between"):
+        validate.create_validation_report(
+            pantry, shard_count=2, shard_index=2
+        )
+    with pytest.raises(ValueError, match="shards must not write"):
+        validate.create_validation_report(
+            pantry, shard_count=2, shard_index=0, rebuild_index=True
+        )
+
+
+def test_validate_create_validation_report_shard_read_only(test_validate):
+    """Test that validating a shard does not regenerate the index."""
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    test_validate.upload_basket(tmp_basket_dir=tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    pantry.index.generate_index()
+
+    with patch.object(
+        pantry.index, "generate_index"
+    ) as mock_generate_index:
+        for shard_index in range(2):
+            validate.create_validation_report(
+                pantry, shard_count=2, shard_index=shard_index
+            )
+    assert mock_generate_index.call_count == 0
+
+
+def test_validate_validation_state_skips_unchanged(test_validate, tmp_path):
+    """Test that baskets unchanged since the last run are not validated
+    again, and that changed baskets are.
+    """
+    nested_basket_dir = test_validate.set_up_basket(
+        "my_nested_basket", is_man=True, is_sup=True, is_meta=False
+    )
+    unchanged_path = test_validate.upload_basket(
+        tmp_basket_dir=nested_basket_dir, uid="0001"
+    )
+    changed_path = test_validate.upload_basket(
+        tmp_basket_dir=nested_basket_dir, uid="0002"
+    )
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    validation_state = ValidationState(str(tmp_path / "state.db"))
+    first_report = pantry.create_validation_report(
+        validation_state=validation_state
+    )
+    assert len(first_report) == 2
+
+    # Adding a file changes the basket's fingerprint.
+    test_validate.file_system.pipe_file(
+        os.path.join(changed_path, "new_file.txt"), b"new file"
+    )
+    # pylint: disable-next=protected-access
+    validate_basket = validate._validate_basket
+    with patch.object(
+        validate, "_validate_basket", wraps=validate_basket
+    ) as mock_validate_basket:
+        report = pantry.create_validation_report(
+            validation_state=validation_state
+        )
+
+    validated = [call.args[0] for call in mock_validate_basket.call_args_list]
+    assert not any(Path(path).match(unchanged_path) for path in validated)
+    assert any(Path(path).match(changed_path) for path in validated)
+    assert [record.code for record in report] == [
+        "nested_basket", "file_not_in_supplement", "nested_basket"
+    ]
+    validation_state.close()
+
+
+def test_validate_validation_state_without_versions(test_validate, tmp_path):
+    """Test that baskets whose files have no version identifier (no ETag or
+    modification time) are validated on every run, and never stored.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    basket_path = test_validate.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0001"
+    )
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    validation_state = ValidationState(str(tmp_path / "state.db"))
+    # pylint: disable-next=protected-access
+    validate_basket = validate._validate_basket
+    with patch.object(validate, "get_info_identity", return_value=None), \
+            patch.object(
+                validate, "_validate_basket", wraps=validate_basket
+            ) as mock_validate_basket:
+        pantry.validate(validation_state=validation_state)
+        pantry.validate(validation_state=validation_state)
+
+    validated = [call.args[0] for call in mock_validate_basket.call_args_list]
+    assert len([
+        path for path in validated if Path(path).match(basket_path)
+    ]) == 2
+    assert len(validation_state) == 0
+    validation_state.close()
+
+
+def test_validate_validation_state_keeps_index(test_validate, tmp_path):
+    """Test that the index is not regenerated when a validation_state is
+    given, unless rebuild_index is set.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    test_validate.upload_basket(tmp_basket_dir=tmp_basket_dir, uid="0001")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    pantry.index.generate_index()
+    validation_state = ValidationState(str(tmp_path / "state.db"))
+
+    with patch.object(
+        pantry.index, "generate_index"
+    ) as mock_generate_index:
+        assert pantry.validate(validation_state=validation_state) == []
+        assert mock_generate_index.call_count == 0
+        pantry.validate(validation_state=validation_state, rebuild_index=True)
+        assert mock_generate_index.call_count == 1
+    validation_state.close()
+
+
+def test_validate_validation_state_rechecks_parents(test_validate, tmp_path):
+    """Test that the parent uuids of unchanged baskets are checked against
+    the index on every run.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    parent_path = test_validate.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0001"
+    )
+    test_validate.upload_basket(
+        tmp_basket_dir=tmp_basket_dir, uid="0002", parent_ids=["0001"]
+    )
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    validation_state = ValidationState(str(tmp_path / "state.db"))
+    assert pantry.validate(
+        validation_state=validation_state, rebuild_index=True
+    ) == []
+
+    test_validate.file_system.rm(parent_path, recursive=True)
+    warning_list = pantry.validate(
+        validation_state=validation_state, rebuild_index=True
+    )
+
+    assert len(warning_list) == 1
+    assert warning_list[0].args[0] == (
+        "The uuids: ['0001'] were not found in the index, which was found "
+        "inside basket: 0002"
+    )
+    validation_state.close()
+
+
+def test_validate_parent_uuids_single_index_query(test_validate):
+    """Test that the parent uuids of every basket are checked with a single
+    index query, and that missing parents are reported per basket.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    test_validate.upload_basket(tmp_basket_dir=tmp_basket_dir, uid="0000")
+    for i in range(1, 6):
+        test_validate.upload_basket(
+            tmp_basket_dir=tmp_basket_dir,
+            uid=f"000{i}",
+            parent_ids=["0000", f"BAD{i}"] if i % 2 else ["0000"],
+        )
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    with patch.object(
+        pantry.index, "get_rows", wraps=pantry.index.get_rows
+    ) as mock_get_rows:
+        warning_list = validate.validate_pantry(pantry, max_workers=4)
+
+    mock_get_rows.assert_called_once()
+    assert sorted(mock_get_rows.call_args.args[0]) == [
+        "0000", "BAD1", "BAD3", "BAD5"
+    ]
+    assert [warn.args[0] for warn in warning_list] == [
+        f"The uuids: ['BAD{i}'] were not found in the index, which was "
+        f"found inside basket: 000{i}"
+        for i in (1, 3, 5)
+    ]
+
+
+def test_validate_file_size_mismatch(test_validate):
+    """Test that a file whose size differs from its size in the supplement
+    raises a warning.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    basket_path = test_validate.upload_basket(tmp_basket_dir=tmp_basket_dir)
+    file_path = os.path.join(basket_path, "my_basket", "test.txt")
+    test_validate.file_system.pipe_file(file_path, b"This is")
+
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    report = pantry.create_validation_report()
+
+    assert [record.code for record in report] == ["file_size_mismatch"]
+    warning = report.to_warnings()[0]
+    assert warning.args[0] == (
+        "File size in the file system does not match the "
+        "basket_supplement.json: "
+    )
+    assert Path(warning.args[1]).match(file_path)
+
+
+def test_validate_stub_files(test_validate):
+    """Test that stubs listed in the supplement are not expected to be in
+    the file system.
+    """
+    tmp_basket_dir = test_validate.set_up_basket("my_basket")
+    pantry = Pantry(
+        IndexPandas,
+        pantry_path=test_validate.pantry_path,
+        file_system=test_validate.file_system
+    )
+    pantry.upload_basket(
+        [
+            {"path": str(tmp_basket_dir.join("test.txt")), "stub": True},
+            {"path": str(tmp_basket_dir.realpath()), "stub": False},
+        ],
+        basket_type="test_basket",
+    )
+
+    assert validate.validate_pantry(pantry) == []
@@ -0,0 +1,69 @@
+"""Pytests for the ValidationReport and ValidationRecord functionality."""
+import pytest
+
+from weave import ValidationRecord, ValidationReport
+
+
+def make_record(code, path, basket="basket"):
+    """Return a ValidationRecord with a message made from the code."""
+    return ValidationRecord(
+        code, f"Invalid Basket. {code} at: ", path, basket=basket
+    )
+
+
+def test_validation_record_to_warning():
+    """Test that a record converts to the warning raised by validate_pantry.
+    """
+    warning = make_record("missing_supplement", "basket").to_warning()
+    assert isinstance(warning, UserWarning)
+    assert warning.args == (
+        "Invalid Basket. missing_supplement at: ", "basket"
+    )
+
+
+def test_validation_report_json_round_trip():
+    """Test that a report is unchanged by serializing and loading it."""
+    report = ValidationReport()
+    report.add_basket(
+        "basket_1", [make_record("nested_basket", "basket_1")], 0.5
+    )
+    report.add_basket("basket_2", [], 0.25)
+
+    loaded = ValidationReport.from_json(report.to_json())
+    assert loaded.records == report.records
+    assert loaded.durations == {"basket_1": 0.5, "basket_2": 0.25}
+    assert loaded.baskets == ["basket_1", "basket_2"]
+    assert not loaded.is_valid
+
+
+def test_validation_report_merge():
+    """Test that merging reports combines their records and durations."""
+    report_1 = ValidationReport(
+        [make_record("nested_basket", "basket_1")], {"basket_1": 1.0}
+    )
+    report_2 = ValidationReport([], {"basket_2": 2.0})
+
+    merged = report_1.merge(report_2)
+    assert len(merged) == 1
+    assert merged.durations == {"basket_1": 1.0, "basket_2": 2.0}
+    # The merged reports are left unchanged.
+    assert report_1.baskets == ["basket_1"]
+
+    with pytest.raises(TypeError, match="must be a ValidationReport"):
+        report_1.merge([])
+
+
+def test_validation_report_diff():
+    """Test that diff finds new and resolved records, ignoring the order
+    and timings of the runs.
+    """
+    kept = make_record("nested_basket", "basket_1")
+    fixed = make_record("missing_supplement", "basket_2")
+    new = make_record("missing_supplement", "basket_3")
+    previous = ValidationReport([fixed, kept], {"basket_1": 1.0})
+    current = ValidationReport([kept, new], {"basket_1": 3.0})
+
+    added, resolved = current.diff(previous)
+    assert added == [new]
+    assert resolved == [fixed]
+    assert previous.diff(previous) == ([], [])
@@ -0,0 +1,54 @@
+"""Pytests for the ValidationState functionality."""
+import pytest
+
+from weave import ValidationRecord, ValidationState
+
+
+@pytest.fixture(name="validation_state")
+def fixture_validation_state(tmp_path):
+    """Sets up a ValidationState in a temporary directory."""
+    validation_state = ValidationState(str(tmp_path / "state.db"))
+    yield validation_state
+    validation_state.close()
+
+
+def test_validation_state_put_and_get(validation_state):
+    """Test that stored results are returned for an unchanged fingerprint.
+    """
+    record = ValidationRecord(
+        "nested_basket", "Invalid Basket. Nested at: ", "basket",
+        basket="basket",
+    )
+    manifest = {"uuid": "0001", "parent_uuids": ["0000"]}
+    validation_state.put("basket", "fingerprint", [record], manifest)
+
+    assert validation_state.get("basket", "fingerprint") == (
+        [record], manifest
+    )
+    assert validation_state.get("basket", "new fingerprint") is None
+    assert validation_state.get("other basket", "fingerprint") is None
+
+
+def test_validation_state_replace_and_clear(validation_state):
+    """Test that a basket's result is replaced, and that clear removes every
+    result.
+    """
+    validation_state.put("basket", "fingerprint_1", [], None)
+    validation_state.put("basket", "fingerprint_2", [], None)
+    assert len(validation_state) == 1
+    assert validation_state.get("basket", "fingerprint_2") == ([], None)
+
+    validation_state.clear()
+    assert len(validation_state) == 0
+
+
+def test_validation_state_persists(tmp_path):
+    """Test that results persist across instances using the same db file."""
+    db_path = str(tmp_path / "state.db")
+    validation_state = ValidationState(db_path)
+    validation_state.put("basket", "fingerprint", [], None)
+    validation_state.close()
+
+    validation_state = ValidationState(db_path)
+    assert validation_state.get("basket", "fingerprint") == ([], None)
+    validation_state.close()
@@ -1,18 +1,30 @@
 """Contains functions and classes concerning the upload functionality."""
 
-import hashlib
 from importlib import metadata
 import json
-import math
 import os
-import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone as tz
 from pathlib import Path
+import pandas as pd
 import s3fs
 
 from fsspec.implementations.local import LocalFileSystem
 from .config import get_file_system, prohibited_filenames
+from .hash_cache import get_file_identity
+from .index.create_index import create_index_from_manifests
+from .hashing import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_HASH_ALGORITHM,
+    get_hasher,
+    hash_bytes,
+    hash_file,
+    hash_modes,
+)
+from .supplement import (
+    INTEGRITY_DATA_FILENAME, SupplementWriter, load_supplement
+)
 
 
 def validate_upload_item(upload_item: dict[str, str | bool], **kwargs):
@@ -65,17 +77,41 @@ def derive_integrity_data(
         and the byte_count is 2, the checksum will be calculated from bytes
         1, 2 (beginning two bytes), 5, 6 (middle two bytes) and 9, 10
         (last two bytes). This option is provided to speed up checksum
-        calculation for large files.
+        calculation for large files. Only used by the 'sampled' hash_mode.
+    **source_file_system: fsspec object (optional)
+        The file system hosting the file. Defaults to the local file system.
+    **hash_mode: str (default="sampled")
+        How the checksum is derived. One of:
+        'sampled': the byte_count sampling described above.
+        'full': every byte is hashed, streamed with bounded memory.
+        'chunked': every byte is hashed in parallel chunks of chunk_size,
+        and the chunk digests are combined into a single root hash.
+    **chunk_size: int (optional)
+        Size in bytes of each chunk when using the 'chunked' hash_mode.
+        Defaults to weave.hashing.DEFAULT_CHUNK_SIZE.
+    **max_workers: int (optional)
+        Maximum number of threads used by the 'chunked' hash_mode.
+    **hash_algorithm: str (default="sha256")
+        The hash algorithm used to derive the checksum. One of
+        weave.hashing.hash_algorithms ('sha256', 'blake2b' or 'xxh3_128').
+    **hash_cache: weave.HashCache (optional)
+        A persistent cache of file hashes. If provided, the hash of a file
+        whose path, size, modification time (or S3 ETag) and hashing
+        parameters match a cached entry is returned without reading the file.
 
     Returns
     ----------
     Dictionary
      {
       'file_size': bytes (int),
-      'hash': sha256 hash (string),
+      'hash': hash of the file (string),
       'access_date': current date/time (string),
       'source_path': path to the original source of data (string),
-      'byte_count': byte count used for generated checksum (int)
+      'byte_count': byte count used for generated checksum (int),
+      'hash_mode': hash mode used for generated checksum (string),
+      'hash_algorithm': hash algorithm used for generated checksum (string),
+      'chunk_size': chunk size used for generated checksum (int, only
+                    present for the 'chunked' hash_mode)
      }
     """
     source_file_system = kwargs.get("source_file_system", LocalFileSystem())
@@ -104,34 +140,187 @@ def derive_integrity_data(
             f" bytes: '{byte_count}'"
         )
 
+    hash_mode = kwargs.get("hash_mode", "sampled")
+    if hash_mode not in hash_modes:
+        raise ValueError(
+            f"'hash_mode' must be one of {hash_modes}: '{hash_mode}'"
+        )
+
+    chunk_size = kwargs.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    if not isinstance(chunk_size, int):
+        raise TypeError(f"'chunk_size' must be an int: '{chunk_size}'")
+    if chunk_size <= 0:
+        raise ValueError(
+            f"'chunk_size' must be greater than zero: '{chunk_size}'"
+        )
+
+    hash_algorithm = kwargs.get("hash_algorithm", DEFAULT_HASH_ALGORITHM)
+    # Raises an error for unknown or unavailable algorithms before any
+    # bytes are read.
+    get_hasher(hash_algorithm)
+
     if isinstance(source_file_system, s3fs.S3FileSystem):
         file_size = source_file_system.du(file_path)
     else:
         file_size = os.path.getsize(file_path)
 
-    if file_size <= byte_count * 3:
-        with source_file_system.open(file_path, "rb") as file:
-            sha256_hash = hashlib.sha256(file.read()).hexdigest()
-    else:
-        hasher = hashlib.sha256()
-        midpoint = file_size / 2.0
-        midpoint_seek_position = math.floor(midpoint - byte_count / 2.0)
-        end_seek_position = file_size - byte_count
-        with source_file_system.open(file_path, "rb") as file:
-            hasher.update(file.read(byte_count))
-            file.seek(midpoint_seek_position)
-            hasher.update(file.read(byte_count))
-            file.seek(end_seek_position)
-            hasher.update(file.read(byte_count))
-        sha256_hash = hasher.hexdigest()
+    # Only the parameters that affect the resulting hash form the cache key.
+    hash_parameters = f"{hash_algorithm}:{hash_mode}:{byte_count}"
+    if hash_mode == "chunked":
+        hash_parameters += f":{chunk_size}"
+
+    hash_cache = kwargs.get("hash_cache", None)
+    file_hash, identity = None, None
+    if hash_cache is not None:
+        file_size, identity = get_file_identity(source_file_system, file_path)
+        file_hash = hash_cache.get(
+            file_path, file_size, identity, hash_parameters
+        )
 
-    return {
+    if file_hash is None:
+        file_hash = hash_file(
+            source_file_system,
+            file_path,
+            file_size,
+            byte_count,
+            hash_mode=hash_mode,
+            chunk_size=chunk_size,
+            max_workers=kwargs.get("max_workers", None),
+            hash_algorithm=hash_algorithm,
+        )
+        if hash_cache is not None:
+            hash_cache.put(
+                file_path, file_size, identity, hash_parameters, file_hash
+            )
+
+    integrity_data = {
         "file_size": file_size,
-        "hash": sha256_hash,
+        "hash": file_hash,
         "access_date": datetime.now(tz.utc).isoformat(),
         "source_path": file_path,
         "byte_count": byte_count,
+        "hash_mode": hash_mode,
+        "hash_algorithm": hash_algorithm,
+    }
+    if hash_mode == "chunked":
+        integrity_data["chunk_size"] = chunk_size
+    return integrity_data
+
+
+def create_manifest(**kwargs) -> dict:
+    """Creates the contents of a basket_manifest.json.
+
+    Parameters
+    ----------
+    **unique_id: str (required)
+        Unique ID of the basket.
+    **basket_type: str (required)
+        Type of the basket.
+    **parent_ids: [str] (optional)
+        List of unique ids of the basket's parent baskets.
+    **label: str (optional)
+        User friendly label associated with the basket.
+
+    Returns
+    ----------
+    The manifest dictionary.
+    """
+    return {
+        "uuid": kwargs.get("unique_id"),
+        "upload_time": datetime.now(tz.utc).isoformat(),
+        "parent_uuids": kwargs.get("parent_ids", []),
+        "basket_type": kwargs.get("basket_type"),
+        "label": kwargs.get("label", ""),
+        "weave_version": metadata.version("weave-db"),
+    }
+
+
+def upload_file_contents_as_basket(
+    file_name: str, contents: bytes, **kwargs
+) -> str:
+    """Uploads in-memory file contents as a single file basket.
+
+    This is a lightweight alternative to UploadBasket for contents that are
+    generated in memory (such as an index), which avoids staging the contents
+    in a local temporary file. The file, manifest and supplement are written
+    in a single batched call.
+
+    Parameters
+    ----------
+    file_name: str
+        Name of the file inside the basket.
+    contents: bytes
+        Contents of the file.
+    **file_system: fsspec object (required)
+        The file system to upload to.
+    **pantry_path: str (required)
+        Path to the pantry that will hold this basket.
+    **basket_type: str (required)
+        Type of basket being uploaded.
+    **unique_id: str (optional)
+        Unique ID to identify the basket once uploaded.
+    **byte_count: int (default=10**8)
+        Byte count used to derive the file's checksum.
+    **extra_files: dict (optional)
+        Dictionary mapping the names of additional files to their contents
+        (bytes), which are uploaded alongside the file in the same basket.
+
+    Returns
+    ----------
+    The path of the uploaded basket (str).
+    """
+    file_system = kwargs.get("file_system")
+    basket_type = kwargs.get("basket_type")
+    unique_id = kwargs.get("unique_id", uuid.uuid1().hex)
+    byte_count = kwargs.get("byte_count", 10**8)
+    upload_directory = os.path.join(
+        kwargs.get("pantry_path"), basket_type, unique_id
+    )
+    if file_system.isdir(upload_directory):
+        raise FileExistsError(
+            f"'upload_directory' already exists: '{upload_directory}''"
+        )
+    files = {file_name: contents}
+    files.update(kwargs.get("extra_files", {}))
+
+    supplement_data = {
+        "upload_items": [
+            {"path": name, "stub": False} for name in files
+        ],
+        "integrity_data": [
+            {
+                "file_size": len(file_contents),
+                "hash": hash_bytes(file_contents, byte_count),
+                "access_date": datetime.now(tz.utc).isoformat(),
+                "source_path": name,
+                "byte_count": byte_count,
+                "hash_mode": "sampled",
+                "hash_algorithm": DEFAULT_HASH_ALGORITHM,
+                "stub": False,
+                "upload_path": os.path.join(upload_directory, name),
+            }
+            for name, file_contents in files.items()
+        ],
     }
+    manifest = create_manifest(unique_id=unique_id, basket_type=basket_type)
+
+    file_system.mkdir(upload_directory)
+    try:
+        file_system.pipe({
+            **{
+                os.path.join(upload_directory, name): file_contents
+                for name, file_contents in files.items()
+            },
+            os.path.join(upload_directory, "basket_supplement.json"):
+                json.dumps(supplement_data).encode("utf-8"),
+            os.path.join(upload_directory, "basket_manifest.json"):
+                json.dumps(manifest).encode("utf-8"),
+        })
+    except Exception as the_exception:
+        if file_system.exists(upload_directory):
+            file_system.rm(upload_directory, recursive=True)
+        raise the_exception
+    return upload_directory
 
 
 class UploadBasket:
@@ -180,6 +369,23 @@ class UploadBasket:
             If None, it will use the default fs from the weave.config.
         **pantry_path: str
             Path to the pantry that will hold this basket.
+        **hash_mode: str (default="sampled")
+            How file checksums are derived ('sampled', 'full' or 'chunked').
+            See derive_integrity_data for details.
+        **chunk_size: int (optional)
+            Chunk size in bytes used by the 'chunked' hash_mode.
+        **hash_algorithm: str (default="sha256")
+            Hash algorithm used to derive file checksums. See
+            derive_integrity_data for details.
+        **hash_cache: weave.HashCache (optional)
+            Cache consulted before hashing each file. See
+            derive_integrity_data for details.
+        **streaming_supplement: bool (default=False)
+            If True, the integrity data is written to a JSON Lines sidecar
+            (basket_integrity_data.jsonl) as each file is uploaded, instead
+            of being held in memory and written to the supplement, which is
+            much smaller for baskets of millions of files. The supplement
+            then names the sidecar in its integrity_data_file.
         Please note that either the upload_directory OR the basket_type must
         be provided. IT IS RECOMMENDED that the user simply provide the
         basket_type as this will allow the library to choose a good unique_id,
@@ -197,11 +403,7 @@ class UploadBasket:
 
         self.upload_items = upload_items
         self.kwargs = kwargs
-        # We cannot use with in this case, as we want the temp dir to persist
-        # beyond this function.
-        # pylint: disable-next=consider-using-with
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.temp_dir_path = self.temp_dir.name
+        self.manifest = None
         self.run_logic()
 
     def run_logic(self):
@@ -210,11 +412,9 @@ class UploadBasket:
         self.check_that_upload_dir_does_not_exist()
 
         try:
-            self.setup_temp_dir_for_staging_prior_to_fs()
+            self.create_upload_directory()
             self.upload_files_and_stubs_to_fs()
-            self.create_and_upload_basket_json_to_fs()
-            self.upload_basket_metadata_to_fs()
-            self.upload_basket_supplement_to_fs()
+            self.upload_basket_json_artifacts_to_fs()
 
             if self.kwargs.get("test_clean_up", False):
 
@@ -243,6 +443,11 @@ class UploadBasket:
             "weave_version": str,
             "pantry_path": str,
             "test_prefix": str,
+            "hash_mode": str,
+            "chunk_size": int,
+            "hash_algorithm": str,
+            "hash_cache": object,
+            "streaming_supplement": bool,
         }
         for key, value in self.kwargs.items():
             if key not in kwargs_schema:
@@ -345,8 +550,8 @@ class UploadBasket:
                 f"'upload_directory' already exists: '{upload_directory}''"
             )
 
-    def setup_temp_dir_for_staging_prior_to_fs(self):
-        """Sets up a temporary directory to hold stuff before upload to FS."""
+    def create_upload_directory(self):
+        """Creates the upload directory on the FS."""
         self.file_system.mkdir(self.kwargs.get("upload_directory"))
 
     def upload_files_and_stubs_to_fs(self):
@@ -355,22 +560,32 @@ class UploadBasket:
             "integrity_data": [],
             "upload_items": self.upload_items,
         }
+        if self.kwargs.get("streaming_supplement", False):
+            with SupplementWriter(
+                self.file_system, self.kwargs.get("upload_directory")
+            ) as writer:
+                self._upload_items_to_fs(writer.write)
+            supplement_data["integrity_data_file"] = INTEGRITY_DATA_FILENAME
+        else:
+            self._upload_items_to_fs(supplement_data["integrity_data"].append)
+        self.kwargs["supplement_data"] = supplement_data
+
+    def _upload_items_to_fs(self, add_integrity_data):
+        """Upload the files and stubs of every upload item, passing the
+        integrity data of each file to add_integrity_data."""
         for upload_item in self.upload_items:
             item_path = Path(upload_item["path"])
             if self.source_file_system.isdir(item_path):
                 for root, _, files in self.source_file_system.walk(item_path):
                     for name in files:
                         local_path = os.path.join(root, name)
-                        file_int_dat = self.handle_file_integrity_data(
+                        add_integrity_data(self.handle_file_integrity_data(
                             local_path, upload_item, item_path
-                        )
-                        supplement_data["integrity_data"].append(file_int_dat)
+                        ))
             else:
-                file_int_dat = self.handle_file_integrity_data(
+                add_integrity_data(self.handle_file_integrity_data(
                     str(item_path), upload_item, item_path
-                )
-                supplement_data["integrity_data"].append(file_int_dat)
-        self.kwargs["supplement_data"] = supplement_data
+                ))
 
     def handle_file_integrity_data(
         self,
@@ -379,10 +594,18 @@ class UploadBasket:
         item_path: str,
     ) -> dict:
         """Gathers the file integrity data, handles stub logic"""
+        hash_kwargs = {
+            key: self.kwargs[key]
+            for key in (
+                "hash_mode", "chunk_size", "hash_algorithm", "hash_cache"
+            )
+            if key in self.kwargs
+        }
         file_int_dat = derive_integrity_data(
             str(local_path),
             file_system=self.file_system,
             source_file_system=self.source_file_system,
+            **hash_kwargs,
         )
         if upload_item["stub"] is False:
             file_int_dat["stub"] = False
@@ -420,55 +643,55 @@ class UploadBasket:
         else:
             self.file_system.upload(local_path, file_upload_path)
 
-    def create_and_upload_basket_json_to_fs(self):
-        """Creates and dumps a JSON containing basket metadata."""
-        basket_json_path = os.path.join(
-            self.temp_dir_path, "basket_manifest.json"
+    def upload_basket_json_artifacts_to_fs(self):
+        """Writes the manifest, metadata and supplement to the FS concurrently.
+
+        Each artifact is serialized in memory and written with a single call,
+        so no local temporary files are created.
+        """
+        artifact_writers = (
+            self.create_and_upload_basket_json_to_fs,
+            self.upload_basket_metadata_to_fs,
+            self.upload_basket_supplement_to_fs,
         )
-        basket_json = {}
-        basket_json["uuid"] = self.kwargs.get("unique_id")
-        basket_json["upload_time"] = datetime.now(tz.utc).isoformat()
-        basket_json["parent_uuids"] = self.kwargs.get("parent_ids", [])
-        basket_json["basket_type"] = self.kwargs.get("basket_type")
-        basket_json["label"] = self.kwargs.get("label", "")
-        basket_json["weave_version"] = metadata.version("weave-db")
-
-        with open(basket_json_path, "w", encoding="utf-8") as outfile:
-            json.dump(basket_json, outfile)
-        self.file_system.upload(
-            basket_json_path,
-            os.path.join(
-                self.kwargs.get("upload_directory"), "basket_manifest.json"
-            ),
+        with ThreadPoolExecutor(max_workers=len(artifact_writers)) as pool:
+            futures = [pool.submit(writer) for writer in artifact_writers]
+            # Re-raise the first exception, if any, after all writes finish.
+            for future in futures:
+                future.result()
+
+    def _write_json_to_fs(self, file_name: str, data, **kwargs):
+        """Serializes data to JSON in memory and writes it to the upload
+        directory on the FS."""
+        self.file_system.pipe_file(
+            os.path.join(self.kwargs.get("upload_directory"), file_name),
+            json.dumps(data, **kwargs).encode("utf-8"),
         )
 
-    def upload_basket_metadata_to_fs(self):
-        """Dumps metadata to tempdir, and then uploads to FS."""
-        metadata_path = os.path.join(
-            self.temp_dir_path, "basket_metadata.json"
+    def create_and_upload_basket_json_to_fs(self):
+        """Creates and writes a JSON containing basket metadata."""
+        basket_json = create_manifest(
+            unique_id=self.kwargs.get("unique_id"),
+            parent_ids=self.kwargs.get("parent_ids", []),
+            basket_type=self.kwargs.get("basket_type"),
+            label=self.kwargs.get("label", ""),
         )
+        self._write_json_to_fs("basket_manifest.json", basket_json)
+        self.manifest = basket_json
+
+    def upload_basket_metadata_to_fs(self):
+        """Writes the basket metadata to the FS."""
         if "metadata" in self.kwargs:
-            with open(metadata_path, "w", encoding="utf-8") as outfile:
-                json.dump(self.kwargs.get("metadata"), outfile, default=str)
-            self.file_system.upload(
-                metadata_path,
-                os.path.join(
-                    self.kwargs.get("upload_directory"), "basket_metadata.json"
-                ),
+            self._write_json_to_fs(
+                "basket_metadata.json",
+                self.kwargs.get("metadata"),
+                default=str,
             )
 
     def upload_basket_supplement_to_fs(self):
-        """Dumps metadata to tempdir, and then uploads to FS."""
-        supplement_json_path = os.path.join(
-            self.temp_dir_path, "basket_supplement.json"
-        )
-        with open(supplement_json_path, "w", encoding="utf-8") as outfile:
-            json.dump(self.kwargs.get("supplement_data"), outfile)
-        self.file_system.upload(
-            supplement_json_path,
-            os.path.join(
-                self.kwargs.get("upload_directory"), "basket_supplement.json"
-            ),
+        """Writes the basket supplement to the FS."""
+        self._write_json_to_fs(
+            "basket_supplement.json", self.kwargs.get("supplement_data")
         )
 
     def fs_upload_path_exists(self) -> bool:
@@ -481,6 +704,37 @@ class UploadBasket:
             self.kwargs.get("upload_directory"), recursive=True
         )
 
+    def get_manifest(self) -> dict:
+        """Returns the manifest written to the uploaded basket."""
+        return self.manifest
+
+    def get_supplement(self) -> dict:
+        """Returns the supplement written to the uploaded basket.
+
+        If the integrity data was streamed to a sidecar, it is read back into
+        the supplement's integrity_data, as in Basket.get_supplement.
+        """
+        supplement_data = self.kwargs.get("supplement_data")
+        if supplement_data is None:
+            return None
+        return load_supplement(
+            self.file_system,
+            os.path.join(
+                self.get_upload_path(), "basket_supplement.json"
+            ),
+            supplement_data,
+        )
+
+    def get_index_row(self) -> pd.DataFrame:
+        """Returns the index row of the uploaded basket.
+
+        The row is built from the manifest held in memory, so the uploaded
+        basket is not read back from the file system.
+        """
+        return create_index_from_manifests(
+            {self.get_upload_path(): self.manifest}, self.file_system
+        )
+
     def get_upload_path(self) -> str:
         """Gets upload path from kwargs and returns it."""
         upload_path = self.kwargs.get("upload_directory")
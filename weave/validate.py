@@ -1,59 +1,142 @@
 """Contains functions and classes used by uploader.py's upload function."""
 
+import hashlib
 import json
 import os
+import threading
+import time
 import warnings
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import jsonschema
 import s3fs
 from  fsspec import AbstractFileSystem
-from jsonschema import validate
 
-from .config import manifest_schema, supplement_schema, prohibited_filenames
+from .config import prohibited_filenames
+from .hash_cache import get_info_identity
+from .schema_validation import manifest_validator, supplement_validator
+from .supplement import INTEGRITY_DATA_FILENAME, load_supplement
+from .validation_report import ValidationRecord, ValidationReport
+from .validation_state import ValidationState
 
 
-def validate_pantry(pantry) -> list[Warning | str]:
+def validate_pantry(pantry, **kwargs) -> list[Warning | str]:
     """Starts the validation process off based off the name of the pantry.
 
-    Validates that the pantry actually exists at the location given.
-    If there is a pantry that exists, check it and every subdirectory by
-    calling check_level.
+    This is a wrapper around create_validation_report, returning the records
+    of the report as warnings.
 
     Parameters
     ----------
     pantry: weave.Pantry
         Pantry to be validated.
+    **kwargs:
+        Additional parameters to pass to create_validation_report.
 
     Returns
     ----------
     A list of all invalid basket locations (will return an empty list if
     no warnings are raised).
     """
+    return create_validation_report(pantry, **kwargs).to_warnings()
+
+
+def create_validation_report(pantry, **kwargs) -> ValidationReport:
+    """Validate a pantry, or a shard of it, into a ValidationReport.
+
+    Validates that the pantry actually exists at the location given.
+    If there is a pantry that exists, the whole pantry is listed in a single
+    bulk request, and every basket found in the listing is validated.
+    Baskets are validated concurrently across a pool of worker threads.
+
+    A pantry may be split into shards validated separately (ie on different
+    nodes), and the reports of the shards merged with
+    ValidationReport.merge. Baskets are assigned to shards by a hash of
+    their path within the pantry.
+
+    Parameters
+    ----------
+    pantry: weave.Pantry
+        Pantry to be validated.
+    **max_workers: int (optional)
+        Maximum number of baskets validated concurrently. Defaults to the
+        ThreadPoolExecutor default.
+    **shard_count: int (default=1)
+        Number of shards the pantry is split into.
+    **shard_index: int (default=0)
+        Index of the shard to validate, from 0 to shard_count - 1.
+    **validation_state: weave.ValidationState (optional)
+        Store of the last validation results. When given, baskets whose
+        fingerprint (the size and version of every file in the basket) is
+        unchanged since the last run are not validated again, and the
+        results of the validated baskets are stored.
+    **rebuild_index: bool (optional)
+        Regenerate the pantry's index before validating, so the parent uuids
+        of the baskets are checked against every basket in the pantry. This
+        reads every manifest of the pantry. Defaults to True, unless the
+        pantry is sharded or a validation_state is given, in which case the
+        index is expected to be up to date (ie regenerated once, before the
+        shards are validated). It cannot be set for a sharded pantry, so
+        shards never write to the index.
+
+    Returns
+    ----------
+    A ValidationReport with a record of every problem found.
+    """
+    shard_count = kwargs.get("shard_count", 1)
+    shard_index = kwargs.get("shard_index", 0)
+    if not isinstance(shard_count, int) or not isinstance(shard_index, int):
+        raise TypeError("'shard_count' and 'shard_index' must be ints")
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(
+            f"'shard_index' must be between 0 and 'shard_count' - 1: "
+            f"'{shard_index}'"
+        )
+
+    validation_state = kwargs.get("validation_state", None)
+    rebuild_index = kwargs.get(
+        "rebuild_index", shard_count == 1 and validation_state is None
+    )
+    if rebuild_index and shard_count > 1:
+        raise ValueError(
+            "'rebuild_index' cannot be set when 'shard_count' is greater "
+            "than 1, as shards must not write to the index"
+        )
+
     if not pantry.file_system.exists(pantry.pantry_path):
         raise ValueError(
             f"Invalid pantry Path. Pantry does not exist at: "
             f"{pantry.pantry_path}"
         )
 
-    # Catching the warnings that are shown from calling
-    # generate_index() to prevent showing the same warning twice
-    with warnings.catch_warnings(record=True):
-        try:
-            pantry.index.generate_index()
-        except json.decoder.JSONDecodeError as error:
-            raise ValueError(
-                f"Pantry could not be loaded into index: {error}"
-            ) from error
+    if rebuild_index:
+        # Catching the warnings that are shown from calling
+        # generate_index() to prevent showing the same warning twice
+        with warnings.catch_warnings(record=True):
+            try:
+                pantry.index.generate_index()
+            except json.decoder.JSONDecodeError as error:
+                raise ValueError(
+                    f"Pantry could not be loaded into index: {error}"
+                ) from error
+
+    listing = _PantryListing(pantry.file_system, pantry.pantry_path)
+    basket_dirs = [
+        basket_dir for basket_dir in listing.find_baskets(listing.root)
+        if zlib.crc32(
+            os.path.relpath(basket_dir, listing.root).encode()
+        ) % shard_count == shard_index
+    ]
 
-    # Call check level using the pantry_name as the path
-    with warnings.catch_warnings(record=True) as warn:
-        _check_level(pantry.pantry_path, pantry=pantry)
-        # Iterate through warn and return the list of warning messages.
-        # Enumerate does not work here. prefer to use range and len
-        # pylint: disable-next=consider-using-enumerate
-        warning_list = [warn[i].message for i in range(len(warn))]
-        return warning_list
+    return _validate_baskets(
+        basket_dirs,
+        pantry,
+        listing,
+        max_workers=kwargs.get("max_workers", None),
+        validation_state=validation_state,
+    )
 
 
 def validate_basket_in_place_directory(
@@ -62,7 +145,8 @@ def validate_basket_in_place_directory(
     """
     Validates the directory to ensure it can be a valid basket.
 
-    Valid baskets should not contain nested baskets.
+    Valid baskets should not contain nested baskets. The directory is listed
+    with a single find call, instead of listing every subdirectory.
 
     Parameters:
     ----------
@@ -74,24 +158,27 @@ def validate_basket_in_place_directory(
     ----------
     bool: True if the directory is valid, False otherwise.
     """
-    for root, dirs, __ in file_system.walk(directory_path):
-        for directory in dirs:
-            dir_path = os.path.join(root, directory)
-            if any(
-                os.path.basename(f) in ["basket_manifest.json"]
-                for f in file_system.ls(dir_path)
-            ):
-                return False
+    # pylint: disable-next=protected-access
+    root = file_system._strip_protocol(directory_path).rstrip("/")
+    for file_path in file_system.find(root):
+        # A manifest in the directory itself is not a nested basket.
+        if (
+            os.path.basename(file_path) == "basket_manifest.json"
+            and os.path.dirname(file_path) != root
+        ):
+            return False
     return True
 
 
 def validate_basket_in_place_directory_backward(
-    file_system: AbstractFileSystem, directory_path: str
+    file_system: AbstractFileSystem, directory_path: str, **kwargs
 ) -> bool:
     """
     Validates the directory to ensure it can be a valid basket.
     
-    Valid baskets should not be contained within an existing basket.
+    Valid baskets should not be contained within an existing basket. The
+    directory and each of its ancestors are probed for a basket manifest,
+    instead of being listed.
 
     Parameters:
     ----------
@@ -99,12 +186,17 @@ def validate_basket_in_place_directory_backward(
         The path to the directory to validate.
     file_system: fsspec.AbstractFileSystem
         The file system object
+    **pantry: weave.Pantry (optional)
+        If given, the directory and its ancestors are first looked up in the
+        pantry's index with a single query, so a directory inside a tracked
+        basket is rejected without probing the file system.
 
     Returns:
     ----------
     bool:
         True if the directory is valid, False otherwise.
     """
+    pantry = kwargs.get("pantry", None)
 
     if isinstance(file_system, s3fs.S3FileSystem):
         root_path = "s3://"
@@ -112,26 +204,289 @@ def validate_basket_in_place_directory_backward(
     else:
         root_path = os.path.abspath(os.sep)
         current_path = os.path.abspath(directory_path)
+    ancestors = []
     while (current_path != root_path) and (
         current_path != os.path.dirname(current_path)):
-        if any(
-            os.path.basename(f) in ["basket_manifest.json"]
-            for f in file_system.ls(current_path)
-        ):
-            return False
+        ancestors.append(str(current_path))
         current_path = os.path.dirname(current_path)
 
-    return True
+    if pantry is not None:
+        # Index addresses are stored as they were given, so the ancestors are
+        # also looked up as they are written in directory_path.
+        addresses = set(ancestors)
+        path = os.path.normpath(str(directory_path))
+        while path not in ("", os.path.dirname(path)):
+            addresses.add(path)
+            path = os.path.dirname(path)
+        if addresses and len(pantry.index.get_rows(sorted(addresses))) > 0:
+            return False
+    return not any(
+        file_system.exists(os.path.join(path, "basket_manifest.json"))
+        for path in ancestors
+    )
+
+
+class _PantryListing():
+    """A bulk listing of every file and directory under a path.
+
+    The listing is taken with a single detailed find call, and is then used
+    to answer every question about the tree without further requests.
+    """
+
+    def __init__(self, file_system: AbstractFileSystem, path: str):
+        """Initializes the _PantryListing.
+
+        Parameters
+        ----------
+        file_system: fsspec object
+            The file system hosting the path.
+        path: str
+            The path to list, ie the pantry path.
+        """
+        # pylint: disable-next=protected-access
+        self.root = file_system._strip_protocol(path)
+        self.entries = file_system.find(
+            self.root, withdirs=True, detail=True
+        )
+        self._children = {}
+        for entry in sorted(self.entries):
+            if entry != self.root:
+                self._children.setdefault(
+                    os.path.dirname(entry), []
+                ).append(entry)
+
+        # Every directory holding a manifest, and every directory with a
+        # manifest somewhere beneath it.
+        self.manifest_dirs = set()
+        self._dirs_above_manifest = set()
+        for entry in self.entries:
+            if os.path.basename(entry) == "basket_manifest.json":
+                directory = os.path.dirname(entry)
+                self.manifest_dirs.add(directory)
+                while directory not in ("", self.root):
+                    directory = os.path.dirname(directory)
+                    if directory in self._dirs_above_manifest:
+                        break
+                    self._dirs_above_manifest.add(directory)
+
+    def is_dir(self, path: str) -> bool:
+        """Return True if the path is a directory in the listing."""
+        return (
+            path == self.root
+            or self.entries.get(path, {}).get("type") == "directory"
+        )
+
+    def children(self, path: str) -> list[str]:
+        """Return the sorted immediate children of a directory."""
+        return self._children.get(path, [])
+
+    def files(self, path: str) -> list[str]:
+        """Return every file beneath a directory, at any depth."""
+        found = []
+        for child in self.children(path):
+            if self.is_dir(child):
+                found.extend(self.files(child))
+            else:
+                found.append(child)
+        return found
+
+    def fingerprint(self, path: str) -> str | None:
+        """Return a digest of the size and version identifier (ETag or
+        modification time) of every file beneath a directory.
+
+        The fingerprint changes whenever a file is added, removed or
+        modified. None is returned if any file has no version identifier, as
+        a modified file of the same size would go unnoticed.
+        """
+        digest = hashlib.sha256()
+        for file in self.files(path):
+            info = self.entries[file]
+            identity = get_info_identity(info)
+            if identity is None:
+                return None
+            digest.update(
+                json.dumps([
+                    os.path.relpath(file, path),
+                    info.get("size"),
+                    identity,
+                ]).encode()
+            )
+        return digest.hexdigest()
+
+    def contains_manifest(self, path: str) -> bool:
+        """Return True if a manifest is in or anywhere beneath a directory.
+        """
+        return (
+            path in self.manifest_dirs or path in self._dirs_above_manifest
+        )
+
+    def find_baskets(self, path: str) -> list[str]:
+        """Return the outermost baskets in or beneath a directory, in
+        listing order. Baskets nested inside another basket are left out.
+        """
+        if path in self.manifest_dirs:
+            return [path]
+        baskets = []
+        for child in self.children(path):
+            if self.is_dir(child) and self.contains_manifest(child):
+                baskets.extend(self.find_baskets(child))
+        return baskets
+
+
+_collector = threading.local()
+
+# Maximum number of parent uuids looked up in a single index query.
+_GET_ROWS_BATCH_SIZE = 10_000
+
+
+def _report(code: str, message: str, path: str):
+    """Report a problem found while validating a basket.
+
+    Inside of _validate_basket_in_worker the problem is added to the current
+    thread's records, otherwise it is raised with warnings.warn.
+
+    Parameters
+    ----------
+    code: str
+        Machine readable kind of the problem (see ValidationRecord).
+    message: str
+        Human readable description of the problem.
+    path: str
+        Path (or uuid) where the problem was found.
+    """
+    record = ValidationRecord(
+        code, message, path, basket=getattr(_collector, "basket", None)
+    )
+    records = getattr(_collector, "records", None)
+    if records is None:
+        warnings.warn(record.to_warning())
+    else:
+        records.append(record)
+
+
+def _validate_baskets(
+    basket_dirs: list[str], pantry, listing, **kwargs
+) -> ValidationReport:
+    """Validate baskets concurrently into a ValidationReport.
+
+    The parent uuids of every basket are collected while validating, and are
+    checked against the index at once afterwards (see _find_missing_parents).
+
+    Parameters
+    ----------
+    basket_dirs: [str]
+        Paths of the baskets to validate.
+    pantry: weave.Pantry
+        Pantry object representing the pantry to validate.
+    listing: _PantryListing
+        Listing containing the baskets.
+    **max_workers: int (optional)
+        Maximum number of baskets validated concurrently.
+    **validation_state: weave.ValidationState (optional)
+        Store of the last validation results.
+
+    Returns
+    ----------
+    A ValidationReport with a record of every problem found.
+    """
+    # Each worker collects the records of its basket, and they are added to
+    # the report in listing order so it does not depend on scheduling.
+    with ThreadPoolExecutor(
+        max_workers=kwargs.get("max_workers", None)
+    ) as executor:
+        results = list(executor.map(
+            lambda basket_dir: _validate_basket_in_worker(
+                basket_dir,
+                pantry,
+                listing,
+                kwargs.get("validation_state", None),
+            ),
+            basket_dirs,
+        ))
+
+    missing_parents = _find_missing_parents(
+        {
+            basket_dir: manifest
+            for basket_dir, (_, manifest, _) in zip(basket_dirs, results)
+            if manifest is not None
+        },
+        pantry,
+    )
+
+    report = ValidationReport()
+    for basket_dir, (records, manifest, duration) in zip(
+        basket_dirs, results
+    ):
+        if basket_dir in missing_parents:
+            records.append(ValidationRecord(
+                "missing_parent_uuids",
+                f"The uuids: {missing_parents[basket_dir]} were not found in "
+                f"the index, which was found inside basket: "
+                f"{manifest['uuid']}",
+                os.path.join(basket_dir, "basket_manifest.json"),
+                basket=basket_dir,
+            ))
+        report.add_basket(basket_dir, records, duration)
+    return report
+
+
+def _validate_basket_in_worker(
+    basket_dir: str, pantry, listing, state: ValidationState = None
+) -> tuple[list, dict | None, float]:
+    """Validate a basket, collecting its records instead of warning.
+
+    Unlike warnings.catch_warnings, this is safe to use from several threads
+    at once.
+
+    If a validation state is given and the basket is unchanged since it was
+    last validated, the last records are reused.
+
+    Returns
+    ----------
+    A tuple of the basket's ValidationRecords, the uuid and parent_uuids of
+    its manifest (dict, or None if the manifest is invalid), and the seconds
+    taken to validate it.
+    """
+    _collector.records = []
+    _collector.basket = basket_dir
+    _collector.manifest = None
+    start = time.perf_counter()
+    try:
+        fingerprint = None
+        if state is not None:
+            fingerprint = listing.fingerprint(basket_dir)
+        # Baskets without a fingerprint are always validated again.
+        if fingerprint is not None:
+            last_result = state.get(basket_dir, fingerprint)
+            if last_result is not None:
+                records, manifest = last_result
+                return records, manifest, time.perf_counter() - start
+
+        _validate_basket(basket_dir, pantry, listing=listing)
+        if fingerprint is not None:
+            state.put(
+                basket_dir,
+                fingerprint,
+                _collector.records,
+                _collector.manifest,
+            )
+        return (
+            _collector.records,
+            _collector.manifest,
+            time.perf_counter() - start,
+        )
+    finally:
+        _collector.records = None
+        _collector.basket = None
+        _collector.manifest = None
 
 
 def _check_level(current_dir: str, **kwargs) -> bool:
-    """Check all immediate subdirs in dir, check for manifest.
+    """Check all subdirs in dir, and validate the baskets found.
 
-    Checks all the immediate subdirectories and files in the given directory
-    to see if there is a basket_manifest.json file. If there is a manifest,
-    it's a basket and must be validated.
-    If there is a directory found, then recursively call check_level with that
-    found directory to find if there is a basket in any directory.
+    Every directory beneath the given directory holding a
+    basket_manifest.json is a basket, and is validated. Baskets nested inside
+    another basket are not validated on their own.
 
     Parameters
     ----------
@@ -143,69 +498,49 @@ def _check_level(current_dir: str, **kwargs) -> bool:
     **in_basket: bool (optional)
         This is a flag to signify that we are in a basket
         and we are looking for a nested basket now.
+    **listing: _PantryListing (optional)
+        Listing containing the current directory. Defaults to a new listing
+        of the current directory.
 
     Returns
     ----------
     bool that comes from:
-        a validate_basket() if there is a basket found
-        a check_level() if there is a directory found
         a true if a manifest is found while inside another basket
-        a default true if no basket is found
+        a false if no manifest is found while inside another basket
+        a default true after validating the baskets found
     """
 
     # Collect kwargs
     pantry = kwargs.get("pantry")
     file_system = pantry.file_system
     in_basket = kwargs.get("in_basket", False)
+    listing = kwargs.get("listing", None)
 
-    if not file_system.exists(current_dir):
-        raise ValueError(
-            f"Invalid Path. No file or directory found at: {current_dir}"
-        )
+    if listing is None:
+        if not file_system.exists(current_dir):
+            raise ValueError(
+                f"Invalid Path. No file or directory found at: {current_dir}"
+            )
+        listing = _PantryListing(file_system, current_dir)
+    # pylint: disable-next=protected-access
+    current_dir = file_system._strip_protocol(current_dir)
+
+    # If there is another manifest inside a basket,
+    # the nested basket does not need to be validated
+    if in_basket:
+        return listing.contains_manifest(current_dir)
+
+    report = _validate_baskets(
+        listing.find_baskets(current_dir), pantry, listing
+    )
+    for warning in report.to_warnings():
+        warnings.warn(warning)
+
+    # Return True because it is valid to have no baskets
+    return True
 
-    manifest_path = os.path.join(current_dir, "basket_manifest.json")
-
-    # If a manifest exists, it's a basket, validate it
-    if file_system.exists(manifest_path):
-        # If there is another manifest inside a basket,
-        # the nested basket does not need to be validated
-        if in_basket:
-            return True
-        return _validate_basket(current_dir, pantry)
-
-    # Go through all the other files, if it's a directory, check it
-    dirs_and_files = file_system.ls(path=current_dir, refresh=True)
-
-    for file_or_dir in dirs_and_files:
-        file_type = file_system.info(file_or_dir)["type"]
-
-        if file_type == "directory":
-            # If directory is a basket, check everything under it
-            # for a manifest and return True
-            # This will return True to the _validate_basket
-            # and throw an error or warning
-            if in_basket:
-                return _check_level(
-                    file_or_dir, pantry=pantry, in_basket=in_basket
-                )
-            # If directory is not a basket, check all files in the
-            # current dir. If everything is valid, _check_level returns True
-            # If it isn't valid, return False
-            # and continue looking at all the sub-directories
-            if not _check_level(
-                file_or_dir, pantry=pantry, in_basket=in_basket
-            ):
-                return False
-
-    # This is the default backup return
-    # Return True if directory is not a basket because
-    # it is valid to have no baskets
-    # Return False if directory is a basket because
-    # check_level did not find another basket
-    return not in_basket
-
-
-def _validate_basket(basket_dir: str, pantry) -> bool:
+
+def _validate_basket(basket_dir: str, pantry, **kwargs) -> bool:
     """Takes the root directory of a basket and validates it.
 
     Validation means there is a required basket_manifest.json and
@@ -215,9 +550,9 @@ def _validate_basket(basket_dir: str, pantry) -> bool:
     All three: manifest, supplement, and metadata are also verified by being
     able to be read into a python dictionary.
 
-    If there are any directories found inside this basket, run check_basket()
-    on them to see if there is another basket inside this basket. If there is
-    another basket, raise an error or warning for invalid pantry.
+    If there are any directories found inside this basket, check them to see
+    if there is another basket inside this basket. If there is another
+    basket, raise an error or warning for invalid pantry.
 
     If the basket is ever invalid, raise an error or warning.
     If the basket is valid return True.
@@ -228,37 +563,47 @@ def _validate_basket(basket_dir: str, pantry) -> bool:
         The path in the file system to the basket root directory.
     pantry: weave.Pantry
         Pantry object representing the pantry to validate.
+    **listing: _PantryListing (optional)
+        Listing containing the basket. Defaults to a new listing of the
+        basket directory.
 
     Returns
     ----------
     Boolean that is True when the basket is valid.
     If the Basket is invalid, raise an error or warning.
     """
-
-    manifest_path = os.path.join(basket_dir, "basket_manifest.json")
-    supplement_path = os.path.join(basket_dir, "basket_supplement.json")
+    listing = kwargs.get("listing", None)
+    if listing is None:
+        listing = _PantryListing(pantry.file_system, basket_dir)
 
     # A valid basket has both manifest and supplement
     # If for some reason the manifest is gone,
     # either the directory is wrong,
     # or this function is incorrectly called,
-    if not pantry.file_system.exists(manifest_path):
+    # pylint: disable-next=protected-access
+    basket_path = pantry.file_system._strip_protocol(basket_dir)
+    if basket_path not in listing.manifest_dirs:
         raise FileNotFoundError(
             f"Invalid Path. " f"No Basket found at: {basket_dir}"
         )
+    basket_dir = basket_path
+    supplement_path = os.path.join(basket_dir, "basket_supplement.json")
 
-    if not pantry.file_system.exists(supplement_path):
-        warnings.warn(
-            UserWarning(
-                "Invalid Basket. No Supplement file found at: ", basket_dir
-            )
+    if supplement_path not in listing.entries:
+        _report(
+            "missing_supplement",
+            "Invalid Basket. No Supplement file found at: ",
+            basket_dir,
         )
 
-    files_in_basket = pantry.file_system.ls(path=basket_dir, refresh=True)
+    files_in_basket = listing.children(basket_dir)
 
     basenames = [os.path.basename(x) for x in files_in_basket]
 
-    if set(prohibited_filenames) == set(basenames):
+    # The integrity data sidecar of a streamed supplement is optional.
+    if set(prohibited_filenames) == (
+        set(basenames) | {INTEGRITY_DATA_FILENAME}
+    ):
         # Basket with no files, check if it's a metadata-only basket
         _check_metadata_only(files_in_basket, pantry)
 
@@ -268,13 +613,13 @@ def _validate_basket(basket_dir: str, pantry) -> bool:
             "basket_manifest.json": _handle_manifest,
             "basket_supplement.json": _handle_supplement,
             "basket_metadata.json": _handle_metadata,
-        }.get(file_name, _handle_none_of_the_above)(file, pantry)
+        }.get(file_name, _handle_none_of_the_above)(file, pantry, listing)
 
     # Default return True if there are no problems with this basket
     return True
 
 
-def _handle_manifest(file: str, pantry):
+def _handle_manifest(file: str, pantry, listing):
     """Handles case if manifest.
 
     Parameters:
@@ -283,32 +628,35 @@ def _handle_manifest(file: str, pantry):
         Path to the file.
     pantry: weave.Pantry
         Pantry object representing the pantry to validate.
+    listing: _PantryListing
+        Listing containing the basket.
     """
 
     try:
-        # Make sure it can be loaded, valid schema, and valid parent_uuids
+        # Make sure it can be loaded and valid schema. The parent_uuids of
+        # every basket are checked at once (see _validate_baskets).
         data = json.load(pantry.file_system.open(file))
-        validate(instance=data, schema=manifest_schema)
-        _validate_parent_uuids(data, pantry)
+        manifest_validator.validate(data)
+        _collector.manifest = {
+            "uuid": data["uuid"], "parent_uuids": data["parent_uuids"]
+        }
 
     except jsonschema.exceptions.ValidationError:
-        warnings.warn(
-            UserWarning(
-                "Invalid Basket. Manifest Schema does not match at: ",
-                file
-            )
+        _report(
+            "invalid_manifest_schema",
+            "Invalid Basket. Manifest Schema does not match at: ",
+            file,
         )
 
     except json.decoder.JSONDecodeError:
-        warnings.warn(
-            UserWarning(
-                "Invalid Basket. Manifest could not be loaded into json at: ",
-                file,
-            )
+        _report(
+            "invalid_manifest_json",
+            "Invalid Basket. Manifest could not be loaded into json at: ",
+            file,
         )
 
 
-def _handle_supplement(file: str, pantry):
+def _handle_supplement(file: str, pantry, listing):
     """Handles case if supplement.
 
     Parameters:
@@ -317,34 +665,42 @@ def _handle_supplement(file: str, pantry):
         Path to the file.
     pantry: weave.Pantry
         Pantry object representing the pantry to validate.
+    listing: _PantryListing
+        Listing containing the basket.
     """
 
     try:
-        # These two lines make sure it can be read and is valid schema
-        data = json.load(pantry.file_system.open(file))
-        validate(instance=data, schema=supplement_schema)
+        # These lines make sure it can be read and is valid schema
+        data = load_supplement(pantry.file_system, file)
+        supplement_validator.validate(data)
         basket_dir, _ = os.path.split(file)
-        _validate_supplement_files(basket_dir, data, pantry)
+        _validate_supplement_files(basket_dir, data, pantry, listing)
 
     except jsonschema.exceptions.ValidationError:
-        warnings.warn(
-            UserWarning(
-                "Invalid Basket. Supplement Schema does not match at: ",
-                file,
-            )
+        _report(
+            "invalid_supplement_schema",
+            "Invalid Basket. Supplement Schema does not match at: ",
+            file,
+        )
+
+    except FileNotFoundError:
+        _report(
+            "missing_integrity_data",
+            "Invalid Basket. Integrity data file of the supplement "
+            "not found at: ",
+            file,
         )
 
     except json.decoder.JSONDecodeError:
-        warnings.warn(
-            UserWarning(
-                "Invalid Basket. "
-                "Supplement could not be loaded into json at: ",
-                file,
-            )
+        _report(
+            "invalid_supplement_json",
+            "Invalid Basket. "
+            "Supplement could not be loaded into json at: ",
+            file,
         )
 
 
-def _handle_metadata(file: str, pantry):
+def _handle_metadata(file: str, pantry, listing):
     """Handles case if metadata.
 
     Parameters:
@@ -353,22 +709,23 @@ def _handle_metadata(file: str, pantry):
         Path to the file.
     pantry: weave.Pantry
         Pantry object representing the pantry to validate.
+    listing: _PantryListing
+        Listing containing the basket.
     """
 
     try:
         json.load(pantry.file_system.open(file))
 
     except json.decoder.JSONDecodeError:
-        warnings.warn(
-            UserWarning(
-                "Invalid Basket. "
-                "Metadata could not be loaded into json at: ",
-                file,
-            )
+        _report(
+            "invalid_metadata_json",
+            "Invalid Basket. "
+            "Metadata could not be loaded into json at: ",
+            file,
         )
 
 
-def _handle_none_of_the_above(file: str, pantry):
+def _handle_none_of_the_above(file: str, pantry, listing):
     """Handles case if none of the above.
 
     Parameters:
@@ -377,18 +734,21 @@ def _handle_none_of_the_above(file: str, pantry):
         Path to the file.
     pantry: weave.Pantry
         Pantry object representing the pantry to validate.
+    listing: _PantryListing
+        Listing containing the basket.
     """
 
     basket_dir, _ = os.path.split(file)
 
-    if pantry.file_system.info(file)["type"] == "directory":
-        if _check_level(file, pantry=pantry, in_basket=True):
-            warnings.warn(
-                UserWarning(
-                    "Invalid Basket. Manifest File "
-                    "found in sub directory of basket at: ",
-                    basket_dir,
-                )
+    if listing.is_dir(file):
+        if _check_level(
+            file, pantry=pantry, in_basket=True, listing=listing
+        ):
+            _report(
+                "nested_basket",
+                "Invalid Basket. Manifest File "
+                "found in sub directory of basket at: ",
+                basket_dir,
             )
 
 
@@ -410,7 +770,7 @@ def _check_metadata_only(files_in_basket: list[str], pantry):
             man_data = json.load(pantry.file_system.open(file))
 
         if file.endswith("basket_supplement.json"):
-            supp_data = json.load(pantry.file_system.open(file))
+            supp_data = load_supplement(pantry.file_system, file)
 
         if file.endswith("basket_metadata.json"):
             meta_data = json.load(pantry.file_system.open(file))
@@ -426,49 +786,67 @@ def _check_metadata_only(files_in_basket: list[str], pantry):
     ):
         # Raise a warning that there are no files uploaded, but it
         # is not considered to be a metadata-only basket.
-        warnings.warn(
-            UserWarning(
-                "Invalid Basket. No files in basket and criteria not met for "
-                "metadata-only basket. ",
-                man_data["uuid"],
-            )
+        _report(
+            "invalid_metadata_only_basket",
+            "Invalid Basket. No files in basket and criteria not met for "
+            "metadata-only basket. ",
+            man_data["uuid"],
         )
 
 
-def _validate_parent_uuids(data: dict, pantry):
-    """Validate that all the parent_uuids from the manifest exist in the
-    pantry.
+def _find_missing_parents(manifests: dict, pantry) -> dict:
+    """Find the parent_uuids of the manifests which are not in the pantry.
 
-    If there are parent uuids that don't actually exist in the pantry,
-    a warning will be raised for each of those, along with the
-    basket's uuid where the error occurred.
+    The parent uuids of every manifest are gathered into a single set, which
+    is looked up in the index in batches of _GET_ROWS_BATCH_SIZE, instead of
+    querying the index once per manifest.
 
     Parameters
     ----------
-    data: dict
-        The dictionary that contains the data of the manifest.json.
+    manifests: dict
+        Dictionary mapping basket paths to the uuid and parent_uuids of their
+        manifest.
     pantry: weave.Pantry
         Pantry object representing the pantry to validate.
-    """
 
-    # If there are no parent uuids in the manifest, no need to check anything
-    if len(data["parent_uuids"]) == 0:
-        return
+    Returns
+    ----------
+    A dictionary mapping the paths of the baskets with missing parents to
+    the list of their missing parent uuids.
+    """
+    parent_uuids = sorted({
+        uuid
+        for manifest in manifests.values()
+        for uuid in manifest["parent_uuids"]
+    })
+    found_parents = set()
+    for i in range(0, len(parent_uuids), _GET_ROWS_BATCH_SIZE):
+        found_parents.update(
+            pantry.index.get_rows(
+                parent_uuids[i:i + _GET_ROWS_BATCH_SIZE]
+            )["uuid"]
+        )
 
-    found_parents = list(pantry.index.get_rows(data["parent_uuids"])["uuid"])
-    missing_uids = [
-        uuid for uuid in data["parent_uuids"] if uuid not in found_parents
-    ]
+    missing_parents = {}
+    for basket_dir, manifest in manifests.items():
+        missing_uids = [
+            uuid for uuid in manifest["parent_uuids"]
+            if uuid not in found_parents
+        ]
+        if missing_uids:
+            missing_parents[basket_dir] = missing_uids
+    return missing_parents
 
-    if missing_uids:
-        warnings.warn(
-            f"The uuids: {missing_uids} were not found in the "
-            f"index, which was found inside basket: {data['uuid']}"
-        )
 
+def _validate_supplement_files(
+    basket_dir: str, data: dict, pantry, listing
+):
+    """Reconcile the files listed in the supplement's integrity_data with the
+    files of the basket in the listing.
 
-def _validate_supplement_files(basket_dir: str, data: dict, pantry):
-    """Validate the files listed in the supplement's integrity_data.
+    Files are compared by their path from the pantry path onward, and the
+    sizes of the files found in both are compared, as a cheap check for
+    truncated or corrupted files.
 
     Parameters
     ----------
@@ -478,52 +856,57 @@ def _validate_supplement_files(basket_dir: str, data: dict, pantry):
         The dictionary that contains the data of the supplement.json.
     pantry: weave.Pantry
         The pantry to validate.
+    listing: _PantryListing
+        Listing containing the basket.
     """
-    sys_file_list = pantry.file_system.find(path=basket_dir, withdirs=False)
-
     # Grab all the files, but remove manifest, supplement, and metadata
-    ignores = [
-        os.path.join(basket_dir, "basket_manifest.json"),
-        os.path.join(basket_dir, "basket_supplement.json"),
-        os.path.join(basket_dir, "basket_metadata.json"),
-    ]
-    system_file_list = [
-        file
-        for file in sys_file_list
-        if not any(Path(file).match(p) for p in ignores)
-    ]
-
-    supp_file_list = [file["upload_path"] for file in data["integrity_data"]]
-
-    # Remove path up until the pantry directory in both lists
-    system_file_list = [
-        Path(file[file.find(pantry.pantry_path) :])
-        for file in system_file_list
-    ]
-    supp_file_list = [
-        Path(file[file.find(pantry.pantry_path) :]) for file in supp_file_list
-    ]
-
-    system_file_set = set(system_file_list)
-    supp_file_set = set(supp_file_list)
-
-    files_not_in_system = supp_file_set - system_file_set
-    files_not_in_supp = system_file_set - supp_file_set
+    ignores = {
+        os.path.join(basket_dir, file_name)
+        for file_name in prohibited_filenames
+    }
+    system_files = {
+        _get_pantry_key(file, pantry.pantry_path):
+            listing.entries[file].get("size")
+        for file in listing.files(basket_dir)
+        if file not in ignores
+    }
+    # Stubs are not uploaded, so they are not in the file system.
+    supplement_files = {
+        _get_pantry_key(file["upload_path"], pantry.pantry_path):
+            file["file_size"]
+        for file in data["integrity_data"]
+        if not file["stub"]
+    }
+
+    for file in sorted(supplement_files.keys() - system_files.keys()):
+        _report(
+            "file_not_in_file_system",
+            "File listed in the basket_supplement.json does not "
+            "exist in the file system: ",
+            file,
+        )
 
-    for file in files_not_in_system:
-        warnings.warn(
-            UserWarning(
-                "File listed in the basket_supplement.json does not "
-                "exist in the file system: ",
-                file,
-            )
+    for file in sorted(system_files.keys() - supplement_files.keys()):
+        _report(
+            "file_not_in_supplement",
+            "File found in the file system is not listed in "
+            "the basket_supplement.json: ",
+            file,
         )
 
-    for file in files_not_in_supp:
-        warnings.warn(
-            UserWarning(
-                "File found in the file system is not listed in "
+    for file in sorted(system_files.keys() & supplement_files.keys()):
+        if system_files[file] not in (None, supplement_files[file]):
+            _report(
+                "file_size_mismatch",
+                "File size in the file system does not match "
                 "the basket_supplement.json: ",
                 file,
             )
-        )
+
+
+def _get_pantry_key(path: str, pantry_path: str) -> str:
+    """Return the part of a path from the pantry path onward, used to compare
+    paths written with different prefixes (ie with or without a protocol).
+    """
+    start = path.find(pantry_path)
+    return os.path.normpath(path[start:] if start >= 0 else path)
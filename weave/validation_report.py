@@ -0,0 +1,219 @@
+"""Wherein is contained the ValidationReport and ValidationRecord classes, the
+structured results of validating a pantry."""
+import json
+
+
+class ValidationRecord():
+    """A single problem found while validating a basket."""
+
+    def __init__(self, code: str, message: str, path: str, **kwargs):
+        """Initializes the ValidationRecord.
+
+        Parameters
+        ----------
+        code: str
+            Machine readable kind of the problem, ie 'missing_supplement'.
+        message: str
+            Human readable description of the problem.
+        path: str
+            Path of the basket or file where the problem was found. Records
+            about a basket as a whole may hold the basket's uuid instead.
+        **severity: str (default="warning")
+            Severity of the problem, either 'warning' or 'error'.
+        **basket: str (optional)
+            Path of the basket the record belongs to.
+        """
+        self.code = code
+        self.message = message
+        self.path = str(path)
+        self.severity = kwargs.get("severity", "warning")
+        self.basket = kwargs.get("basket", None)
+
+    def __eq__(self, other) -> bool:
+        """Records are equal when every field is equal."""
+        if not isinstance(other, ValidationRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        """Return a readable representation of the record."""
+        return (
+            f"ValidationRecord({self.code!r}, {self.message!r}, "
+            f"{self.path!r}, severity={self.severity!r})"
+        )
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        """Identity of the problem, used to compare runs (see
+        ValidationReport.diff).
+        """
+        return (self.code, self.path, self.message)
+
+    def to_warning(self) -> UserWarning:
+        """Return the record as the warning raised by validate_pantry."""
+        return UserWarning(self.message, self.path)
+
+    def to_dict(self) -> dict:
+        """Return the record as a JSON serializable dictionary."""
+        return {
+            "code": self.code,
+            "severity": self.severity,
+            "message": self.message,
+            "path": self.path,
+            "basket": self.basket,
+        }
+
+    @classmethod
+    def from_dict(cls, record: dict):
+        """Create a ValidationRecord from the output of to_dict."""
+        return cls(
+            record["code"],
+            record["message"],
+            record["path"],
+            severity=record.get("severity", "warning"),
+            basket=record.get("basket", None),
+        )
+
+
+class ValidationReport():
+    """The structured result of validating a pantry, or a shard of it.
+
+    Reports hold the records of every problem found, and how long each
+    basket took to validate. Reports of different shards can be merged, and
+    reports of different runs can be compared with diff.
+    """
+
+    def __init__(self, records: list = None, durations: dict = None):
+        """Initializes the ValidationReport.
+
+        Parameters
+        ----------
+        records: [ValidationRecord] (optional)
+            Records of the problems found.
+        durations: dict (optional)
+            Dictionary mapping the path of every validated basket to the
+            seconds taken to validate it.
+        """
+        self.records = list(records or [])
+        self.durations = dict(durations or {})
+
+    def __len__(self) -> int:
+        """Return the number of records in the report."""
+        return len(self.records)
+
+    def __iter__(self):
+        """Iterate over the records of the report."""
+        return iter(self.records)
+
+    @property
+    def baskets(self) -> list[str]:
+        """The paths of the validated baskets."""
+        return list(self.durations)
+
+    @property
+    def invalid_baskets(self) -> list[str]:
+        """The paths of the baskets with at least one record, in order."""
+        return list(dict.fromkeys(
+            record.basket for record in self.records
+            if record.basket is not None
+        ))
+
+    @property
+    def is_valid(self) -> bool:
+        """True when no problems were found."""
+        return not self.records
+
+    def add_basket(self, basket: str, records: list, duration: float):
+        """Add the results of validating a basket to the report.
+
+        Parameters
+        ----------
+        basket: str
+            Path of the validated basket.
+        records: [ValidationRecord]
+            Records of the problems found in the basket.
+        duration: float
+            Seconds taken to validate the basket.
+        """
+        self.records.extend(records)
+        self.durations[basket] = duration
+
+    def merge(self, other):
+        """Return a new report holding the results of both reports.
+
+        Parameters
+        ----------
+        other: ValidationReport
+            The report to merge, ie the report of another shard.
+
+        Returns
+        ----------
+        A new ValidationReport.
+        """
+        if not isinstance(other, ValidationReport):
+            raise TypeError(
+                f"'other' must be a ValidationReport: '{other}'"
+            )
+        return ValidationReport(
+            self.records + other.records,
+            {**self.durations, **other.durations},
+        )
+
+    def diff(self, previous) -> tuple[list, list]:
+        """Compare the report against the report of a previous run.
+
+        Records are compared by code, path and message.
+
+        Parameters
+        ----------
+        previous: ValidationReport
+            Report of the previous run.
+
+        Returns
+        ----------
+        A tuple of two lists of ValidationRecords: the records which are new
+        since the previous run, and the previous records which are resolved.
+        """
+        if not isinstance(previous, ValidationReport):
+            raise TypeError(
+                f"'previous' must be a ValidationReport: '{previous}'"
+            )
+        current_keys = {record.key for record in self.records}
+        previous_keys = {record.key for record in previous.records}
+        added = [
+            record for record in self.records
+            if record.key not in previous_keys
+        ]
+        resolved = [
+            record for record in previous.records
+            if record.key not in current_keys
+        ]
+        return added, resolved
+
+    def to_warnings(self) -> list[Warning]:
+        """Return the records as the list of warnings of validate_pantry."""
+        return [record.to_warning() for record in self.records]
+
+    def to_dict(self) -> dict:
+        """Return the report as a JSON serializable dictionary."""
+        return {
+            "records": [record.to_dict() for record in self.records],
+            "durations": self.durations,
+        }
+
+    @classmethod
+    def from_dict(cls, report: dict):
+        """Create a ValidationReport from the output of to_dict."""
+        return cls(
+            [ValidationRecord.from_dict(x) for x in report["records"]],
+            report.get("durations", {}),
+        )
+
+    def to_json(self) -> str:
+        """Return the report serialized as a JSON string."""
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, report: str):
+        """Create a ValidationReport from the output of to_json."""
+        return cls.from_dict(json.loads(report))
@@ -0,0 +1,132 @@
+"""Wherein is contained the ValidationState class, a persistent store of
+basket validation results used to skip re-validating unchanged baskets."""
+import json
+import sqlite3
+import threading
+import time
+
+from .validation_report import ValidationRecord
+
+
+class ValidationState():
+    """A persistent store of the last validation result of each basket,
+    backed by SQLite.
+
+    Results are keyed by the basket's path and fingerprint (a digest of the
+    size and version identifier of every file in the basket), so a basket
+    with any added, removed or modified file is validated again.
+    """
+
+    def __init__(self, db_path: str = "weave_validation_state.db"):
+        """Initializes the ValidationState.
+
+        Parameters
+        ----------
+        db_path: str (default="weave_validation_state.db")
+            Path to the sqlite db file used to persist the results.
+        """
+        self.db_path = db_path
+        # The connection is shared between threads (baskets are validated
+        # concurrently), so access is serialized with a lock.
+        self._lock = threading.Lock()
+        self.con = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.cur = self.con.cursor()
+        self._create_tables()
+
+    def __del__(self):
+        """Close the database connection before closing."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of baskets in the store."""
+        with self._lock:
+            return self.cur.execute(
+                "SELECT COUNT(*) FROM validation_state"
+            ).fetchone()[0]
+
+    def _create_tables(self):
+        """Create the required DB tables if they do not already exist."""
+        self.cur.execute("""
+            CREATE TABLE IF NOT EXISTS validation_state(
+                basket TEXT PRIMARY KEY, fingerprint TEXT, manifest TEXT,
+                records TEXT, validated REAL);
+        """)
+        self.con.commit()
+
+    def get(
+        self, basket: str, fingerprint: str
+    ) -> tuple[list[ValidationRecord], dict | None] | None:
+        """Return the last result of a basket, if it is unchanged.
+
+        Parameters
+        ----------
+        basket: str
+            Path of the basket.
+        fingerprint: str
+            Current fingerprint of the basket.
+
+        Returns
+        ----------
+        None if the basket was never validated or its fingerprint changed.
+        Otherwise a tuple of the basket's ValidationRecords, and the uuid and
+        parent_uuids of its manifest (dict), or None if the manifest was not
+        valid.
+        """
+        with self._lock:
+            row = self.cur.execute(
+                "SELECT manifest, records FROM validation_state "
+                "WHERE basket = ? AND fingerprint = ?",
+                (basket, fingerprint),
+            ).fetchone()
+        if row is None:
+            return None
+        records = [ValidationRecord.from_dict(x) for x in json.loads(row[1])]
+        return records, json.loads(row[0])
+
+    def put(
+        self,
+        basket: str,
+        fingerprint: str,
+        records: list[ValidationRecord],
+        manifest: dict | None,
+    ):
+        """Store the result of validating a basket.
+
+        Parameters
+        ----------
+        basket: str
+            Path of the basket.
+        fingerprint: str
+            Fingerprint of the basket when it was validated.
+        records: [ValidationRecord]
+            Records of the problems found in the basket.
+        manifest: dict
+            The uuid and parent_uuids of the basket's manifest, used to check
+            the parent uuids against the index on later runs. None if the
+            manifest was not valid.
+        """
+        with self._lock:
+            self.cur.execute(
+                "INSERT OR REPLACE INTO validation_state "
+                "VALUES(?, ?, ?, ?, ?)",
+                (
+                    basket,
+                    fingerprint,
+                    json.dumps(manifest),
+                    json.dumps([record.to_dict() for record in records]),
+                    time.time(),
+                ),
+            )
+            self.con.commit()
+
+    def clear(self):
+        """Remove every result from the store, ie after upgrading weave."""
+        with self._lock:
+            self.cur.execute("DELETE FROM validation_state")
+            self.con.commit()
+
+    def close(self):
+        """Close the database connection."""
+        if getattr(self, "con", None) is not None:
+            self.con.close()
+            self.con = None